@@ -0,0 +1,128 @@
+"""
+Database configuration from environment variables, and the
+read-replica router.
+
+KANMIND_DB_ENGINE selects the backend:
+- sqlite (default): KANMIND_DB_NAME is the file path. Connections use WAL,
+  a busy timeout and BEGIN IMMEDIATE, so concurrent writers wait for the
+  lock instead of failing with "database is locked".
+- postgres: KANMIND_DB_NAME, _USER, _PASSWORD, _HOST, _PORT. Persistent
+  connections (KANMIND_DB_CONN_MAX_AGE, default 60s) with health checks,
+  or a psycopg connection pool with KANMIND_DB_POOL=1 (needs psycopg[pool]).
+
+With KANMIND_DB_REPLICA_HOST set (postgres only), a 'replica' alias is
+added and ReadReplicaRouter sends reads of GET/HEAD/OPTIONS requests there.
+Code inside `with primary():` reads from the primary even then.
+"""
+import contextlib
+import contextvars
+
+
+SQLITE_PRAGMAS = (
+    'PRAGMA journal_mode=WAL',
+    'PRAGMA synchronous=NORMAL',
+    'PRAGMA temp_store=MEMORY',
+    'PRAGMA cache_size=-20000',
+)
+
+use_replica = contextvars.ContextVar('kanmind_use_replica', default=False)
+
+
+@contextlib.contextmanager
+def primary():
+    """
+    Send the reads inside the block to the primary, e.g. when the result
+    is stored in a shared cache and must not come from a lagging replica.
+    """
+    token = use_replica.set(False)
+    try:
+        yield
+    finally:
+        use_replica.reset(token)
+
+
+def env_bool(environ, name, default=False):
+    value = environ.get(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ('1', 'true', 'yes', 'on')
+
+
+def sqlite_config(environ, base_dir):
+    return {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': environ.get('KANMIND_DB_NAME', base_dir / 'db.sqlite3'),
+        'OPTIONS': {
+            'timeout': float(environ.get('KANMIND_DB_BUSY_TIMEOUT', 20)),
+            'transaction_mode': 'IMMEDIATE',
+            'init_command': ';'.join(SQLITE_PRAGMAS),
+        },
+    }
+
+
+def postgres_config(environ, host):
+    config = {
+        'ENGINE': 'django.db.backends.postgresql',
+        'NAME': environ.get('KANMIND_DB_NAME', 'kanmind'),
+        'USER': environ.get('KANMIND_DB_USER', ''),
+        'PASSWORD': environ.get('KANMIND_DB_PASSWORD', ''),
+        'HOST': host,
+        'PORT': environ.get('KANMIND_DB_PORT', ''),
+        'CONN_MAX_AGE': int(environ.get('KANMIND_DB_CONN_MAX_AGE', 60)),
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {},
+    }
+    if env_bool(environ, 'KANMIND_DB_POOL'):
+        # The pool replaces persistent connections; Django requires CONN_MAX_AGE = 0.
+        config['CONN_MAX_AGE'] = 0
+        config['OPTIONS']['pool'] = {
+            'min_size': int(environ.get('KANMIND_DB_POOL_MIN_SIZE', 2)),
+            'max_size': int(environ.get('KANMIND_DB_POOL_MAX_SIZE', 10)),
+            'timeout': float(environ.get('KANMIND_DB_POOL_TIMEOUT', 10)),
+        }
+    return config
+
+
+def database_config(environ, base_dir):
+    """
+    Build DATABASES from the environment.
+    """
+    engine = environ.get('KANMIND_DB_ENGINE', 'sqlite').lower()
+    if engine == 'sqlite':
+        return {'default': sqlite_config(environ, base_dir)}
+    if engine not in ('postgres', 'postgresql'):
+        raise ValueError(f'Unsupported KANMIND_DB_ENGINE: {engine}')
+
+    databases = {'default': postgres_config(environ, environ.get('KANMIND_DB_HOST', ''))}
+    replica_host = environ.get('KANMIND_DB_REPLICA_HOST')
+    if replica_host:
+        databases['replica'] = postgres_config(environ, replica_host)
+        databases['replica']['TEST'] = {'MIRROR': 'default'}
+    return databases
+
+
+class ReadReplicaRouter:
+    """
+    Send reads to the 'replica' alias while ReadReplicaMiddleware has
+    marked the request as read-only (GET/HEAD/OPTIONS). Everything else,
+    including reads in write requests, stays on the primary, so a
+    request always sees its own writes.
+    """
+
+    def db_for_read(self, model, **hints):
+        if use_replica.get():
+            return 'replica'
+        return None
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == 'default'
+
+
+def database_routers(databases):
+    return ['kanmind.database.ReadReplicaRouter'] if 'replica' in databases else []
@@ -0,0 +1,233 @@
+"""
+Per-request query and timing instrumentation, and read-replica routing.
+
+Instrumentation is enabled with KANMIND_INSTRUMENTATION['ENABLED']. When
+disabled the middleware removes itself at startup (MiddlewareNotUsed), so
+it adds no overhead at all. Serializer and render time are measured by
+the views and the renderer themselves, with timed(); nothing outside
+this project is patched. The middleware is async capable, so it does
+not push the async views back onto a worker thread.
+"""
+import contextvars
+import json
+import logging
+import time
+import traceback
+from collections import Counter
+from contextlib import ExitStack, contextmanager
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+from kanmind.database import use_replica
+
+
+logger = logging.getLogger('kanmind.instrumentation')
+
+current_recorder = contextvars.ContextVar('kanmind_recorder', default=None)
+
+
+class RequestRecorder:
+    """
+    Collects the queries and the timed() spans of one request.
+    Used as a database execute wrapper.
+    """
+
+    def __init__(self, capture_stacks):
+        self.capture_stacks = capture_stacks
+        self.queries = []
+        self.timings = Counter()
+        self.active = set()
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = (time.perf_counter() - started) * 1000
+            stack = self.project_stack() if self.capture_stacks else None
+            self.queries.append((sql, duration, stack))
+
+    def project_stack(self):
+        """
+        Return the stack frames that belong to this project, skipping
+        Django, DRF and the standard library.
+        """
+        base_dir = str(settings.BASE_DIR)
+        return [
+            f'{frame.filename[len(base_dir) + 1:]}:{frame.lineno} in {frame.name}'
+            for frame in traceback.extract_stack()[:-2]
+            if frame.filename.startswith(base_dir) and 'site-packages' not in frame.filename
+            and not frame.filename.endswith('middleware.py')
+        ]
+
+    @property
+    def sql_ms(self):
+        return sum(duration for sql, duration, stack in self.queries)
+
+    def duplicates(self):
+        """
+        Return {sql: count} for statements run more than once,
+        the usual sign of an N+1 query.
+        """
+        counts = Counter(sql for sql, duration, stack in self.queries)
+        return {sql: count for sql, count in counts.items() if count > 1}
+
+
+@contextmanager
+def timed(span):
+    """
+    Add the time spent in the block to `span` ('serializer', 'render')
+    of the current request. Nested blocks of one span count once, and
+    outside an instrumented request this does nothing.
+    """
+    recorder = current_recorder.get()
+    if recorder is None or span in recorder.active:
+        yield
+        return
+    recorder.active.add(span)
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        recorder.timings[span] += (time.perf_counter() - started) * 1000
+        recorder.active.discard(span)
+
+
+class QueryInstrumentationMiddleware:
+    """
+    Records per request: query count, total SQL time, duplicated
+    statements, serializer and render time and response size.
+    - Adds them as a Server-Timing header
+    - Logs one structured line per request to 'kanmind.instrumentation'
+    - Logs the slowest queries with their stacks when a request
+      takes longer than SLOW_REQUEST_MS
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        options = getattr(settings, 'KANMIND_INSTRUMENTATION', {})
+        if not options.get('ENABLED'):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.slow_request_ms = options.get('SLOW_REQUEST_MS', 500)
+        self.worst_queries = options.get('WORST_QUERIES', 5)
+        self.capture_stacks = options.get('CAPTURE_STACKS', True)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        recorder = RequestRecorder(self.capture_stacks)
+        token = current_recorder.set(recorder)
+        started = time.perf_counter()
+        try:
+            with self.recording(recorder):
+                response = self.get_response(request)
+        finally:
+            current_recorder.reset(token)
+        return self.report(request, response, recorder, started)
+
+    async def __acall__(self, request):
+        recorder = RequestRecorder(self.capture_stacks)
+        token = current_recorder.set(recorder)
+        started = time.perf_counter()
+        try:
+            with self.recording(recorder):
+                response = await self.get_response(request)
+        finally:
+            current_recorder.reset(token)
+        return self.report(request, response, recorder, started)
+
+    def recording(self, recorder):
+        stack = ExitStack()
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(recorder))
+        return stack
+
+    def report(self, request, response, recorder, started):
+        total_ms = (time.perf_counter() - started) * 1000
+        duplicates = recorder.duplicates()
+        size = None if response.streaming else len(response.content)
+        response['Server-Timing'] = ', '.join([
+            f'sql;dur={recorder.sql_ms:.2f};desc="{len(recorder.queries)} queries, '
+            f'{sum(duplicates.values()) - len(duplicates)} duplicated"',
+            f'serializer;dur={recorder.timings["serializer"]:.2f}',
+            f'render;dur={recorder.timings["render"]:.2f}',
+            f'total;dur={total_ms:.2f}',
+        ])
+
+        logger.info(json.dumps({
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'total_ms': round(total_ms, 2),
+            'queries': len(recorder.queries),
+            'sql_ms': round(recorder.sql_ms, 2),
+            'duplicated_queries': sum(duplicates.values()) - len(duplicates),
+            'serializer_ms': round(recorder.timings['serializer'], 2),
+            'render_ms': round(recorder.timings['render'], 2),
+            'response_bytes': size,
+        }))
+        if total_ms >= self.slow_request_ms:
+            self.log_slow_request(request, recorder, duplicates, total_ms)
+        return response
+
+    def log_slow_request(self, request, recorder, duplicates, total_ms):
+        worst = sorted(recorder.queries, key=lambda query: query[1], reverse=True)[:self.worst_queries]
+        logger.warning(json.dumps({
+            'slow_request': f'{request.method} {request.path}',
+            'total_ms': round(total_ms, 2),
+            'worst_queries': [
+                {'sql': sql, 'ms': round(duration, 2), 'stack': stack}
+                for sql, duration, stack in worst
+            ],
+            'duplicated_statements': [
+                {'sql': sql, 'count': count}
+                for sql, count in sorted(duplicates.items(), key=lambda item: item[1], reverse=True)[:self.worst_queries]
+            ],
+        }))
+
+
+class ReadReplicaMiddleware:
+    """
+    Mark GET/HEAD/OPTIONS requests as read-only, so ReadReplicaRouter
+    sends their queries to the replica. Removed at startup when no
+    'replica' database is configured. Async capable like the
+    instrumentation middleware.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if 'replica' not in settings.DATABASES:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        token = use_replica.set(self.is_read(request))
+        try:
+            return self.get_response(request)
+        finally:
+            use_replica.reset(token)
+
+    async def __acall__(self, request):
+        token = use_replica.set(self.is_read(request))
+        try:
+            return await self.get_response(request)
+        finally:
+            use_replica.reset(token)
+
+    @staticmethod
+    def is_read(request):
+        return request.method in ('GET', 'HEAD', 'OPTIONS')
@@ -10,8 +10,11 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
+from kanmind.database import database_config, database_routers
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -45,6 +48,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'kanmind.middleware.QueryInstrumentationMiddleware',
+    'kanmind.middleware.ReadReplicaMiddleware',
      'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -56,6 +61,16 @@ MIDDLEWARE = [
     
 ]
 
+# Per-request query count, SQL time, duplicated queries, serializer and render time,
+# sent as Server-Timing header and logged to 'kanmind.instrumentation'.
+# Requests slower than SLOW_REQUEST_MS also log their worst queries with stacks.
+KANMIND_INSTRUMENTATION = {
+    'ENABLED': False,
+    'SLOW_REQUEST_MS': 500,
+    'WORST_QUERIES': 5,
+    'CAPTURE_STACKS': True,
+}
+
 ROOT_URLCONF = 'kanmind.urls'
 
 TEMPLATES = [
@@ -80,13 +95,65 @@ WSGI_APPLICATION = 'kanmind.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
-DATABASES = {
+# Configured from KANMIND_DB_* environment variables, see kanmind/database.py.
+# Defaults to SQLite at BASE_DIR / 'db.sqlite3' in WAL mode.
+
+DATABASES = database_config(os.environ, BASE_DIR)
+
+DATABASE_ROUTERS = database_routers(DATABASES)
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# The board endpoints cache rendered responses in KANMIND_RESPONSE_CACHE.
+# Point it at a shared backend (Redis, Memcached) when running several processes.
+
+CACHES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'kanmind',
     }
 }
 
+KANMIND_RESPONSE_CACHE = 'default'
+
+KANMIND_RESPONSE_CACHE_TIMEOUT = 300
+
+# Seconds the per-user task summary (/api/tasks/summary/) is cached,
+# 0 computes it on every request. Task writes do not invalidate it.
+
+KANMIND_SUMMARY_CACHE_TIMEOUT = 30
+
+# Seconds a board change must be old before /changes/ hands out a cursor
+# past it. Change ids are assigned at insert, not at commit, so on
+# PostgreSQL a slower transaction can commit a lower id after a higher one
+# has been read. SQLite serializes writers, so it needs no lag.
+
+KANMIND_SYNC_LAG = 0 if DATABASES['default']['ENGINE'].endswith('sqlite3') else 2
+
+# Days the board change log is kept by `manage.py prune_board_changes`.
+
+KANMIND_SYNC_RETENTION_DAYS = 30
+
+# Serve the read-heavy GET endpoints from async views. Only worth it
+# under an ASGI server (kanmind.asgi:application).
+
+KANMIND_ASYNC_VIEWS = False
+
+# Live board events (/api/boards/<id>/events/). BROKER is the dotted path
+# of a kanmind_board_app.events.Broker; the default only reaches
+# subscribers in the same process. TICKET_MAX_AGE is the lifetime of a
+# stream ticket, RECHECK how often (seconds) open streams re-check access.
+
+KANMIND_EVENTS = {
+    'BROKER': 'kanmind_board_app.events.InProcessBroker',
+    'QUEUE_SIZE': 1000,
+    'KEEPALIVE': 15,
+    'RETRY_MS': 3000,
+    'TICKET_MAX_AGE': 60,
+    'RECHECK': 60,
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -107,6 +174,27 @@ AUTH_PASSWORD_VALIDATORS = [
 ]
 
 
+# Logging
+# https://docs.djangoproject.com/en/5.2/topics/logging/
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'kanmind.instrumentation': {
+            'handlers': ['console'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+    },
+}
+
+
 # Internationalization
 # https://docs.djangoproject.com/en/5.2/topics/i18n/
 
@@ -135,6 +223,24 @@ REST_FRAMEWORK = {
         'rest_framework.permissions.AllowAny'
     ],
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication'
-    ]
+        'users.api.authentication.CachingTokenAuthentication'
+    ],
+    # Same output as DRF's JSONRenderer, encoded with orjson when installed.
+    'DEFAULT_RENDERER_CLASSES': [
+        'kanmind_board_app.api.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+}
+
+# Token lookups are cached in an in-process LRU of MAX_SIZE entries for
+# LOCAL_TTL seconds, backed by the SHARED_CACHE alias for TTL seconds.
+# A deleted token or deactivated user is dropped from the shared cache
+# at once, but other processes may still accept it from their LRU for
+# up to LOCAL_TTL seconds. SHARED_CACHE = None keeps only the LRU
+# (single process only).
+KANMIND_TOKEN_CACHE = {
+    'MAX_SIZE': 10000,
+    'TTL': 60,
+    'LOCAL_TTL': 5,
+    'SHARED_CACHE': 'default',
 }
\ No newline at end of file
@@ -0,0 +1,100 @@
+"""
+Shared board access checks.
+
+"Is the user owner or member of board X" is answered with one indexed
+EXISTS query instead of loading the member list into Python. Results
+are memoized on the request, so several checks in one request cost
+one query per board.
+"""
+from django.db.models import BooleanField, Exists, ExpressionWrapper, OuterRef, Q
+from django.shortcuts import get_object_or_404
+
+from kanmind_board_app.models import Board, Task, Comment
+
+
+def board_access(user, board_path=''):
+    """
+    Boolean expression that is true when the user owns or is a member
+    of the board reached through `board_path` ('' for boards,
+    'board__' for tasks, 'task__board__' for comments).
+    """
+    is_member = board_membership(user, board_path)
+    return ExpressionWrapper(Q(**{f'{board_path}owner_id': user.pk}) | Q(is_member), output_field=BooleanField())
+
+
+def board_membership(user, board_path=''):
+    """
+    Boolean expression that is true when the user is a member
+    (not only the owner) of the board reached through `board_path`.
+    """
+    board_id = f'{board_path[:-2]}_id' if board_path else 'pk'
+    return Exists(Board.members.through.objects.filter(board_id=OuterRef(board_id), user_id=user.pk))
+
+
+def _memo(request):
+    if not hasattr(request, '_kanmind_board_access'):
+        request._kanmind_board_access = {}
+    return request._kanmind_board_access
+
+
+def remember(request, board_id, can_access):
+    _memo(request)[board_id] = can_access
+    return can_access
+
+
+def can_access_board(request, board_id):
+    """
+    Return True if request.user is owner or member of the board,
+    False if not, None if the board does not exist.
+    """
+    memo = _memo(request)
+    if board_id not in memo:
+        memo[board_id] = access_flag(request.user, board_id).first()
+    return memo[board_id]
+
+
+async def acan_access_board(request, board_id):
+    """
+    Async can_access_board().
+    """
+    memo = _memo(request)
+    if board_id not in memo:
+        memo[board_id] = await access_flag(request.user, board_id).afirst()
+    return memo[board_id]
+
+
+def access_flag(user, board_id):
+    return (Board.objects.filter(pk=board_id)
+            .annotate(can_access=board_access(user))
+            .values_list('can_access', flat=True))
+
+
+def is_board_member(request, board_id):
+    """
+    Return True if request.user is a member of the board.
+    """
+    return Board.members.through.objects.filter(board_id=board_id, user_id=request.user.pk).exists()
+
+
+def get_task(request, pk):
+    """
+    Load a task together with the access flag of its board in one
+    query. Raises Http404 if the task does not exist.
+    """
+    task = get_object_or_404(Task.objects.annotate(can_access=board_access(request.user, 'board__')), pk=pk)
+    remember(request, task.board_id, task.can_access)
+    return task
+
+
+def get_comment(request, task_id, comment_id):
+    """
+    Load a comment together with the board id and access flag of its
+    task in one query. Raises Http404 if the comment does not exist.
+    """
+    comment = get_object_or_404(
+        Comment.objects.annotate(can_access=board_access(request.user, 'task__board__'))
+        .select_related('task'),
+        id=comment_id, task_id=task_id,
+    )
+    remember(request, comment.task.board_id, comment.can_access)
+    return comment
@@ -0,0 +1,164 @@
+"""
+Async variants of the read-heavy endpoints.
+
+Under ASGI a sync APIView holds a worker thread for the whole request,
+including the time spent waiting on the database. These views await the
+async ORM instead. They only serve the plain JSON GET; anything else
+(other methods, pagination, ?format=, the browsable API, missing or
+invalid credentials) is handed to the regular DRF view, so those
+responses stay exactly as before. Enabled with KANMIND_ASYNC_VIEWS.
+"""
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework.exceptions import AuthenticationFailed
+
+from kanmind_board_app import response_cache
+from kanmind_board_app.models import Board, Task, Comment
+from users.api.authentication import CachingTokenAuthentication
+from .seralizers import BoardSerializer
+from .views import BoardsView, BoardDetailView, TaskAssignView, TaskReviewView, CommentView
+from . import access, conditional, fast_serializers
+
+
+def is_plain_json_get(request):
+    return (request.method == 'GET' and not request.GET
+            and 'text/html' not in request.headers.get('Accept', ''))
+
+
+def async_get(view_class):
+    """
+    Serve GET requests with the decorated coroutine and
+    everything else with `view_class`.
+    """
+    sync_view = sync_to_async(view_class.as_view())
+
+    def decorator(get):
+        @wraps(get)
+        async def view(request, *args, **kwargs):
+            if not is_plain_json_get(request):
+                return await sync_view(request, *args, **kwargs)
+            try:
+                authenticated = await CachingTokenAuthentication().aauthenticate(request)
+            except AuthenticationFailed:
+                authenticated = None
+            if authenticated is None:
+                return await sync_view(request, *args, **kwargs)
+            request.user, request.auth = authenticated
+            return await get(request, *args, **kwargs)
+
+        view.view_class = view_class
+        return csrf_exempt(view)
+    return decorator
+
+
+def message(data, status):
+    return response_cache.json_response(response_cache.render(data), status=status)
+
+
+def board_list_body(boards):
+    return response_cache.render(BoardSerializer(boards, many=True).data)
+
+
+@async_get(BoardsView)
+async def boards(request):
+    """
+    GET: Boards where the user is owner or member, see BoardsView.get.
+    """
+    cache = response_cache.get_cache()
+    cache_key = await response_cache.aboard_list_key(request.user.id)
+    body = await cache.aget(cache_key)
+    if body is None:
+        with response_cache.filling():
+            boards = [board async for board in Board.objects.visible_to(request.user).select_related('stats')]
+            if not boards:
+                return message({'message': 'No boards found or not authorized.'}, 401)
+            if all(getattr(board, 'stats', None) is not None for board in boards):
+                body = board_list_body(boards)
+            else:
+                # Boards without a BoardStats row get their counts from
+                # a sync ORM query, see BoardListSerializer.
+                body = await sync_to_async(board_list_body)(boards)
+        await cache.aset(cache_key, body, response_cache.get_timeout())
+    return response_cache.json_response(body)
+
+
+@async_get(BoardDetailView)
+async def board_detail(request, pk):
+    """
+    GET: Board with members and tasks, see BoardDetailView.get.
+    """
+    forbidden = {'message': 'Forbidden. Only owner or members can access this board.'}
+    cache = response_cache.get_cache()
+    cache_key = await response_cache.aboard_detail_key(pk)
+    entry = await cache.aget(cache_key)
+    if entry is not None:
+        if request.user.id != entry['owner_id'] and request.user.id not in entry['member_ids']:
+            return message(forbidden, 403)
+        not_modified = conditional.not_modified(request, entry['etag'])
+        if not_modified is not None:
+            return not_modified
+        return conditional.with_etag(response_cache.json_response(entry['body']), entry['etag'])
+
+    with response_cache.filling():
+        state = await conditional.board_state_query(pk, request.user).afirst()
+        if state is None:
+            return message({'detail': 'No Board matches the given query.'}, 404)
+        if not state['can_access']:
+            return message(forbidden, 403)
+        etag = conditional.board_etag(request, state)
+        not_modified = conditional.not_modified(request, etag)
+        if not_modified is not None:
+            return not_modified
+        data = await fast_serializers.aboard_detail(pk)
+
+    if data is None:
+        return message({'detail': 'No Board matches the given query.'}, 404)
+    body = response_cache.render(data)
+    entry = {'owner_id': data['owner_id'], 'member_ids': {member['id'] for member in data['members']},
+             'body': body, 'etag': etag}
+    await cache.aset(cache_key, entry, response_cache.get_timeout())
+    return conditional.with_etag(response_cache.json_response(body), etag)
+
+
+async def task_list(request, tasks, empty_message):
+    etag = await conditional.atask_list_etag(request, tasks)
+    not_modified = conditional.not_modified(request, etag)
+    if not_modified is not None:
+        return not_modified
+    data = await fast_serializers.FastTaskSerializer.adata(tasks)
+    if not data:
+        return conditional.with_etag(message({'message': empty_message}, 401), etag)
+    return conditional.with_etag(message(data, 200), etag)
+
+
+@async_get(TaskAssignView)
+async def assigned_tasks(request):
+    """
+    GET: Tasks where the user is assignee, see TaskAssignView.get.
+    """
+    return await task_list(request, Task.objects.filter(assignee=request.user), 'No tasks assigned.')
+
+
+@async_get(TaskReviewView)
+async def reviewing_tasks(request):
+    """
+    GET: Tasks where the user is reviewer, see TaskReviewView.get.
+    """
+    return await task_list(request, Task.objects.filter(reviewer=request.user), 'No tasks to review.')
+
+
+@async_get(CommentView)
+async def task_comments(request, pk):
+    """
+    GET: Comments of a task, see CommentView.get.
+    """
+    task = await (Task.objects.annotate(can_access=access.board_access(request.user, 'board__'))
+                  .filter(pk=pk).values('id', 'can_access').afirst())
+    if task is None:
+        return message({'detail': 'No Task matches the given query.'}, 404)
+    if not task['can_access']:
+        return message({'detail': 'Forbidden. Must be a member or owner of board.'}, 403)
+    data = await fast_serializers.FastCommentSerializer.adata(Comment.objects.filter(task_id=pk))
+    return message(data, 200)
@@ -0,0 +1,92 @@
+"""
+Strong ETags for conditional GET requests.
+
+An ETag is derived from a cheap version of the resource (latest
+updated_at stamps and row counts) instead of the serialized payload,
+so a matching If-None-Match can be answered with 304 before any
+serializer runs.
+"""
+import hashlib
+
+from django.db.models import Count, Max, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.utils.cache import get_conditional_response
+
+from kanmind_board_app.models import Board, Task, Comment
+from .access import board_access
+
+
+def make_etag(request, *parts):
+    """
+    Build a strong ETag from the version parts, the requested
+    path (including pagination params) and the response format.
+    """
+    renderer = getattr(request, 'accepted_renderer', None)
+    key = repr((request.get_full_path(), renderer.format if renderer else 'json') + parts)
+    return f'"{hashlib.sha1(key.encode()).hexdigest()}"'
+
+
+def not_modified(request, etag):
+    """
+    Return a 304 response if the request's If-None-Match matches, else None.
+    """
+    return get_conditional_response(request, etag=etag)
+
+
+def with_etag(response, etag):
+    response['ETag'] = etag
+    return response
+
+
+def board_state(board_id, user):
+    """
+    Load everything needed for access check and ETag of a board
+    detail in one query. Returns None if the board does not exist.
+    """
+    return board_state_query(board_id, user).first()
+
+
+def board_state_query(board_id, user):
+    tasks = Task.objects.filter(board=OuterRef('pk')).order_by().values('board')
+    comments = Comment.objects.filter(task__board=OuterRef('pk')).order_by().values('task__board')
+    members = Board.members.through.objects.filter(board_id=OuterRef('pk'))
+
+    return (Board.objects.filter(pk=board_id)
+            .annotate(
+                can_access=board_access(user),
+                member_count=Coalesce(Subquery(members.order_by().values('board_id')
+                                               .annotate(c=Count('pk')).values('c')), 0),
+                tasks_changed=Subquery(tasks.annotate(m=Max('updated_at')).values('m')),
+                task_count=Coalesce(Subquery(tasks.annotate(c=Count('pk')).values('c')), 0),
+                comments_changed=Subquery(comments.annotate(m=Max('updated_at')).values('m')),
+                comment_count=Coalesce(Subquery(comments.annotate(c=Count('pk')).values('c')), 0),
+            )
+            .values('owner_id', 'can_access', 'updated_at', 'member_count', 'tasks_changed',
+                    'task_count', 'comments_changed', 'comment_count'))
+
+
+def board_etag(request, state):
+    return make_etag(request, 'board', *(value for key, value in state.items() if key != 'can_access'))
+
+
+def task_list_etag(request, tasks, *parts):
+    """
+    ETag for a task list (assigned-to-me / reviewing), from one aggregate
+    over the tasks and their comments, plus any extra version parts.
+    """
+    state = tasks.aggregate(**task_list_state())
+    return make_etag(request, 'tasks', *state.values(), *parts)
+
+
+async def atask_list_etag(request, tasks):
+    state = await tasks.aaggregate(**task_list_state())
+    return make_etag(request, 'tasks', *state.values())
+
+
+def task_list_state():
+    return {
+        'tasks_changed': Max('updated_at'),
+        'task_count': Count('id', distinct=True),
+        'comments_changed': Max('comments__updated_at'),
+        'comment_count': Count('comments'),
+    }
@@ -0,0 +1,209 @@
+"""
+Read-only fast path for the hot response shapes.
+
+Produces the same data as BoardDetailSerializer, TaskSerializer /
+TaskAssignOrReviewerSerializer and CommentResponseSerializer, but builds
+plain dicts from .values() rows instead of going through DRF's field
+machinery per object:
+- full names are computed in SQL (Trim(Concat(first_name, ' ', last_name)))
+- every user is loaded once per response and its profile dict is shared
+  by all tasks and comments that reference it
+- assignee/reviewer profiles come from one user query instead of a join
+  per task row
+
+The serializer classes mimic the DRF interface (`Serializer(rows, many=True).data`),
+so they can be handed to the paginators in place of the DRF serializers.
+Output is only ever read, there is no validation or saving.
+"""
+from django.contrib.auth.models import User
+from django.db.models import Count, Exists, OuterRef, Q, Value
+from django.db.models.functions import Concat, Trim
+from rest_framework import serializers
+
+from kanmind_board_app.models import Board, Task
+
+
+TASK_COLUMNS = ('id', 'board_id', 'title', 'description', 'status', 'priority',
+                'due_date', 'assignee_id', 'reviewer_id', 'comments_count', 'version')
+
+FULLNAME = Trim(Concat('first_name', Value(' '), 'last_name'))
+
+datetime_field = serializers.DateTimeField()
+
+
+def user_rows(users):
+    return users.annotate(fullname=FULLNAME).order_by('id').values('id', 'fullname', 'email')
+
+
+def profiles_query(user_ids):
+    user_ids = {user_id for user_id in user_ids if user_id is not None}
+    return user_rows(User.objects.filter(id__in=user_ids)) if user_ids else None
+
+
+def profiles(user_ids):
+    """
+    Return {user_id: profile dict} (UserProfileSerializer shape) in one query.
+    """
+    users = profiles_query(user_ids)
+    return {row['id']: row for row in users} if users is not None else {}
+
+
+async def aprofiles(user_ids):
+    users = profiles_query(user_ids)
+    return {row['id']: row async for row in users} if users is not None else {}
+
+
+def task_rows(tasks, *extra):
+    """
+    .values() rows for a Task queryset, with comments_count.
+    `extra`: further columns, e.g. the ones a cursor paginator orders by.
+    """
+    columns = TASK_COLUMNS + tuple(column for column in extra if column not in TASK_COLUMNS)
+    return tasks.annotate(comments_count=Count('comments')).values(*columns)
+
+
+def task_people(rows):
+    return [row['assignee_id'] for row in rows] + [row['reviewer_id'] for row in rows]
+
+
+def task_data(row, users):
+    return {
+        'id': row['id'],
+        'board': row['board_id'],
+        'title': row['title'],
+        'description': row['description'],
+        'status': row['status'],
+        'priority': row['priority'],
+        'due_date': row['due_date'].isoformat(),
+        'assignee': users.get(row['assignee_id']),
+        'reviewer': users.get(row['reviewer_id']),
+        'comments_count': row['comments_count'],
+        'version': row['version'],
+    }
+
+
+def comment_data(row, users):
+    return {
+        'id': row['id'],
+        'author': row['author_name'],
+        'content': row['content'],
+        'created_at': datetime_field.to_representation(row['created_at']),
+    }
+
+
+class FastSerializer:
+    """
+    Serializer-like wrapper: `FastSerializer(rows, many=True).data`.
+    `instance`: .values() rows as produced by `rows()`, or one such row.
+    """
+
+    def __init__(self, instance, many=False):
+        self.instance = instance
+        self.many = many
+
+    @property
+    def data(self):
+        rows = list(self.instance) if self.many else [self.instance]
+        data = self.build(rows, profiles(self.people(rows)))
+        return data if self.many else data[0]
+
+    @classmethod
+    async def adata(cls, queryset):
+        """
+        List output for a queryset, evaluated with the async ORM.
+        """
+        rows = [row async for row in cls.rows(queryset)]
+        return cls.build(rows, await aprofiles(cls.people(rows)))
+
+    @classmethod
+    def build(cls, rows, users):
+        return [cls.item(row, users) for row in rows]
+
+
+class FastTaskSerializer(FastSerializer):
+    """
+    Output of TaskSerializer / TaskAssignOrReviewerSerializer.
+    """
+    rows = staticmethod(task_rows)
+    people = staticmethod(task_people)
+    item = staticmethod(task_data)
+
+
+class FastCommentSerializer(FastSerializer):
+    """
+    Output of CommentResponseSerializer. The author is only a name,
+    so it is joined into the comment row instead of loaded separately.
+    """
+    item = staticmethod(comment_data)
+
+    @staticmethod
+    def rows(comments):
+        author_name = Trim(Concat('author__first_name', Value(' '), 'author__last_name'))
+        return comments.values('id', 'content', 'created_at', author_name=author_name)
+
+    @staticmethod
+    def people(rows):
+        return []
+
+
+def board_detail_queries(board_id):
+    """
+    The board and task queries behind board_detail(). The users are
+    queried after the tasks, see board_people().
+    """
+    board = Board.objects.filter(pk=board_id).values('id', 'title', 'owner_id')
+    tasks = task_rows(Task.objects.filter(board_id=board_id).in_column_order())
+    return board, tasks
+
+
+def board_people(board_id, tasks):
+    """
+    Members of the board and everyone assigned or reviewing on the
+    loaded task rows, with an is_member flag. Querying by the ids of
+    the rows already loaded means a task assigned in between cannot
+    refer to a user that is missing from the result. Both sides of
+    the filter are id lists, so the users are looked up by primary key.
+    """
+    memberships = Board.members.through.objects.filter(board_id=board_id)
+    is_member = Exists(memberships.filter(user_id=OuterRef('pk')))
+    people = {user_id for user_id in task_people(tasks) if user_id is not None}
+    return (user_rows(User.objects.filter(Q(id__in=memberships.values('user_id')) | Q(id__in=people)))
+            .annotate(is_member=is_member).values('id', 'fullname', 'email', 'is_member'))
+
+
+def build_board_detail(board, people, tasks):
+    users, members = {}, []
+    for row in people:
+        member = row.pop('is_member')
+        users[row['id']] = row
+        if member:
+            members.append(row)
+    return {
+        'id': board['id'],
+        'title': board['title'],
+        'owner_id': board['owner_id'],
+        'members': members,
+        'tasks': [task_data(row, users) for row in tasks],
+    }
+
+
+def board_detail(board_id):
+    """
+    Output of BoardDetailSerializer for one board,
+    or None if the board does not exist.
+    """
+    board, tasks = board_detail_queries(board_id)
+    board = board.first()
+    if board is None:
+        return None
+    tasks = list(tasks)
+    return build_board_detail(board, list(board_people(board_id, tasks)), tasks)
+
+
+async def aboard_detail(board_id):
+    board, tasks = board_detail_queries(board_id)
+    board = await board.afirst()
+    if board is None:
+        return None
+    tasks = [row async for row in tasks]
+    return build_board_detail(board, [row async for row in board_people(board_id, tasks)], tasks)
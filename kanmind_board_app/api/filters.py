@@ -0,0 +1,196 @@
+"""
+Filtering, ordering and sparse fieldsets for the task list endpoints
+(assigned-to-me / reviewing).
+
+Every filter becomes part of the WHERE clause, and `fields=` narrows
+both the serializer output and the selected columns (only()), so the
+database reads, and the client receives, just what is asked for.
+Without `fields=` the full rows are read with .values() and built by
+api/fast_serializers.
+
+Query params:
+- status, priority: comma separated values
+- board: comma separated board ids
+- due_after, due_before: ISO dates, inclusive
+- overdue: true / false (due before today in TIME_ZONE and not done)
+- ordering: comma separated due_date, priority, status, title,
+  updated_at, id; prefix with - for descending
+- fields: comma separated task fields; id is always included
+"""
+from django.db.models import Case, Count, IntegerField, Q, Value, When
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from rest_framework.exceptions import ValidationError
+
+from kanmind_board_app.models import Task
+
+
+TASK_FIELDS = ('id', 'board', 'title', 'description', 'status', 'priority',
+               'due_date', 'assignee', 'reviewer', 'comments_count', 'version')
+
+ORDERINGS = {
+    'due_date': 'due_date',
+    'priority': 'priority_rank',
+    'status': 'status',
+    'title': 'title',
+    'updated_at': 'updated_at',
+    'id': 'id',
+}
+
+PRIORITY_RANK = Case(
+    When(priority=Task.Priority.high, then=Value(0)),
+    When(priority=Task.Priority.medium, then=Value(1)),
+    When(priority=Task.Priority.low, then=Value(2)),
+    output_field=IntegerField(),
+)
+
+USER_COLUMNS = ('id', 'first_name', 'last_name', 'email')
+
+TRUE_VALUES = ('1', 'true', 'yes')
+FALSE_VALUES = ('0', 'false', 'no')
+
+
+class TaskListParams:
+    """
+    Parsed and validated query params of a task list request.
+    Raises ValidationError (400) for unknown values.
+    """
+
+    def __init__(self, params):
+        self.errors = {}
+        self.status = self.choices(params, 'status', Task.Status.values)
+        self.priority = self.choices(params, 'priority', Task.Priority.values)
+        self.boards = self.integers(params, 'board')
+        self.due_after = self.date(params, 'due_after')
+        self.due_before = self.date(params, 'due_before')
+        self.overdue = self.boolean(params, 'overdue')
+        self.ordering = self.order(params)
+        self.fields = self.field_list(params)
+        if self.errors:
+            raise ValidationError(self.errors)
+
+    def values(self, params, name):
+        return [value.strip() for value in params.get(name, '').split(',') if value.strip()]
+
+    def choices(self, params, name, allowed):
+        values = self.values(params, name)
+        unknown = sorted(set(values) - set(allowed))
+        if unknown:
+            self.errors[name] = f'Unknown value(s): {", ".join(unknown)}. Allowed: {", ".join(allowed)}.'
+        return values
+
+    def integers(self, params, name):
+        try:
+            return [int(value) for value in self.values(params, name)]
+        except ValueError:
+            self.errors[name] = 'Expected comma separated ids.'
+            return []
+
+    def date(self, params, name):
+        value = params.get(name)
+        if not value:
+            return None
+        try:
+            parsed = parse_date(value)
+        except ValueError:
+            parsed = None
+        if parsed is None:
+            self.errors[name] = 'Expected a date as YYYY-MM-DD.'
+        return parsed
+
+    def boolean(self, params, name):
+        value = params.get(name, '').lower()
+        if not value:
+            return None
+        if value not in TRUE_VALUES + FALSE_VALUES:
+            self.errors[name] = 'Expected true or false.'
+            return None
+        return value in TRUE_VALUES
+
+    def order(self, params):
+        ordering = []
+        for value in self.values(params, 'ordering'):
+            name = value.lstrip('-')
+            if name not in ORDERINGS:
+                self.errors['ordering'] = f'Unknown field {name}. Allowed: {", ".join(ORDERINGS)}.'
+                return []
+            ordering.append(('-' if value.startswith('-') else '') + ORDERINGS[name])
+        if ordering and 'id' not in [field.lstrip('-') for field in ordering]:
+            ordering.append('id')
+        return ordering
+
+    def field_list(self, params):
+        if 'fields' not in params:
+            return None
+        fields = self.values(params, 'fields')
+        unknown = sorted(set(fields) - set(TASK_FIELDS))
+        if unknown:
+            self.errors['fields'] = f'Unknown field(s): {", ".join(unknown)}. Allowed: {", ".join(TASK_FIELDS)}.'
+        return [field for field in TASK_FIELDS if field == 'id' or field in fields]
+
+    def filter(self, tasks):
+        """
+        Apply the filters; the result is also what the ETag is computed from.
+        """
+        if self.status:
+            tasks = tasks.filter(status__in=self.status)
+        if self.priority:
+            tasks = tasks.filter(priority__in=self.priority)
+        if self.boards:
+            tasks = tasks.filter(board_id__in=self.boards)
+        if self.due_after:
+            tasks = tasks.filter(due_date__gte=self.due_after)
+        if self.due_before:
+            tasks = tasks.filter(due_date__lte=self.due_before)
+        if self.overdue is not None:
+            overdue = Q(due_date__lt=timezone.localdate()) & ~Q(status=Task.Status.done)
+            tasks = tasks.filter(overdue if self.overdue else ~overdue)
+        return tasks
+
+    def etag_parts(self):
+        """
+        `overdue` depends on today's date, not only on the data.
+        """
+        return (timezone.localdate(),) if self.overdue is not None else ()
+
+    def select(self, tasks):
+        """
+        Join, annotate, order and load only what the requested fields need.
+        """
+        fields = self.fields or TASK_FIELDS
+        related = [name for name in ('assignee', 'reviewer') if name in fields]
+        if related:
+            tasks = tasks.select_related(*related)
+        if 'comments_count' in fields:
+            tasks = tasks.annotate(comments_count=Count('comments'))
+        tasks = self.apply_ordering(tasks)
+        if self.fields is not None:
+            columns = {field for field in fields if field != 'comments_count'}
+            columns |= set(self.ordering_columns())
+            columns |= {f'{name}__{column}' for name in related for column in USER_COLUMNS}
+            tasks = tasks.only(*columns)
+        return tasks
+
+    def ranks_priority(self):
+        return any(field.lstrip('-') == 'priority_rank' for field in self.ordering)
+
+    def ordering_columns(self):
+        """
+        Model columns the ordering reads; the priority rank is computed from priority.
+        """
+        return [field.lstrip('-') for field in self.ordering if field.lstrip('-') != 'priority_rank'] + (
+            ['priority'] if self.ranks_priority() else [])
+
+    def apply_ordering(self, tasks):
+        """
+        Apply the requested ordering, annotating the priority rank if needed.
+        Works for model and .values() querysets.
+        """
+        if self.ranks_priority():
+            tasks = tasks.annotate(priority_rank=PRIORITY_RANK)
+        if self.ordering:
+            tasks = tasks.order_by(*self.ordering)
+        return tasks
+
+    def pagination_ordering(self):
+        return tuple(self.ordering) if self.ordering else None
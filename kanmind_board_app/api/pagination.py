@@ -0,0 +1,131 @@
+import json
+
+from django.conf import settings
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+
+from kanmind.middleware import timed
+
+
+class KeysetPagination(CursorPagination):
+    """
+    Opt-in keyset (cursor) pagination ordered by id.
+    Pages are selected with `WHERE id > <cursor>` instead of OFFSET,
+    so deep pages cost the same as the first one.
+    Query params:
+    - cursor: opaque cursor taken from `next` / `previous`
+    - page_size: number of items per page (capped by max_page_size)
+
+    DRF's CursorPagination only filters on the first ordering field and
+    skips rows that tie on it with an offset. Here the cursor holds the
+    values of every ordering field of the row it points at, and pages
+    are filtered with a tuple comparison on all of them, so orderings
+    with many ties (e.g. by priority) page without offsets too. The
+    ordering must end with a unique field and use non-null fields only.
+    """
+    ordering = 'id'
+    page_size = getattr(settings, 'KANMIND_PAGE_SIZE', 50)
+    max_page_size = getattr(settings, 'KANMIND_MAX_PAGE_SIZE', 200)
+    page_size_query_param = 'page_size'
+
+    def is_requested(self, request):
+        """
+        Pagination is only applied when the client asks for it,
+        so existing clients keep getting plain lists.
+        """
+        params = request.query_params
+        return self.cursor_query_param in params or self.page_size_query_param in params
+
+    def paginate_queryset(self, queryset, request, view=None):
+        cursor = CursorPagination.decode_cursor(self, request)
+        ordering = self.get_ordering(request, queryset, view)
+        key = self.decode_key(cursor, ordering)
+        if key is not None:
+            queryset = queryset.filter(self.keyset_filter(ordering, key, cursor.reverse))
+        page = super().paginate_queryset(queryset, request, view)
+        # DRF derives these from the cursor position, which decode_cursor() hides from it.
+        if key is not None and cursor.reverse:
+            self.has_next, self.next_position = True, cursor.position
+        elif key is not None:
+            self.has_previous, self.previous_position = True, cursor.position
+        return page
+
+    def decode_cursor(self, request):
+        """
+        The cursor without its position, so DRF does not filter on the
+        first ordering field; paginate_queryset() filters on the key.
+        """
+        cursor = super().decode_cursor(request)
+        return cursor._replace(position=None) if cursor is not None else None
+
+    def decode_key(self, cursor, ordering):
+        if cursor is None or cursor.position is None:
+            return None
+        try:
+            key = json.loads(cursor.position)
+        except ValueError:
+            key = None
+        if not isinstance(key, list) or len(key) != len(ordering):
+            raise NotFound(self.invalid_cursor_message)
+        return key
+
+    def keyset_filter(self, ordering, key, reverse):
+        """
+        Rows after `key` in the ordering (before it when paging backwards):
+        (a > x) OR (a = x AND b > y) OR (a = x AND b = y AND c > z) ...
+        """
+        after, equal = None, Q()
+        for field, value in zip(ordering, key):
+            name = field.lstrip('-')
+            lookup = 'lt' if field.startswith('-') != reverse else 'gt'
+            step = equal & Q(**{f'{name}__{lookup}': value})
+            after = step if after is None else after | step
+            equal &= Q(**{name: value})
+        return after
+
+    def _get_position_from_instance(self, instance, ordering):
+        values = [instance[field.lstrip('-')] if isinstance(instance, dict) else getattr(instance, field.lstrip('-'))
+                  for field in ordering]
+        return json.dumps([str(value) for value in values])
+
+
+def ordered_keyset_pagination(ordering):
+    """
+    KeysetPagination over a custom ordering (ending with a unique field).
+    """
+    return type('OrderedKeysetPagination', (KeysetPagination,), {'ordering': ordering})
+
+
+class CommentKeysetPagination(KeysetPagination):
+    """
+    Keyset pagination for comments in (created_at, id) order.
+    """
+    ordering = ('created_at', 'id')
+
+
+def paginated_response(request, queryset, serializer_class, view, pagination_class=KeysetPagination):
+    """
+    Return a paginated Response when the request opts in,
+    otherwise None so the view falls back to its plain list.
+    """
+    paginator = pagination_class()
+    if not paginator.is_requested(request):
+        return None
+    page = paginator.paginate_queryset(queryset, request, view=view)
+    with timed('serializer'):
+        data = serializer_class(page, many=True).data
+    return paginator.get_paginated_response(data)
+
+
+class RankedPagination(PageNumberPagination):
+    """
+    Page number pagination for ranked results (search), which
+    have no stable key to paginate by.
+    Query params:
+    - page: 1-based page number
+    - page_size: number of items per page (capped by max_page_size)
+    """
+    page_size = getattr(settings, 'KANMIND_PAGE_SIZE', 50)
+    max_page_size = getattr(settings, 'KANMIND_MAX_PAGE_SIZE', 200)
+    page_size_query_param = 'page_size'
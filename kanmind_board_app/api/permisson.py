@@ -1,4 +1,5 @@
 from rest_framework.permissions import BasePermission, SAFE_METHODS
+from .access import can_access_board, is_board_member
 
 class isMember(BasePermission):
 
@@ -18,7 +19,7 @@ class isMember(BasePermission):
         """
         if request.method in SAFE_METHODS:
             return True
-        return request.user in obj.members.all()
+        return is_board_member(request, obj.pk)
     
 
 
@@ -31,7 +32,7 @@ class isBoardOwnerorMember(BasePermission):
         """
         if request.method in SAFE_METHODS:
             return True
-        return request.user == obj.owner or request.user in obj.members.all()
+        return bool(can_access_board(request, obj.pk))
         
 
 class isAssigneeOrReviewer(BasePermission):
@@ -0,0 +1,84 @@
+"""
+Faster drop-in replacement for DRF's JSONRenderer.
+
+Enabled in REST_FRAMEWORK['DEFAULT_RENDERER_CLASSES']. The bytes are the
+same as JSONRenderer's (compact separators, unescaped unicode, U+2028 and
+U+2029 escaped, datetimes as ISO 8601 with "Z" for UTC):
+- orjson, when installed, encodes dicts, lists, strings, numbers, dates
+  and datetimes natively; everything else (Decimal, lazy strings,
+  timedelta, ...) goes through DRF's encoder as a default hook
+- without orjson, one stdlib encoder is built per renderer class and
+  reused, instead of a new one per response
+Pretty printing (`indent`, browsable API) and anything orjson rejects
+(e.g. integers above 64 bits) are rendered by JSONRenderer itself. So
+are the responses of views with `renders_floats = True`: orjson writes
+floats differently (1e-7 instead of 1e-07) and NaN as null, where the
+strict JSONRenderer raises.
+"""
+from rest_framework.renderers import JSONRenderer
+from rest_framework.settings import api_settings
+
+from kanmind.middleware import timed
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+ORJSON_OPTIONS = (orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS) if orjson else 0
+
+
+def escape_line_separators(body):
+    return body.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer with the same output, encoded with orjson
+    if available and a reused stdlib encoder otherwise.
+    """
+    use_orjson = orjson is not None
+    _encoder = None
+
+    @classmethod
+    def stdlib_encoder(cls):
+        if cls.__dict__.get('_encoder') is None:
+            cls._encoder = cls.encoder_class(
+                ensure_ascii=cls.ensure_ascii, allow_nan=not cls.strict,
+                separators=(',', ':') if cls.compact else (', ', ': '))
+        return cls._encoder
+
+    @staticmethod
+    def renders_floats(renderer_context):
+        view = (renderer_context or {}).get('view')
+        return getattr(view, 'renders_floats', False)
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        with timed('render'):
+            return self.encode(data, accepted_media_type, renderer_context)
+
+    def encode(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if self.get_indent(accepted_media_type, renderer_context or {}) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+        if self.use_orjson and self.compact and not self.ensure_ascii and not self.renders_floats(renderer_context):
+            try:
+                body = orjson.dumps(data, default=self.stdlib_encoder().default, option=ORJSON_OPTIONS)
+                return escape_line_separators(body)
+            except orjson.JSONEncodeError:
+                return super().render(data, accepted_media_type, renderer_context)
+        body = self.stdlib_encoder().encode(data)
+        return body.replace('\u2028', '\\u2028').replace('\u2029', '\\u2029').encode()
+
+
+def json_renderer():
+    """
+    The configured renderer for the 'json' format, used to render
+    bodies outside of a DRF response (response cache, async views).
+    """
+    for renderer_class in api_settings.DEFAULT_RENDERER_CLASSES:
+        if renderer_class.format == 'json':
+            return renderer_class()
+    return JSONRenderer()
@@ -1,14 +1,38 @@
+from django.db import transaction
 from rest_framework import serializers
-from kanmind_board_app.models import Board, Task, Comment
+from kanmind_board_app.models import Board, Task, Comment, BoardStats
 from users.models import User
 from users.api.seralizers import UserProfileSerializer
 
 
+class BoardListSerializer(serializers.ListSerializer):
+    """
+    List of boards. Boards that have neither with_counts() annotations
+    nor a BoardStats row get their counts from one with_counts() query
+    for all of them, instead of counting board by board.
+    """
+
+    def to_representation(self, data):
+        boards = list(data)
+        missing = {board.id: board for board in boards
+                   if not hasattr(board, 'member_count') and getattr(board, 'stats', None) is None}
+        if missing:
+            counted = Board.objects.filter(id__in=missing).with_counts().values('id', *BoardStats.COUNTERS)
+            for counts in counted:
+                board = missing[counts.pop('id')]
+                for name, value in counts.items():
+                    setattr(board, name, value)
+        return super().to_representation(boards)
+
+
 class BoardSerializer(serializers.ModelSerializer):
     """
     Serializer for representing boards including
     members, owner, and various counts
     (members, tickets, task status).
+    Counts are read from Board.objects.with_counts()
+    annotations or the BoardStats row when present;
+    lists fill in the rest with BoardListSerializer.
     """
     owner_id = serializers.IntegerField(read_only=True)  
     members = serializers.PrimaryKeyRelatedField(queryset=User.objects.all(), write_only=True, many=True)  
@@ -23,18 +47,44 @@ class BoardSerializer(serializers.ModelSerializer):
             'id', 'title', 'members', 'member_count', 'ticket_count',
             'tasks_to_do_count', 'tasks_high_prio_count', 'owner_id'
         ]
+        list_serializer_class = BoardListSerializer
+
+    def stored_count(self, obj, name):
+        """
+        Return a count from the with_counts() annotation or the
+        BoardStats row, or None if neither is loaded.
+        """
+        if hasattr(obj, name):
+            return getattr(obj, name)
+        stats = getattr(obj, 'stats', None)
+        if stats is not None:
+            return getattr(stats, name)
+        return None
 
     def get_member_count(self, obj):
-        return obj.members.count()
+        count = self.stored_count(obj, 'member_count')
+        return obj.members.count() if count is None else count
 
     def get_tasks_to_do_count(self, obj):
-        return obj.tasks.filter(status='to_do').count()
+        count = self.stored_count(obj, 'tasks_to_do_count')
+        return obj.tasks.filter(status='to_do').count() if count is None else count
 
     def get_tasks_high_prio_count(self, obj):
-        return obj.tasks.filter(priority='high').count()
+        count = self.stored_count(obj, 'tasks_high_prio_count')
+        return obj.tasks.filter(priority='high').count() if count is None else count
 
     def get_ticket_count(self, obj):
-        return obj.tasks.count()
+        count = self.stored_count(obj, 'ticket_count')
+        return obj.tasks.count() if count is None else count
+
+    def create(self, validated_data):
+        """
+        Create a Board together with its BoardStats row
+        """
+        with transaction.atomic():
+            board = super().create(validated_data)
+            BoardStats.objects.create(board=board, member_count=board.members.count())
+        return board
 
 
 class TaskSerializer(serializers.ModelSerializer):
@@ -49,15 +99,18 @@ class TaskSerializer(serializers.ModelSerializer):
     reviewer = UserProfileSerializer(read_only=True)  
     id = serializers.IntegerField(read_only=True)
     comments_count = serializers.SerializerMethodField()  
+    version = serializers.IntegerField(read_only=True)
 
     class Meta:
         model = Task
         fields = [
             'id', 'board', 'title', 'description', 'status', 'priority',
-            'assignee_id', 'reviewer_id', 'due_date', 'assignee', 'reviewer', 'comments_count'
+            'assignee_id', 'reviewer_id', 'due_date', 'assignee', 'reviewer', 'comments_count', 'version'
         ]
 
     def get_comments_count(self, obj):
+        if hasattr(obj, 'comments_count'):
+            return obj.comments_count
         return obj.comments.count()
 
     def create(self, validated_data):
@@ -69,11 +122,15 @@ class TaskSerializer(serializers.ModelSerializer):
 
         assignee = User.objects.get(id=assignee_id)
         reviewer = User.objects.get(id=reviewer_id)
-        task = Task.objects.create(
-            **validated_data,
-            assignee=assignee,
-            reviewer=reviewer
-        )
+        with transaction.atomic():
+            status = validated_data.get('status', Task.Status.to_do)
+            task = Task.objects.create(
+                **validated_data,
+                assignee=assignee,
+                reviewer=reviewer,
+                position=Task.objects.end_position(validated_data['board'].id, status),
+            )
+            BoardStats.apply_task_change(task.board_id, after=(task.status, task.priority))
         return task
 
 
@@ -109,6 +166,16 @@ class BoardDetailForPatchSerializer(serializers.ModelSerializer):
         model = Board
         fields = ['id', 'title', 'owner_data', 'members_data', 'members']
 
+    def update(self, instance, validated_data):
+        """
+        Update the board and recount members if they changed
+        """
+        with transaction.atomic():
+            board = super().update(instance, validated_data)
+            if 'members' in validated_data:
+                BoardStats.refresh_members(board)
+        return board
+
 class TaskAssignOrReviewerSerializer(serializers.ModelSerializer):
     """
    Serializes Task objects for list views where a user is:
@@ -118,13 +185,25 @@ class TaskAssignOrReviewerSerializer(serializers.ModelSerializer):
     assignee = UserProfileSerializer(read_only=True)
     reviewer = UserProfileSerializer(read_only=True)
     comments_count = serializers.SerializerMethodField()
+    version = serializers.IntegerField(read_only=True)
 
     class Meta:
         model = Task
         fields = ['id', 'board', 'title', 'description', 'status', 'priority',
-                  'due_date', 'assignee', 'reviewer', 'due_date', 'comments_count']
+                  'due_date', 'assignee', 'reviewer', 'due_date', 'comments_count', 'version']
+
+    def __init__(self, *args, fields=None, **kwargs):
+        """
+        `fields` limits the output to these field names (sparse fieldset).
+        """
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
 
     def get_comments_count(self, obj):
+        if hasattr(obj, 'comments_count'):
+            return obj.comments_count
         return obj.comments.count()
 
 
@@ -132,41 +211,121 @@ class TaskDetailSerializer(serializers.ModelSerializer):
     """
     Detailed serializer for a single task
     with assignees and reviewers as nested user data.
+    `version` is the task's current version on output; on input it is
+    the version the client edited, checked by TaskDetailView.patch.
     """
     assignee_id = serializers.IntegerField(write_only=True)
     reviewer_id = serializers.IntegerField(write_only=True)
     assignee = UserProfileSerializer(read_only=True)
     reviewer = UserProfileSerializer(read_only=True)
+    version = serializers.IntegerField(min_value=1, required=False)
 
     class Meta:
         model = Task
         fields = ['id', 'title', 'description', 'status', 'priority',
-                  'assignee_id', 'reviewer_id', 'due_date', 'assignee', 'reviewer']
+                  'assignee_id', 'reviewer_id', 'due_date', 'assignee', 'reviewer', 'version']
 
-    def update(self, instance, validated_data):
+    FIELDS = ('title', 'description', 'status', 'priority', 'due_date')
+
+    def validate(self, data):
         """
-        Update a Task including Assignee and Reviewer
+        Check new assignee and reviewer ids with one query,
+        skipping the ones that are not changed.
         """
-        assignee_id = validated_data.pop('assignee_id', None)
-        reviewer_id = validated_data.pop('reviewer_id', None)
+        ids = {data[field] for field in ('assignee_id', 'reviewer_id')
+               if field in data and data[field] != getattr(self.instance, field, None)}
+        self.users = User.objects.in_bulk(ids) if ids else {}
+        errors = {field: 'User does not exist.' for field in ('assignee_id', 'reviewer_id')
+                  if data.get(field) in ids and data[field] not in self.users}
+        if errors:
+            raise serializers.ValidationError(errors)
+        return data
 
-        if assignee_id is not None:
-            assignee = User.objects.get(id=assignee_id)
-            instance.assignee = assignee
+    def update(self, instance, validated_data):
+        """
+        Write only the fields that changed, with save(update_fields=...),
+        and increment the version. Nothing is written if nothing changed.
+        """
+        changed = set()
+        before = (instance.status, instance.priority)
+        for field in self.FIELDS:
+            if field in validated_data and validated_data[field] != getattr(instance, field):
+                if field == 'status':
+                    instance.place(validated_data['status'])
+                    changed.add('position')
+                else:
+                    setattr(instance, field, validated_data[field])
+                changed.add(field)
+        for field in ('assignee', 'reviewer'):
+            user_id = validated_data.get(f'{field}_id')
+            if user_id is not None and user_id != getattr(instance, f'{field}_id'):
+                user = self.users.get(user_id)
+                setattr(instance, field, user if user is not None else User.objects.get(id=user_id))
+                changed.add(field)
+        if not changed:
+            return instance
+
+        instance.version += 1
+        with transaction.atomic():
+            instance.save(update_fields=sorted(changed | {'version', 'updated_at'}))
+            if changed & {'status', 'priority'}:
+                BoardStats.apply_task_change(instance.board_id, before=before, after=(instance.status, instance.priority))
+        return instance
+    
 
-        if reviewer_id is not None:
-            reviewer = User.objects.get(id=reviewer_id)
-            instance.reviewer = reviewer
+class BulkTaskOperationSerializer(serializers.Serializer):
+    """
+    Validates a single operation of a bulk task request.
+    - action: 'create', 'update' or 'delete'
+    - id: Task id, required for update and delete
+    - version: optional for update and delete, the version the client
+      edited; the operation conflicts if the task has changed since
+    - create requires board, title, assignee_id, reviewer_id and due_date
+    """
+    action = serializers.ChoiceField(choices=['create', 'update', 'delete'])
+    id = serializers.IntegerField(required=False)
+    board = serializers.IntegerField(required=False)
+    title = serializers.CharField(max_length=30, required=False)
+    description = serializers.CharField(allow_blank=True, required=False)
+    status = serializers.ChoiceField(choices=Task.Status.choices, required=False)
+    priority = serializers.ChoiceField(choices=Task.Priority.choices, required=False)
+    assignee_id = serializers.IntegerField(required=False)
+    reviewer_id = serializers.IntegerField(required=False)
+    due_date = serializers.DateField(required=False)
+    version = serializers.IntegerField(min_value=1, required=False)
+
+    def validate(self, data):
+        """
+        Check the fields required by each action
+        """
+        if data['action'] == 'create':
+            missing = [field for field in ('board', 'title', 'assignee_id', 'reviewer_id', 'due_date') if field not in data]
+            if missing:
+                raise serializers.ValidationError({field: 'This field is required.' for field in missing})
+        else:
+            if 'id' not in data:
+                raise serializers.ValidationError({'id': 'This field is required.'})
+            if 'board' in data:
+                raise serializers.ValidationError({'board': 'The board of a task cannot be changed.'})
+        return data
+
+
+class TaskMoveSerializer(serializers.Serializer):
+    """
+    Validates a move of a task within its board.
+    - status: target column, defaults to the current one
+    - after_id / before_id: place the task directly after / before
+      this task of the target column; without either it goes to the end
+    """
+    status = serializers.ChoiceField(choices=Task.Status.choices, required=False)
+    after_id = serializers.IntegerField(required=False, allow_null=True)
+    before_id = serializers.IntegerField(required=False, allow_null=True)
 
-        instance.title = validated_data.get('title', instance.title)
-        instance.description = validated_data.get('description', instance.description)
-        instance.status = validated_data.get('status', instance.status)
-        instance.priority = validated_data.get('priority', instance.priority)
-        instance.due_date = validated_data.get('due_date', instance.due_date)
+    def validate(self, data):
+        if data.get('after_id') is not None and data.get('before_id') is not None:
+            raise serializers.ValidationError('Give either after_id or before_id, not both.')
+        return data
 
-        instance.save()
-        return instance
-    
 
 class CommentResponseSerializer(serializers.ModelSerializer):
     """
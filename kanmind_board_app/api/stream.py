@@ -0,0 +1,189 @@
+"""
+Server-Sent Events stream of board changes.
+
+This is a plain async Django view rather than a DRF APIView, so the
+connection is held open on the ASGI event loop instead of a worker
+thread. Serve it with an ASGI server (kanmind.asgi:application); under
+WSGI the endless stream would pin a worker for good, so it answers 501.
+
+EventSource cannot send headers, so browsers authenticate with a stream
+ticket (POST /api/boards/{id}/events/ticket/) in ?ticket= instead of
+putting their API token in the URL. A ticket is signed, valid for one
+board and expires after KANMIND_EVENTS['TICKET_MAX_AGE'] seconds; it is
+only checked when connecting. Access is checked again while the stream
+is open, so removed members stop receiving events.
+"""
+import json
+import time
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import User
+from django.core import signing
+from django.core.handlers.asgi import ASGIRequest
+from django.http import JsonResponse, StreamingHttpResponse
+from rest_framework.exceptions import AuthenticationFailed
+
+from kanmind_board_app import events
+from kanmind_board_app.models import BoardChange
+from users.api.authentication import CachingTokenAuthentication
+from . import access
+
+
+TICKET_SALT = 'kanmind.events.ticket'
+
+
+def issue_ticket(user_id, board_id):
+    """
+    Signed, timestamped ticket that lets the user open the event stream of one board.
+    """
+    return signing.dumps({'user': user_id, 'board': board_id}, salt=TICKET_SALT)
+
+
+def read_ticket(ticket, board_id, max_age):
+    """
+    Return the user id of a valid, unexpired ticket for the board, else None.
+    """
+    try:
+        data = signing.loads(ticket, salt=TICKET_SALT, max_age=max_age)
+    except signing.BadSignature:
+        return None
+    if data.get('board') != board_id:
+        return None
+    return data.get('user')
+
+
+def get_token_key(request):
+    """
+    Token from the Authorization header.
+    """
+    header = request.headers.get('Authorization', '').split()
+    if len(header) == 2 and header[0].lower() == 'token':
+        return header[1]
+    return None
+
+
+async def authenticate(request, board_id, options):
+    key = get_token_key(request)
+    if key:
+        try:
+            user, token = await CachingTokenAuthentication().aauthenticate_credentials(key)
+        except AuthenticationFailed:
+            return None
+        return user
+    ticket = request.GET.get('ticket')
+    user_id = read_ticket(ticket, board_id, options['TICKET_MAX_AGE']) if ticket else None
+    if user_id is None:
+        return None
+    return await User.objects.filter(pk=user_id, is_active=True).afirst()
+
+
+def affects_access(event, user):
+    """
+    Whether an event may have changed the user's access: their
+    membership was removed, or the board (e.g. its owner) changed.
+    """
+    if event is None or event is events.OVERFLOW:
+        return False
+    if event['kind'] == BoardChange.Kind.member:
+        return event['action'] == BoardChange.Action.delete and event['object_id'] == user.pk
+    return event['kind'] == BoardChange.Kind.board and event['action'] == BoardChange.Action.upsert
+
+
+async def still_allowed(user, board_id):
+    return bool(await access.access_flag(user, board_id).afirst())
+
+
+def format_event(event):
+    lines = [f'event: {event["kind"]}.{event["action"]}']
+    if event.get('id'):
+        lines.append(f'id: {event["id"]}')
+    lines.append(f'data: {json.dumps(event)}')
+    return '\n'.join(lines) + '\n\n'
+
+
+def load_missed_changes(board_id, since, limit):
+    return list(BoardChange.objects.filter(board_id=board_id, id__gt=since).order_by('id')[:limit + 1])
+
+
+async def board_events(request, pk):
+    """
+    GET:
+    - Streams the task, comment, member and board changes of a board
+      as text/event-stream. The event id is the sync cursor of
+      /api/boards/{id}/changes/.
+    - Reconnecting with Last-Event-ID (or ?since=) replays missed
+      changes; if too many were missed a `resync.required` event
+      tells the client to resync through the changes endpoint.
+    - Authenticated with the Authorization header or ?ticket=
+    - An `access.revoked` event ends the stream when the user loses access
+    - 501 when not served through ASGI
+    Access rights: Only board owners or members.
+    """
+    if not isinstance(request, ASGIRequest):
+        return JsonResponse({'detail': 'The event stream is only served through ASGI.'}, status=501)
+    options = events.get_options()
+    request.user = await authenticate(request, pk, options)
+    if request.user is None:
+        return JsonResponse({'detail': 'Authentication credentials were not provided.'}, status=401)
+
+    can_access = await access.acan_access_board(request, pk)
+    if can_access is None:
+        return JsonResponse({'detail': 'No Board matches the given query.'}, status=404)
+    if not can_access:
+        return JsonResponse({'message': 'Forbidden. Only owner or members can access this board.'}, status=403)
+
+    try:
+        since = int(request.headers.get('Last-Event-ID') or request.GET.get('since') or 0)
+    except ValueError:
+        return JsonResponse({'detail': 'since must be an integer.'}, status=400)
+
+    response = StreamingHttpResponse(stream(pk, request.user, since, options), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+async def stream(board_id, user, since, options):
+    """
+    Subscribe before replaying, so nothing published in between is lost;
+    live events already sent by the replay are skipped by id. Access is
+    checked again after events that may revoke it and at least every
+    RECHECK seconds.
+    """
+    subscription = events.get_broker().subscribe(board_id)
+    resync = {'kind': 'resync', 'action': 'required', 'board': board_id}
+    revoked = {'kind': 'access', 'action': 'revoked', 'board': board_id}
+    try:
+        yield f'retry: {options["RETRY_MS"]}\n\n'
+        last_id = since
+        if since:
+            limit = options['QUEUE_SIZE']
+            missed = await sync_to_async(load_missed_changes)(board_id, since, limit)
+            if len(missed) > limit:
+                yield format_event(resync)
+                return
+            for change in missed:
+                yield format_event(events.change_event(change))
+                last_id = change.id
+
+        checked = time.monotonic()
+        while True:
+            event = await subscription.get(timeout=options['KEEPALIVE'])
+            if affects_access(event, user) or time.monotonic() - checked >= options['RECHECK']:
+                checked = time.monotonic()
+                if not await still_allowed(user, board_id):
+                    yield format_event(revoked)
+                    return
+            if event is None:
+                yield ': keepalive\n\n'
+                continue
+            if event is events.OVERFLOW:
+                yield format_event(resync)
+                return
+            if event['id'] is not None and event['id'] <= last_id:
+                continue
+            yield format_event(event)
+            if event['kind'] == BoardChange.Kind.board and event['action'] == BoardChange.Action.delete:
+                return
+    finally:
+        subscription.close()
@@ -1,14 +1,36 @@
+from django.conf import settings
 from django.urls import path
-from .views import BoardsView, BoardDetailView, EmailCheckView, TaskCreateView, TaskAssignView, TaskReviewView,TaskDetailView, CommentView, CommentDeleteView
+from .stream import board_events
+from .views import BoardsView, BoardDetailView, BoardExportView, BoardImportView, BoardChangesView, BoardEventsTicketView, EmailCheckView, TaskCreateView, TaskAssignView, TaskReviewView,TaskDetailView, CommentView, CommentDeleteView, TaskBulkView, TaskSearchView, TaskSummaryView, TaskMoveView
+from . import async_views
+
+# Under ASGI, KANMIND_ASYNC_VIEWS serves the read-heavy GETs from async views.
+if getattr(settings, 'KANMIND_ASYNC_VIEWS', False):
+    boards_view, board_detail_view = async_views.boards, async_views.board_detail
+    assigned_view, reviewing_view = async_views.assigned_tasks, async_views.reviewing_tasks
+    comments_view = async_views.task_comments
+else:
+    boards_view, board_detail_view = BoardsView.as_view(), BoardDetailView.as_view()
+    assigned_view, reviewing_view = TaskAssignView.as_view(), TaskReviewView.as_view()
+    comments_view = CommentView.as_view()
 
 urlpatterns = [
- path('boards/',BoardsView.as_view(), name='boards-list-create'),
- path('boards/<int:pk>/',BoardDetailView.as_view(), name='board-detail'),
+ path('boards/',boards_view, name='boards-list-create'),
+ path('boards/import/', BoardImportView.as_view(), name='board-import'),
+ path('boards/<int:pk>/',board_detail_view, name='board-detail'),
+ path('boards/<int:pk>/changes/', BoardChangesView.as_view(), name='board-changes'),
+ path('boards/<int:pk>/events/', board_events, name='board-events'),
+ path('boards/<int:pk>/events/ticket/', BoardEventsTicketView.as_view(), name='board-events-ticket'),
+ path('boards/<int:pk>/export/', BoardExportView.as_view(), name='board-export'),
  path('email-check/', EmailCheckView.as_view(), name='email-check'),
  path('tasks/', TaskCreateView.as_view(), name='task-create'),
- path('tasks/assigned-to-me/', TaskAssignView.as_view() , name='tasks-assigned-to-me'),
- path('tasks/reviewing/', TaskReviewView.as_view() , name='tasks-reviewing'),
+ path('tasks/bulk/', TaskBulkView.as_view(), name='tasks-bulk'),
+ path('tasks/assigned-to-me/', assigned_view , name='tasks-assigned-to-me'),
+ path('tasks/reviewing/', reviewing_view , name='tasks-reviewing'),
+ path('tasks/search/', TaskSearchView.as_view(), name='tasks-search'),
+ path('tasks/summary/', TaskSummaryView.as_view(), name='tasks-summary'),
  path('tasks/<int:pk>/', TaskDetailView.as_view() , name='task-detail'),
- path('tasks/<int:pk>/comments/', CommentView.as_view() , name='comments'),
+ path('tasks/<int:pk>/move/', TaskMoveView.as_view(), name='task-move'),
+ path('tasks/<int:pk>/comments/', comments_view , name='comments'),
  path('tasks/<int:task_id>/comments/<int:comment_id>/', CommentDeleteView.as_view() , name='comment-delete'),
 ]
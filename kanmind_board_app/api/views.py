@@ -1,18 +1,37 @@
 from .seralizers import (
-    BoardSerializer, BoardDetailSerializer, TaskSerializer, TaskAssignOrReviewerSerializer,
+    BoardSerializer, TaskSerializer, TaskAssignOrReviewerSerializer,
     TaskDetailSerializer, CommentSerializer, BoardDetailForPatchSerializer,
-    CommentResponseSerializer
+    CommentResponseSerializer, BulkTaskOperationSerializer, TaskMoveSerializer
 )
-from kanmind_board_app.models import Board, Task, Comment
+from kanmind_board_app.models import Board, Task, Comment, BoardStats, ImportJob, BoardChange
+from kanmind_board_app import events, response_cache, search
+from kanmind_board_app.signals import invalidate_board
+from kanmind_board_app.export import aiter_board_ndjson, iter_board_ndjson
+from .stream import issue_ticket
+from kanmind_board_app.importer import BoardImporter, BoardImportError, iter_records
 from rest_framework.views import APIView
 from rest_framework import generics
 from rest_framework.permissions import IsAuthenticated
+from users.api.seralizers import UserProfileSerializer
 from .permisson import isMember, isAssigneeOrReviewer, isBoardOwnerorMember
+from .pagination import (
+    paginated_response, ordered_keyset_pagination, KeysetPagination, CommentKeysetPagination, RankedPagination
+)
+from .filters import TaskListParams
+from . import conditional, access, fast_serializers
 from rest_framework.response import Response
 from rest_framework import status
 from django.shortcuts import get_object_or_404
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
 from django.contrib.auth.models import User
-from django.db.models import Q
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from functools import partial
+from kanmind.middleware import timed
+from datetime import timedelta
 
 
 
@@ -29,13 +48,33 @@ class BoardsView(APIView):
         GET:
         - Returns boards where the user is owner or member.
         - Includes counts: members, tasks, tasks to do, high-priority tasks.
+        - Counts are read from the joined BoardStats row,
+          so the list is loaded in one query; boards without
+          one are counted together in a second query.
+        - Optional keyset pagination via `cursor` / `page_size`.
         """
-        boards = Board.objects.filter(Q(members=request.user) | Q(owner=request.user)).distinct()
-        serializer = BoardSerializer(boards, many=True)
-
-        if not serializer.data:
+        boards = Board.objects.visible_to(request.user).select_related('stats')
+        paginated = paginated_response(request, boards, BoardSerializer, self)
+        if paginated is not None:
+            return paginated
+
+        cacheable = response_cache.is_cacheable(request)
+        if cacheable:
+            cache_key = response_cache.board_list_key(request.user.id)
+            body = response_cache.get_cache().get(cache_key)
+            if body is not None:
+                return response_cache.json_response(body)
+
+        with response_cache.filling(cacheable), timed('serializer'):
+            data = BoardSerializer(boards, many=True).data
+
+        if not data:
             return Response({'message': 'No boards found or not authorized.'}, status=status.HTTP_401_UNAUTHORIZED)
-        return Response(serializer.data)
+        if cacheable:
+            body = response_cache.render(data)
+            response_cache.get_cache().set(cache_key, body, response_cache.get_timeout())
+            return response_cache.json_response(body)
+        return Response(data)
 
     def post(self, request):
         """
@@ -63,14 +102,49 @@ class BoardDetailView(APIView):
          GET:
         - (includes full tasks list)
         - Returns board details with members and tasks.
+        - Access and ETag come from one query, the body is built
+          from three more by api/fast_serializers.board_detail.
+        - The rendered response is cached per board version,
+          together with the ids needed for the access check.
+          Responses that get cached are read from the primary.
+        - Sends a strong ETag and answers If-None-Match with 304.
         """
-        board = get_object_or_404(Board, pk=pk)
-
-        if request.user != board.owner and request.user not in board.members.all():
-            return Response({'message': 'Forbidden. Only owner or members can access this board.'}, status=status.HTTP_403_FORBIDDEN)
-
-        serializer = BoardDetailSerializer(board)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        forbidden = Response({'message': 'Forbidden. Only owner or members can access this board.'}, status=status.HTTP_403_FORBIDDEN)
+
+        cacheable = response_cache.is_cacheable(request)
+        if cacheable:
+            cache_key = response_cache.board_detail_key(pk)
+            entry = response_cache.get_cache().get(cache_key)
+            if entry is not None:
+                if request.user.id != entry['owner_id'] and request.user.id not in entry['member_ids']:
+                    return forbidden
+                not_modified = conditional.not_modified(request, entry['etag'])
+                if not_modified is not None:
+                    return not_modified
+                return conditional.with_etag(response_cache.json_response(entry['body']), entry['etag'])
+
+        with response_cache.filling(cacheable):
+            state = conditional.board_state(pk, request.user)
+            if state is None:
+                return Response({'detail': 'No Board matches the given query.'}, status=status.HTTP_404_NOT_FOUND)
+            if not state['can_access']:
+                return forbidden
+            etag = conditional.board_etag(request, state)
+            not_modified = conditional.not_modified(request, etag)
+            if not_modified is not None:
+                return not_modified
+            with timed('serializer'):
+                data = fast_serializers.board_detail(pk)
+
+        if data is None:
+            return Response({'detail': 'No Board matches the given query.'}, status=status.HTTP_404_NOT_FOUND)
+        if cacheable:
+            body = response_cache.render(data)
+            member_ids = {member['id'] for member in data['members']}
+            entry = {'owner_id': data['owner_id'], 'member_ids': member_ids, 'body': body, 'etag': etag}
+            response_cache.get_cache().set(cache_key, entry, response_cache.get_timeout())
+            return conditional.with_etag(response_cache.json_response(body), etag)
+        return conditional.with_etag(Response(data, status=status.HTTP_200_OK), etag)
 
     def patch(self, request, pk):
         """
@@ -78,9 +152,9 @@ class BoardDetailView(APIView):
         - Update optional fields: `title`, `members` (IDs)
         - Response includes read-only: `owner_data`, `members_data`
         """
-        board = get_object_or_404(Board, pk=pk)
+        board = get_object_or_404(Board.objects.annotate(can_access=access.board_access(request.user)), pk=pk)
 
-        if request.user != board.owner and request.user not in board.members.all():
+        if not board.can_access:
             return Response({'message': 'Forbidden. Only owner or members can update this board.'}, status=status.HTTP_403_FORBIDDEN)
 
         serializer = BoardDetailForPatchSerializer(board, data=request.data, partial=True)
@@ -97,7 +171,7 @@ class BoardDetailView(APIView):
         """ 
         board = get_object_or_404(Board, pk=pk)
 
-        if request.user != board.owner:
+        if request.user.id != board.owner_id:
             return Response({'message': 'Forbidden. Only owner can delete this board.'}, status=status.HTTP_403_FORBIDDEN)
 
         board.delete()
@@ -105,6 +179,203 @@ class BoardDetailView(APIView):
 
 
 
+class BoardChangesView(APIView):
+    """
+    Incremental sync of a board.
+    Access rights: Only board owners or members.
+    """
+    permission_classes = [IsAuthenticated]
+    max_changes = 500
+
+    def get(self, request, pk):
+        """
+        GET:
+        - Query param: `since` (cursor from the previous response)
+        - Without `since` returns a full snapshot and the current cursor
+        - Otherwise returns the tasks, comments and members changed after
+          the cursor, and tombstones (ids) for deleted ones
+        - `limit` (1 to max_changes): at most this many changes;
+          `has_more` is true when more are pending
+        - Changes younger than KANMIND_SYNC_LAG seconds are left for the
+          next poll: their ids were assigned at insert, so a transaction
+          still in flight may yet commit a lower id.
+        - A cursor from before the pruned part of the change log (see
+          prune_board_changes) gets a full snapshot with `reset` true
+        """
+        can_access = access.can_access_board(request, pk)
+        if can_access is None:
+            return Response({'detail': 'No Board matches the given query.'}, status=status.HTTP_404_NOT_FOUND)
+        if not can_access:
+            return Response({'message': 'Forbidden. Only owner or members can access this board.'}, status=status.HTTP_403_FORBIDDEN)
+        try:
+            since = int(request.query_params.get('since', 0))
+            limit = int(request.query_params.get('limit', self.max_changes))
+        except ValueError:
+            return Response({'detail': 'since and limit must be integers.'}, status=400)
+        if limit < 1:
+            return Response({'detail': 'limit must be at least 1.'}, status=400)
+        limit = min(limit, self.max_changes)
+
+        settled_before = timezone.now() - timedelta(seconds=getattr(settings, 'KANMIND_SYNC_LAG', 0))
+        board_changes = BoardChange.objects.filter(board_id=pk)
+        oldest = BoardChange.oldest_id()
+        reset = since > 0 and oldest is not None and since < oldest - 1
+        if since <= 0 or reset:
+            unsettled = (board_changes.filter(created_at__gt=settled_before)
+                         .order_by('id').values_list('id', flat=True).first())
+            if unsettled is not None:
+                cursor = unsettled - 1
+            else:
+                cursor = board_changes.order_by('-id').values_list('id', flat=True).first() or 0
+            return Response(self.payload(
+                pk, cursor, False,
+                task_ids=Task.objects.filter(board_id=pk).values_list('id', flat=True),
+                comment_ids=Comment.objects.filter(task__board_id=pk).values_list('id', flat=True),
+                member_ids=Board.members.through.objects.filter(board_id=pk).values_list('user_id', flat=True),
+                board_changed=True, reset=reset,
+            ))
+
+        rows = list(board_changes.filter(id__gt=since).order_by('id')
+                    .values_list('id', 'kind', 'object_id', 'action', 'created_at')[:limit + 1])
+        settled = next((index for index, row in enumerate(rows) if row[4] > settled_before), len(rows))
+        has_more = settled > limit
+        changes = rows[:min(settled, limit)]
+        latest = {}
+        for change_id, kind, object_id, action, created_at in changes:
+            latest[(kind, object_id)] = action
+        upserts = {kind: [] for kind in BoardChange.Kind.values}
+        deleted = {kind: [] for kind in BoardChange.Kind.values}
+        for (kind, object_id), action in latest.items():
+            (upserts if action == BoardChange.Action.upsert else deleted)[kind].append(object_id)
+
+        return Response(self.payload(
+            pk, changes[-1][0] if changes else since, has_more,
+            task_ids=upserts['task'], comment_ids=upserts['comment'], member_ids=upserts['member'],
+            board_changed=bool(upserts['board']), deleted=deleted,
+        ))
+
+    def payload(self, pk, cursor, has_more, task_ids, comment_ids, member_ids, board_changed, deleted=None,
+                reset=False):
+        """
+        Load the current state of the changed objects. Objects that
+        no longer exist are reported as deleted.
+        """
+        deleted = deleted or {kind: [] for kind in BoardChange.Kind.values}
+        tasks = list(Task.objects.with_profiles().filter(board_id=pk, id__in=list(task_ids)))
+        comments = list(Comment.objects.select_related('author').filter(task__board_id=pk, id__in=list(comment_ids)))
+        members = list(User.objects.filter(boards_member=pk, id__in=list(member_ids)))
+        for kind, requested, found in (('task', task_ids, tasks), ('comment', comment_ids, comments),
+                                       ('member', member_ids, members)):
+            deleted[kind] += sorted(set(requested) - {obj.id for obj in found})
+
+        board = Board.objects.filter(pk=pk).values('id', 'title', 'owner_id').first() if board_changed else None
+        with timed('serializer'):
+            return {
+                'cursor': cursor,
+                'has_more': has_more,
+                'reset': reset,
+                'board': board,
+                'tasks': TaskSerializer(tasks, many=True).data,
+                'comments': [dict(data, task=comment.task_id) for comment, data
+                             in zip(comments, CommentResponseSerializer(comments, many=True).data)],
+                'members': UserProfileSerializer(members, many=True).data,
+                'deleted': {'tasks': deleted['task'], 'comments': deleted['comment'], 'members': deleted['member']},
+            }
+
+
+class BoardEventsTicketView(APIView):
+    """
+    Issue a ticket for the board event stream.
+    Access rights: Only board owners or members.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, pk):
+        """
+        POST:
+        - Returns a ticket for /api/boards/{id}/events/?ticket=, valid for
+          this board only and for KANMIND_EVENTS['TICKET_MAX_AGE'] seconds
+        - EventSource cannot send the Authorization header; the ticket keeps
+          the API token out of URLs and server logs
+        """
+        can_access = access.can_access_board(request, pk)
+        if can_access is None:
+            return Response({'detail': 'No Board matches the given query.'}, status=status.HTTP_404_NOT_FOUND)
+        if not can_access:
+            return Response({'message': 'Forbidden. Only owner or members can access this board.'}, status=status.HTTP_403_FORBIDDEN)
+        return Response({'ticket': issue_ticket(request.user.pk, pk),
+                         'expires_in': events.get_options()['TICKET_MAX_AGE']}, status=201)
+
+
+class BoardExportView(APIView):
+    """
+    Export a board with members, tasks and comments.
+    Access rights: Only board owners or members.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, pk):
+        """
+        GET:
+        - Streams the board as NDJSON (one JSON object per line)
+        - Rows are read in chunks, so memory stays flat for large boards;
+          under ASGI the blocks are streamed from an async iterator, as
+          Django would otherwise collect a sync one into a list first
+        """
+        can_access = access.can_access_board(request, pk)
+        if can_access is None:
+            return Response({'detail': 'No Board matches the given query.'}, status=status.HTTP_404_NOT_FOUND)
+        if not can_access:
+            return Response({'message': 'Forbidden. Only owner or members can export this board.'}, status=status.HTTP_403_FORBIDDEN)
+
+        blocks = aiter_board_ndjson(pk) if isinstance(request._request, ASGIRequest) else iter_board_ndjson(pk)
+        response = StreamingHttpResponse(blocks, content_type='application/x-ndjson')
+        response['Content-Disposition'] = f'attachment; filename="board-{pk}.ndjson"'
+        return response
+
+
+class BoardImportView(APIView):
+    """
+    Import boards from an uploaded NDJSON/JSON dump.
+    The authenticated user becomes the owner of all imported boards and
+    tasks and the author of all comments. Members, assignees and reviewers
+    are kept only if they already share a board with the user; a full
+    fidelity import is left to the import_boards command.
+    """
+    permission_classes = [IsAuthenticated]
+    renders_floats = True
+
+    def post(self, request):
+        """
+        POST (multipart):
+        - file: dump in the format of boards/<pk>/export/
+        - batch_size: optional, records per transaction
+        - job: optional id of a failed import to resume with the same file
+        - Returns the job id, counts and throughput
+        """
+        upload = request.FILES.get('file')
+        if upload is None:
+            return Response({'detail': 'file is required.'}, status=400)
+        try:
+            batch_size = min(int(request.data.get('batch_size', 1000)), 5000)
+            job_id = int(request.data['job']) if request.data.get('job') else None
+        except (TypeError, ValueError):
+            return Response({'detail': 'batch_size and job must be integers.'}, status=400)
+
+        if job_id is not None:
+            job = ImportJob.objects.filter(pk=job_id, owner=request.user).first()
+            if job is None:
+                return Response({'detail': 'Import job does not exist.'}, status=404)
+        else:
+            job = ImportJob.objects.create(source=upload.name, owner=request.user)
+
+        try:
+            report = BoardImporter(job, batch_size=batch_size, uploader=request.user).run(iter_records(upload))
+        except BoardImportError as error:
+            return Response({'detail': str(error), 'job': job.pk, 'records_done': job.records_done}, status=400)
+        return Response(report, status=201)
+
+
 class EmailCheckView(APIView):
     """
     Check if provided email matches the authenticated user.
@@ -153,13 +424,14 @@ class TaskCreateView(APIView):
 
         if not isinstance(assignee_id, int) or not isinstance(reviewer_id, int):
             return Response({'detail': 'assignee_id and reviewer_id must be integers.'}, status=400)
-        if not (User.objects.filter(id=assignee_id).exists() and User.objects.filter(id=reviewer_id).exists()):
+        user_ids = {assignee_id, reviewer_id}
+        if User.objects.filter(id__in=user_ids).count() != len(user_ids):
             return Response({'detail': 'Assignee or reviewer does not exist.'}, status=400)
-        if not Board.objects.filter(id=board_id).exists():
-            return Response({'message': 'Board id does not exist'}, status=404)
 
-        board = Board.objects.get(id=board_id)
-        if request.user not in board.members.all() and request.user != board.owner:
+        can_access = access.can_access_board(request, board_id)
+        if can_access is None:
+            return Response({'message': 'Board id does not exist'}, status=404)
+        if not can_access:
             return Response({'message': 'Forbidden. Must be a member or owner of board.'}, status=403)
 
         if serializer.is_valid():
@@ -168,7 +440,199 @@ class TaskCreateView(APIView):
         return Response(serializer.errors, status=400)
 
 
-class TaskAssignView(generics.ListCreateAPIView):
+class TaskBulkView(APIView):
+    """
+    Create, update and delete many tasks in one request.
+    - Only board members or owner can change tasks of a board.
+    - Either all operations are applied or none.
+    """
+    permission_classes = [IsAuthenticated]
+    max_operations = getattr(settings, 'KANMIND_BULK_MAX_OPERATIONS', 500)
+
+    def post(self, request):
+        """
+        POST:
+        - Body: list of operations, see BulkTaskOperationSerializer
+        - Users, boards and tasks are each loaded with one `id__in` query,
+          the tasks locked for the rest of the transaction
+        - Optional `version` per update/delete, checked like in PATCH
+        - Returns one result per operation: index, action, id, status
+          (and the new version of updated tasks), and errors for
+          operations that cannot be applied; 409 if the only errors
+          are version conflicts
+        """
+        serializer = BulkTaskOperationSerializer(data=request.data, many=True, max_length=self.max_operations)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=400)
+        operations = serializer.validated_data
+
+        users = User.objects.in_bulk({op[field] for op in operations
+                                      for field in ('assignee_id', 'reviewer_id') if field in op})
+        with transaction.atomic():
+            # Locked until commit, so `version` and the stats `before`
+            # values are the ones the writes actually replace.
+            tasks = Task.objects.select_for_update().in_bulk({op['id'] for op in operations if op['action'] != 'create'})
+            board_ids = ({op['board'] for op in operations if op['action'] == 'create'}
+                         | {task.board_id for task in tasks.values()})
+            boards = dict(Board.objects.filter(id__in=board_ids)
+                          .annotate(can_access=access.board_access(request.user))
+                          .values_list('id', 'can_access'))
+
+            results = self.check_operations(operations, tasks, users, boards)
+            errors = [result['errors'] for result in results if result['status'] == 'error']
+            if errors:
+                conflict = all(set(error) == {'version'} for error in errors)
+                return Response(results, status=409 if conflict else 400)
+
+            self.apply_operations(request, operations, results, tasks, users)
+        return Response(results, status=200)
+
+    def check_operations(self, operations, tasks, users, boards):
+        """
+        Check every operation against the loaded rows and
+        return the per-item results.
+        """
+        results = []
+        seen_task_ids = set()
+        for index, op in enumerate(operations):
+            errors = {}
+            board_id = op.get('board')
+            if op['action'] != 'create':
+                task = tasks.get(op['id'])
+                if task is None:
+                    errors['id'] = 'Task does not exist.'
+                else:
+                    board_id = task.board_id
+                    if op.get('version') is not None and op['version'] != task.version:
+                        errors['version'] = f'Task was changed by someone else, current version is {task.version}.'
+                if op['id'] in seen_task_ids:
+                    errors['id'] = 'Task appears in more than one operation.'
+                seen_task_ids.add(op['id'])
+            if board_id is not None:
+                if board_id not in boards:
+                    errors['board'] = 'Board id does not exist'
+                elif not boards[board_id]:
+                    errors['detail'] = 'Forbidden. Must be a member or owner of board.'
+            for field in ('assignee_id', 'reviewer_id'):
+                if field in op and op[field] not in users:
+                    errors[field] = 'Assignee or reviewer does not exist.'
+
+            result = {'index': index, 'action': op['action'], 'id': op.get('id'), 'status': 'ok'}
+            if errors:
+                result.update(status='error', errors=errors)
+            results.append(result)
+        return results
+
+    def apply_operations(self, request, operations, results, tasks, users):
+        """
+        Apply all operations with bulk_create, bulk_update and a single
+        delete query, inside the transaction that locked the tasks.
+        Updated tasks are grouped by the fields their operation sets,
+        with one bulk_update per group, so no task gets fields written
+        that its operation did not touch.
+        """
+        created, updated, deleted, moved = [], [], [], []
+        fields_by_task = {}
+        stats_changes = []
+        now = timezone.now()
+
+        for op, result in zip(operations, results):
+            if op['action'] == 'create':
+                task = Task(
+                    board_id=op['board'], title=op['title'], description=op.get('description', ''),
+                    status=op.get('status', Task.Status.to_do), priority=op.get('priority', Task.Priority.medium),
+                    assignee=users[op['assignee_id']], reviewer=users[op['reviewer_id']],
+                    due_date=op['due_date'], owner=request.user,
+                )
+                created.append((task, result))
+                stats_changes.append((task.board_id, None, (task.status, task.priority)))
+            elif op['action'] == 'update':
+                task = tasks[op['id']]
+                before = (task.status, task.priority)
+                fields = fields_by_task[task.id] = {'updated_at', 'version'}
+                for field in ('title', 'description', 'status', 'priority', 'due_date'):
+                    if field in op:
+                        setattr(task, field, op[field])
+                        fields.add(field)
+                for field in ('assignee', 'reviewer'):
+                    if f'{field}_id' in op:
+                        setattr(task, field, users[op[f'{field}_id']])
+                        fields.add(field)
+                task.updated_at = now
+                result['version'] = task.version + 1
+                task.version = F('version') + 1
+                updated.append(task)
+                if task.status != before[0]:
+                    moved.append(task)
+                    fields.add('position')
+                stats_changes.append((task.board_id, before, (task.status, task.priority)))
+            else:
+                task = tasks[op['id']]
+                deleted.append(task)
+                stats_changes.append((task.board_id, (task.status, task.priority), None))
+
+        Task.objects.assign_end_positions([task for task, result in created])
+        Task.objects.bulk_create([task for task, result in created])
+        Task.objects.assign_end_positions(moved)
+        groups = {}
+        for task in updated:
+            groups.setdefault(tuple(sorted(fields_by_task[task.id])), []).append(task)
+        for fields, tasks in groups.items():
+            Task.objects.bulk_update(tasks, fields=fields)
+        Task.objects.filter(id__in=[task.id for task in deleted]).delete()
+        BoardStats.apply_task_changes(stats_changes)
+        changes = BoardChange.objects.bulk_create([
+            BoardChange(board_id=task.board_id, kind=BoardChange.Kind.task, object_id=task.id,
+                        action=BoardChange.Action.upsert)
+            for task in [task for task, result in created] + updated
+        ])
+        events.publish_changes(changes)
+        search.index_tasks([task for task, result in created] + updated)
+        for board_id in {board_id for board_id, before, after in stats_changes}:
+            invalidate_board(board_id)
+
+        for task, result in created:
+            result['id'] = task.id
+
+
+class TaskListMixin:
+    """
+    Shared GET of the task list views.
+    """
+
+    def list_tasks(self, request, tasks, empty_message):
+        """
+        - Filters, ordering and `fields=` as described in api/filters.py,
+          all applied in SQL
+        - Sends a strong ETag and answers If-None-Match with 304.
+        - Optional keyset pagination via `cursor` / `page_size`.
+        """
+        params = TaskListParams(request.query_params)
+        tasks = params.filter(tasks)
+        etag = conditional.task_list_etag(request, tasks, *params.etag_parts())
+        not_modified = conditional.not_modified(request, etag)
+        if not_modified is not None:
+            return not_modified
+
+        if params.fields is None:
+            tasks = params.apply_ordering(fast_serializers.task_rows(tasks, *params.ordering_columns()))
+            serializer_class = fast_serializers.FastTaskSerializer
+        else:
+            tasks = params.select(tasks)
+            serializer_class = partial(TaskAssignOrReviewerSerializer, fields=params.fields)
+        ordering = params.pagination_ordering()
+        pagination_class = ordered_keyset_pagination(ordering) if ordering else KeysetPagination
+        paginated = paginated_response(request, tasks, serializer_class, self, pagination_class=pagination_class)
+        if paginated is not None:
+            return conditional.with_etag(paginated, etag)
+        with timed('serializer'):
+            data = serializer_class(tasks, many=True).data
+        if not data:
+            return Response({'message': empty_message}, status=401)
+        return conditional.with_etag(Response(data), etag)
+
+
+class TaskAssignView(TaskListMixin, generics.ListCreateAPIView):
     """
     List all tasks assigned to the authenticated user.
     """
@@ -178,16 +642,12 @@ class TaskAssignView(generics.ListCreateAPIView):
         """
         GET:
         - Returns tasks where user is assignee
+        - Filters, ordering, sparse fields and pagination: see TaskListMixin.list_tasks
         """
-        user = request.user
-        tasks = Task.objects.filter(assignee=user)
-        serializer = TaskAssignOrReviewerSerializer(tasks, many=True)
-        if not serializer.data:
-            return Response({'message': 'No tasks assigned.'}, status=401)
-        return Response(serializer.data)
+        return self.list_tasks(request, Task.objects.filter(assignee=request.user), 'No tasks assigned.')
 
 
-class TaskReviewView(generics.ListCreateAPIView):
+class TaskReviewView(TaskListMixin, generics.ListCreateAPIView):
     """
     List all tasks the authenticated user is assigned to review.
 
@@ -198,13 +658,63 @@ class TaskReviewView(generics.ListCreateAPIView):
         """
         GET:
         - Returns tasks where user is reviewer
+        - Filters, ordering, sparse fields and pagination: see TaskListMixin.list_tasks
         """
-        user = request.user
-        tasks = Task.objects.filter(reviewer=user)
-        serializer = TaskAssignOrReviewerSerializer(tasks, many=True)
-        if not serializer.data:
-            return Response({'message': 'No tasks to review.'}, status=401)
-        return Response(serializer.data)
+        return self.list_tasks(request, Task.objects.filter(reviewer=request.user), 'No tasks to review.')
+
+
+class TaskSearchView(APIView):
+    """
+    Full-text search over tasks and their comments.
+    Access rights: Only tasks on boards the user owns or is a member of.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        """
+        GET:
+        - Query param: `q` (words to search for, prefix matches)
+        - Searches title, description and comments through the
+          search index, best match first
+        - Paginated with `page` / `page_size`
+        """
+        text = request.query_params.get('q', '').strip()
+        if not text:
+            return Response({'detail': 'Query parameter q is required.'}, status=400)
+
+        paginator = RankedPagination()
+        task_ids = paginator.paginate_queryset(search.TaskSearch(request.user, text), request, view=self)
+        tasks = Task.objects.with_profiles().in_bulk(task_ids)
+        with timed('serializer'):
+            data = TaskAssignOrReviewerSerializer([tasks[task_id] for task_id in task_ids if task_id in tasks],
+                                                  many=True).data
+        return paginator.get_paginated_response(data)
+
+
+class TaskSummaryView(APIView):
+    """
+    Summary of the authenticated user's work across all boards.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        """
+        GET:
+        - For the tasks the user is assigned to and reviewing: total,
+          counts by status and priority, overdue, due this week and
+          the next due date (see TaskQuerySet.summary_for)
+        - Computed with one aggregate query and cached per user and
+          day for KANMIND_SUMMARY_CACHE_TIMEOUT seconds
+        """
+        today = timezone.localdate()
+        timeout = getattr(settings, 'KANMIND_SUMMARY_CACHE_TIMEOUT', 30)
+        cache_key = f'kanmind:task-summary:{request.user.id}:{today.isoformat()}'
+        summary = response_cache.get_cache().get(cache_key) if timeout else None
+        if summary is None:
+            summary = Task.objects.summary_for(request.user, today)
+            if timeout:
+                response_cache.get_cache().set(cache_key, summary, timeout)
+        return Response(summary, status=200)
 
 
 class TaskDetailView(APIView):
@@ -219,17 +729,27 @@ class TaskDetailView(APIView):
         PATCH:
         - Updates task fields 
         - Only task creators or board owners can update a task
+        - Only changed fields are written (see TaskDetailSerializer.update)
+        - Optional `version`: the version the client edited. If the task
+          has been changed since, nothing is written and 409 is returned
+          with the current version.
         """
-        task = get_object_or_404(Task, pk=pk)
-        board = task.board
-        if request.user != board.owner and request.user not in board.members.all():
+        task = access.get_task(request, pk)
+        if not task.can_access:
             return Response({'detail': 'Cannot modify task.'}, status=403)
 
         serializer = TaskDetailSerializer(task, data=request.data, partial=True)
-        if serializer.is_valid():
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=400)
+        with transaction.atomic():
+            serializer.instance = (Task.objects.select_for_update(of=('self',))
+                                   .select_related('assignee', 'reviewer').get(pk=pk))
+            expected = serializer.validated_data.get('version')
+            if expected is not None and expected != serializer.instance.version:
+                return Response({'detail': 'Task was changed by someone else. Reload and try again.',
+                                 'version': serializer.instance.version}, status=409)
             serializer.save()
-            return Response(serializer.data, status=200)
-        return Response(serializer.errors, status=400)
+        return Response(serializer.data, status=200)
 
     def delete(self, request, pk, *args, **kwargs):
         """ 
@@ -237,14 +757,63 @@ class TaskDetailView(APIView):
         - deletes task
         - Only task creators or board owners can delete a task
         """
-        task = get_object_or_404(Task, pk=pk)
-        board = task.board
-        if request.user != board.owner and request.user not in board.members.all():
+        task = access.get_task(request, pk)
+        if not task.can_access:
             return Response({'detail': 'Cannot delete task.'}, status=403)
-        task.delete()
+        with transaction.atomic():
+            task = Task.objects.select_for_update().filter(pk=pk).first()
+            if task is not None:
+                task.delete()
+                BoardStats.apply_task_change(task.board_id, before=(task.status, task.priority))
         return Response({'detail': 'Task deleted successfully.'}, status=204)
 
 
+class TaskMoveView(APIView):
+    """
+    Move a task to another status column and/or position (drag and drop).
+    Access rights: Only board owners or members.
+    """
+    permission_classes = [IsAuthenticated, isMember]
+    renders_floats = True
+
+    def post(self, request, pk):
+        """
+        POST:
+        - Body: status, after_id or before_id, see TaskMoveSerializer
+        - Status and position change in one transaction with the task
+          row locked; only the moved task is written, unless its
+          column has run out of room and is rebalanced
+        - Returns id, status, position and the new version
+        """
+        task = access.get_task(request, pk)
+        if not task.can_access:
+            return Response({'detail': 'Forbidden. Must be a member or owner of board.'}, status=403)
+        serializer = TaskMoveSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=400)
+        data = serializer.validated_data
+
+        with transaction.atomic():
+            task = Task.objects.select_for_update().get(pk=pk)
+            column = data.get('status', task.status)
+            neighbours = {}
+            for field in ('after_id', 'before_id'):
+                if data.get(field) is not None:
+                    neighbour = (Task.objects.filter(pk=data[field], board_id=task.board_id, status=column)
+                                 .exclude(pk=task.pk).first())
+                    if neighbour is None:
+                        return Response({field: 'Must be another task in the target column.'}, status=400)
+                    neighbours[field[:-3]] = neighbour
+            before = (task.status, task.priority)
+            task.place(column, **neighbours)
+            task.version += 1
+            task.save(update_fields=['status', 'position', 'version', 'updated_at'])
+            if task.status != before[0]:
+                BoardStats.apply_task_change(task.board_id, before=before, after=(task.status, task.priority))
+        return Response({'id': task.id, 'status': task.status, 'position': task.position, 'version': task.version},
+                        status=200)
+
+
 class CommentView(APIView):
     """
     Create or list comments for a task.
@@ -259,8 +828,9 @@ class CommentView(APIView):
         - Serializer: CommentResponseSerializer (output)
         - Field allowed: 'content' only
         """
-        task = get_object_or_404(Task, pk=pk)
-        board = task.board
+        task = access.get_task(request, pk)
+        if not task.can_access:
+            return Response({'detail': 'Forbidden. Must be a member or owner of board.'}, status=403)
 
         extra_fields = set(request.data.keys()) - {'content'}
         if extra_fields:
@@ -282,13 +852,19 @@ class CommentView(APIView):
         GET:
         - Lists all comments for a task
         - Only board `owner` or `members` can view
-    
+        - Optional keyset pagination via `cursor` / `page_size`,
+          ordered by (created_at, id).
         """
-        task = get_object_or_404(Task, pk=pk)
-        board = task.board
-
-        comments = Comment.objects.filter(task=task)
-        serializer = CommentResponseSerializer(comments, many=True)
+        task = access.get_task(request, pk)
+        if not task.can_access:
+            return Response({'detail': 'Forbidden. Must be a member or owner of board.'}, status=403)
+
+        comments = fast_serializers.FastCommentSerializer.rows(Comment.objects.filter(task=task))
+        paginated = paginated_response(request, comments, fast_serializers.FastCommentSerializer, self,
+                                       pagination_class=CommentKeysetPagination)
+        if paginated is not None:
+            return paginated
+        serializer = fast_serializers.FastCommentSerializer(comments, many=True)
         return Response(serializer.data, status=200)
 
 
@@ -304,8 +880,8 @@ class CommentDeleteView(APIView):
         DELETE:
         - deletes comments
         """
-        comment = get_object_or_404(Comment, id=comment_id, task_id=task_id)
-        if request.user != comment.author:
+        comment = access.get_comment(request, task_id, comment_id)
+        if request.user.id != comment.author_id:
             return Response({'detail': 'Cannot delete comment.'}, status=403)
         comment.delete()
         return Response({'detail': 'Comment deleted successfully.'}, status=204)
@@ -0,0 +1,191 @@
+"""
+Board event fan-out for the real-time stream.
+
+Write paths publish one event per BoardChange row after the transaction
+commits. Subscribers (the SSE endpoint) receive the events of one board.
+The broker is pluggable through KANMIND_EVENTS['BROKER']: the default
+InProcessBroker only reaches subscribers in the same process, a broker
+backed by Redis pub/sub or Postgres LISTEN/NOTIFY can implement the same
+two methods to fan out across processes.
+"""
+import abc
+import asyncio
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+
+OVERFLOW = {'kind': 'resync'}
+
+
+def get_options():
+    options = {
+        'BROKER': 'kanmind_board_app.events.InProcessBroker',
+        'QUEUE_SIZE': 1000,
+        'KEEPALIVE': 15,
+        'RETRY_MS': 3000,
+        'TICKET_MAX_AGE': 60,
+        'RECHECK': 60,
+    }
+    options.update(getattr(settings, 'KANMIND_EVENTS', {}))
+    return options
+
+
+class Subscription:
+    """
+    Queue of events for one subscriber, bound to the event loop
+    it is created on. When the queue is full the subscriber gets
+    OVERFLOW and should resync through the changes endpoint.
+    """
+
+    def __init__(self, broker, board_id, queue_size):
+        self.broker = broker
+        self.board_id = board_id
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize=queue_size)
+        self.overflowed = False
+
+    def put(self, event):
+        """
+        Called on the subscriber's loop.
+        """
+        if self.overflowed:
+            return
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.overflowed = True
+            self.queue.get_nowait()
+            self.queue.put_nowait(OVERFLOW)
+
+    def deliver(self, event):
+        """
+        Thread-safe: hand an event over from any thread.
+        """
+        try:
+            self.loop.call_soon_threadsafe(self.put, event)
+        except RuntimeError:
+            self.close()
+
+    async def get(self, timeout=None):
+        """
+        Wait for the next event; None when the timeout passes.
+        """
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+
+class Broker(abc.ABC):
+    """
+    Interface of an event broker.
+    """
+
+    @abc.abstractmethod
+    def publish(self, board_id, event):
+        """
+        Send an event to every subscriber of a board; called from any thread.
+        """
+
+    @abc.abstractmethod
+    def subscribe(self, board_id):
+        """
+        Return a Subscription; called inside a running event loop.
+        """
+
+    @abc.abstractmethod
+    def unsubscribe(self, subscription):
+        """
+        Drop a Subscription.
+        """
+
+
+class InProcessBroker(Broker):
+    """
+    Fan-out to subscribers of the current process.
+    """
+
+    def __init__(self, queue_size=1000):
+        self.queue_size = queue_size
+        self.subscribers = defaultdict(set)
+        self.lock = threading.Lock()
+
+    def publish(self, board_id, event):
+        with self.lock:
+            subscribers = list(self.subscribers.get(board_id, ()))
+        for subscription in subscribers:
+            subscription.deliver(event)
+
+    def subscribe(self, board_id):
+        subscription = Subscription(self, board_id, self.queue_size)
+        with self.lock:
+            self.subscribers[board_id].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self.lock:
+            subscribers = self.subscribers.get(subscription.board_id)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self.subscribers[subscription.board_id]
+
+    def subscriber_count(self, board_id):
+        with self.lock:
+            return len(self.subscribers.get(board_id, ()))
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    """
+    Return the broker configured in KANMIND_EVENTS['BROKER'].
+    """
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                options = get_options()
+                _broker = import_string(options['BROKER'])(queue_size=options['QUEUE_SIZE'])
+    return _broker
+
+
+def change_event(change):
+    return {
+        'id': change.id,
+        'board': change.board_id,
+        'kind': change.kind,
+        'object_id': change.object_id,
+        'action': change.action,
+    }
+
+
+def publish_changes(changes):
+    """
+    Publish BoardChange rows once the current transaction commits,
+    so subscribers never see a change that is rolled back.
+    """
+    events = [change_event(change) for change in changes]
+    if not events:
+        return
+
+    def send():
+        broker = get_broker()
+        for event in events:
+            broker.publish(event['board'], event)
+
+    transaction.on_commit(send)
+
+
+def publish_board_deleted(board_id):
+    event = {'id': None, 'board': board_id, 'kind': 'board', 'object_id': board_id, 'action': 'delete'}
+    transaction.on_commit(lambda: get_broker().publish(board_id, event))
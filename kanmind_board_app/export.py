@@ -0,0 +1,110 @@
+"""
+Streaming NDJSON export of a board.
+
+Every line is one JSON object with a "type" key:
+- board: id, title, owner, updated_at
+- member: id, email, fullname
+- task: id, title, description, status, priority, assignee, reviewer, owner, due_date, updated_at
+- comment: id, task, author, content, created_at, updated_at
+
+Users are referenced by email, so an export can be imported into
+another installation. Rows are read with .values().iterator(), so
+memory stays flat however large the board is (apart from the ids of
+the exported tasks). Comments are read for exactly those task ids, so
+a task created or moved while the export runs cannot leave comments
+that refer to a task missing from the export.
+
+Under ASGI, Django would drain a sync iterator with sync_to_async(list)
+and so build the whole export in memory before sending a byte.
+aiter_board_ndjson hands the same blocks to the event loop one at a
+time instead.
+"""
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import User
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import F, Value
+from django.db.models.functions import Concat, Trim
+
+from kanmind_board_app.models import Board, Task, Comment
+
+
+CHUNK_SIZE = 2000
+BUFFER_BYTES = 64 * 1024
+
+
+def _fullname():
+    return Trim(Concat('first_name', Value(' '), 'last_name'))
+
+
+def iter_board_rows(board_id, chunk_size=CHUNK_SIZE):
+    """
+    Yield the export rows of a board as dicts.
+    """
+    board = (Board.objects.filter(pk=board_id)
+             .values('id', 'title', 'updated_at', owner_email=F('owner__email')).first())
+    if board is None:
+        return
+    yield {'type': 'board', 'id': board['id'], 'title': board['title'],
+           'owner': board['owner_email'], 'updated_at': board['updated_at']}
+
+    members = (User.objects.filter(boards_member=board_id).order_by('id')
+               .values('id', 'email', fullname=_fullname()))
+    for member in members.iterator(chunk_size=chunk_size):
+        yield {'type': 'member', **member}
+
+    tasks = (Task.objects.filter(board_id=board_id).in_column_order()
+             .values('id', 'title', 'description', 'status', 'priority', 'due_date', 'updated_at',
+                     assignee_email=F('assignee__email'),
+                     reviewer_email=F('reviewer__email'),
+                     owner_email=F('owner__email')))
+    task_ids = []
+    for task in tasks.iterator(chunk_size=chunk_size):
+        task_ids.append(task['id'])
+        yield {'type': 'task', 'id': task['id'], 'title': task['title'], 'description': task['description'],
+               'status': task['status'], 'priority': task['priority'], 'assignee': task['assignee_email'],
+               'reviewer': task['reviewer_email'], 'owner': task['owner_email'],
+               'due_date': task['due_date'], 'updated_at': task['updated_at']}
+
+    task_ids.sort()
+    for start in range(0, len(task_ids), chunk_size):
+        comments = (Comment.objects.filter(task_id__in=task_ids[start:start + chunk_size]).order_by('task_id', 'id')
+                    .values('id', 'task_id', 'content', 'created_at', 'updated_at',
+                            author_email=F('author__email')))
+        for comment in comments.iterator(chunk_size=chunk_size):
+            yield {'type': 'comment', 'id': comment['id'], 'task': comment['task_id'],
+                   'author': comment['author_email'], 'content': comment['content'],
+                   'created_at': comment['created_at'], 'updated_at': comment['updated_at']}
+
+
+def iter_board_ndjson(board_id, chunk_size=CHUNK_SIZE):
+    """
+    Yield the export as NDJSON bytes, buffered into blocks of about
+    BUFFER_BYTES to keep the number of writes low.
+    """
+    encoder = DjangoJSONEncoder(ensure_ascii=False)
+    buffer = []
+    size = 0
+    for row in iter_board_rows(board_id, chunk_size=chunk_size):
+        line = (encoder.encode(row) + '\n').encode()
+        buffer.append(line)
+        size += len(line)
+        if size >= BUFFER_BYTES:
+            yield b''.join(buffer)
+            buffer, size = [], 0
+    if buffer:
+        yield b''.join(buffer)
+
+
+async def aiter_board_ndjson(board_id, chunk_size=CHUNK_SIZE):
+    """
+    Async iterator over the blocks of iter_board_ndjson. Each block is
+    produced in the sync thread, so the database cursors stay on the
+    connection they were opened on.
+    """
+    blocks = iter_board_ndjson(board_id, chunk_size=chunk_size)
+    next_block = sync_to_async(next)
+    try:
+        while (block := await next_block(blocks, None)) is not None:
+            yield block
+    finally:
+        await sync_to_async(blocks.close)()
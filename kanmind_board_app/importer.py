@@ -0,0 +1,308 @@
+"""
+Batched board import from NDJSON or JSON array dumps.
+
+The input uses the format written by kanmind_board_app.export:
+a "board" record followed by the "member", "task" and "comment"
+records that belong to it. A dump may contain several boards.
+
+Records are read as a stream and committed in batches. Each batch
+creates its rows with bulk_create in one transaction and records
+its progress on the ImportJob, so a failed import can be resumed
+from the last committed batch.
+"""
+import codecs
+import json
+import time
+
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import Q
+from django.utils.dateparse import parse_date, parse_datetime
+
+from kanmind_board_app import response_cache, search
+from kanmind_board_app.models import Board, Task, Comment, BoardStats, ImportJob, ImportedObject
+
+
+BATCH_SIZE = 1000
+READ_BYTES = 64 * 1024
+
+# Fields each record type must have, with a non-empty value.
+REQUIRED_FIELDS = {
+    'board': ('id', 'title'),
+    'member': (),
+    'task': ('id', 'title', 'due_date'),
+    'comment': ('task',),
+}
+
+
+class BoardImportError(Exception):
+    """
+    Raised for input that cannot be imported.
+    """
+
+
+def iter_records(stream):
+    """
+    Yield records from a binary or text stream holding either
+    NDJSON or a single JSON array, without loading it all.
+    """
+    decoder = json.JSONDecoder()
+    reader = codecs.getincrementaldecoder('utf-8')()
+    buffer = ''
+    in_array = None
+
+    def chunks():
+        while True:
+            chunk = stream.read(READ_BYTES)
+            if not chunk:
+                tail = reader.decode(b'', final=True)
+                if tail:
+                    yield tail
+                return
+            yield reader.decode(chunk) if isinstance(chunk, bytes) else chunk
+
+    for chunk in chunks():
+        buffer += chunk
+        while True:
+            buffer = buffer.lstrip()
+            if in_array is None and buffer:
+                in_array = buffer.startswith('[')
+                if in_array:
+                    buffer = buffer[1:]
+                continue
+            if in_array and buffer[:1] in (',', ']'):
+                buffer = buffer[1:]
+                continue
+            try:
+                record, end = decoder.raw_decode(buffer)
+            except json.JSONDecodeError:
+                break
+            yield record
+            buffer = buffer[end:]
+    if buffer.strip():
+        raise BoardImportError(f'Unexpected trailing data: {buffer[:80]!r}')
+
+
+def parse_or_none(parse, value):
+    """
+    parse_date / parse_datetime, returning None instead of raising
+    for well-formed but invalid values such as 2030-02-30.
+    """
+    try:
+        return parse(str(value))
+    except ValueError:
+        return None
+
+
+class BoardImporter:
+    """
+    Imports records into boards, tasks and comments.
+    - job: ImportJob holding the progress; records_done records are skipped
+    - batch_size: Number of records committed per transaction
+    - owner: When set, owner of every imported board
+    - uploader: When set, the import runs on behalf of this user (used by
+      the API): they own every imported board and task and author every
+      comment, and members, assignees and reviewers are only resolved
+      among the users who already share a board with them
+    Users are resolved by email; unknown emails fall back to the board owner.
+    """
+
+    def __init__(self, job, batch_size=BATCH_SIZE, owner=None, uploader=None):
+        self.job = job
+        self.batch_size = batch_size
+        self.owner = owner or uploader
+        self.uploader = uploader
+        self.counts = dict.fromkeys(('board', 'member', 'task', 'comment', 'unknown_users'), 0)
+
+    def run(self, records, progress=None):
+        """
+        Import all records and return a report with counts and throughput.
+        `progress` is called with the job after every committed batch.
+        """
+        started = time.perf_counter()
+        resume_after = self.job.records_done
+        skipped = 0
+        batch = []
+        try:
+            for record in records:
+                if skipped < resume_after:
+                    skipped += 1
+                    continue
+                batch.append(record)
+                if len(batch) >= self.batch_size:
+                    self.commit(batch)
+                    batch = []
+                    if progress:
+                        progress(self.job)
+            if batch:
+                self.commit(batch)
+        except Exception:
+            ImportJob.objects.filter(pk=self.job.pk).update(status=ImportJob.Status.failed)
+            raise
+
+        self.job.status = ImportJob.Status.done
+        self.job.save(update_fields=['status', 'updated_at'])
+        seconds = time.perf_counter() - started
+        imported = self.job.records_done - skipped
+        return {
+            'job': self.job.pk,
+            'records': imported,
+            'resumed_after': skipped,
+            'seconds': round(seconds, 3),
+            'records_per_second': round(imported / seconds, 1) if seconds else None,
+            **self.counts,
+        }
+
+    def commit(self, batch):
+        """
+        Write one batch in a single transaction, including the job progress.
+        """
+        with transaction.atomic():
+            touched = self.write(batch)
+            self.job.records_done += len(batch)
+            self.job.status = ImportJob.Status.running
+            self.job.save(update_fields=['records_done', 'current_board', 'status', 'updated_at'])
+            BoardStats.recompute(board_ids=touched)
+        response_cache.invalidate(board_ids=touched, user_ids=self.board_user_ids(touched))
+
+    def check(self, number, record):
+        """
+        Raise BoardImportError, naming the record's number in the
+        input, if the record cannot be written as it is.
+        """
+        if not isinstance(record, dict):
+            raise BoardImportError(f'Record {number}: not a JSON object.')
+        kind = record.get('type')
+        if kind not in REQUIRED_FIELDS:
+            raise BoardImportError(f'Record {number}: unknown record type {kind!r}.')
+        missing = [field for field in REQUIRED_FIELDS[kind] if record.get(field) in (None, '')]
+        if missing:
+            raise BoardImportError(f'Record {number}: {kind} without {", ".join(missing)}.')
+        for field in ('id', 'task'):
+            if field in REQUIRED_FIELDS[kind] and type(record[field]) is not int:
+                raise BoardImportError(f'Record {number}: {field} must be an integer.')
+        if 'title' in REQUIRED_FIELDS[kind] and not isinstance(record['title'], str):
+            raise BoardImportError(f'Record {number}: title must be a string.')
+        if kind == 'task':
+            for field, choices in (('status', Task.Status.values), ('priority', Task.Priority.values)):
+                if field in record and record[field] not in choices:
+                    raise BoardImportError(f'Record {number}: invalid {field} {record[field]!r}.')
+            if parse_or_none(parse_date, record['due_date']) is None:
+                raise BoardImportError(f'Record {number}: invalid due_date {record["due_date"]!r}.')
+        if kind == 'comment' and record.get('created_at'):
+            if parse_or_none(parse_datetime, record['created_at']) is None:
+                raise BoardImportError(f'Record {number}: invalid created_at {record["created_at"]!r}.')
+
+    def write(self, batch):
+        for offset, record in enumerate(batch, start=self.job.records_done + 1):
+            self.check(offset, record)
+
+        users = self.resolve_users(batch)
+        task_map = self.lookup('task', {record['task'] for record in batch if record['type'] == 'comment'})
+
+        boards, members, tasks, comments = [], [], [], []
+        board = self.job.current_board
+        for record in batch:
+            kind = record['type']
+            if kind == 'board':
+                board = Board(title=record['title'][:30],
+                              owner=self.owner or self.user(users, record.get('owner'), None))
+                if board.owner is None:
+                    raise BoardImportError(f'Owner {record.get("owner")!r} of board {record.get("id")} does not exist.')
+                boards.append((record, board))
+                continue
+            if board is None:
+                raise BoardImportError(f'{kind} record before any board record.')
+            if kind == 'member':
+                user = users.get(record.get('email'))
+                if user is None:
+                    self.counts['unknown_users'] += 1
+                else:
+                    members.append((board, user))
+            elif kind == 'task':
+                task = Task(
+                    board=board, title=record['title'][:30], description=record.get('description', ''),
+                    status=record.get('status', Task.Status.to_do),
+                    priority=record.get('priority', Task.Priority.medium),
+                    assignee=self.user(users, record.get('assignee'), board.owner),
+                    reviewer=self.user(users, record.get('reviewer'), board.owner),
+                    owner=self.uploader or (self.user(users, record.get('owner'), board.owner)
+                                            if record.get('owner') else None),
+                    due_date=parse_date(str(record['due_date'])),
+                )
+                tasks.append((record, task))
+            else:
+                comments.append((record, board))
+
+        Board.objects.bulk_create([board for record, board in boards])
+        Board.members.through.objects.bulk_create(
+            [Board.members.through(board_id=board.id, user_id=user.id) for board, user in members],
+            ignore_conflicts=True,
+        )
+        Task.objects.assign_end_positions([task for record, task in tasks])
+        Task.objects.bulk_create([task for record, task in tasks], batch_size=self.batch_size)
+        task_map.update({record['id']: task.id for record, task in tasks})
+
+        new_comments = []
+        for record, board in comments:
+            if record['task'] not in task_map:
+                raise BoardImportError(f'Comment {record.get("id")} refers to unknown task {record["task"]}.')
+            comment = Comment(task_id=task_map[record['task']], content=record.get('content', ''),
+                              author=self.uploader or self.user(users, record.get('author'), board.owner))
+            comment.original_created_at = parse_datetime(str(record.get('created_at') or ''))
+            new_comments.append(comment)
+        Comment.objects.bulk_create(new_comments, batch_size=self.batch_size)
+        dated = [comment for comment in new_comments if comment.original_created_at]
+        for comment in dated:
+            comment.created_at = comment.original_created_at
+        Comment.objects.bulk_update(dated, ['created_at'], batch_size=self.batch_size)
+        search.index_tasks([task for record, task in tasks])
+        search.index_comments((comment, board.id) for comment, (record, board) in zip(new_comments, comments))
+
+        ImportedObject.objects.bulk_create(
+            [ImportedObject(job=self.job, kind='board', source_id=record['id'], target_id=board.id)
+             for record, board in boards]
+            + [ImportedObject(job=self.job, kind='task', source_id=record['id'], target_id=task.id)
+               for record, task in tasks],
+            batch_size=self.batch_size,
+        )
+
+        self.job.current_board = board
+        for kind, rows in (('board', boards), ('member', members), ('task', tasks), ('comment', new_comments)):
+            self.counts[kind] += len(rows)
+        return {board.id} | {board.id for record, board in boards}
+
+    def resolve_users(self, batch):
+        """
+        Load every user referenced in the batch with one email__in query.
+        With an uploader, only the uploader and the owners and members of
+        their boards are found, other emails count as unknown users.
+        """
+        fields = ('email', 'assignee', 'reviewer') if self.uploader else ('owner', 'email', 'assignee', 'reviewer', 'author')
+        emails = {record.get(field) for record in batch for field in fields if record.get(field)}
+        users = User.objects.filter(email__in=emails)
+        if self.uploader is not None:
+            shared = Board.objects.visible_to(self.uploader).values('id')
+            users = users.filter(Q(pk=self.uploader.pk) | Q(boards_owner__in=shared)
+                                 | Q(boards_member__in=shared)).distinct()
+        return {user.email: user for user in users}
+
+    def user(self, users, email, fallback):
+        user = users.get(email)
+        if user is None and email:
+            self.counts['unknown_users'] += 1
+        return user or fallback
+
+    def lookup(self, kind, source_ids):
+        """
+        Map source ids created in earlier batches to the new ids.
+        """
+        if not source_ids:
+            return {}
+        return dict(ImportedObject.objects.filter(job=self.job, kind=kind, source_id__in=source_ids)
+                    .values_list('source_id', 'target_id'))
+
+    def board_user_ids(self, board_ids):
+        owners = Board.objects.filter(id__in=board_ids).values_list('owner_id', flat=True)
+        members = Board.members.through.objects.filter(board_id__in=board_ids).values_list('user_id', flat=True)
+        return set(owners) | set(members)
@@ -0,0 +1,319 @@
+import asyncio
+import json
+import platform
+import statistics
+import subprocess
+import time
+import tracemalloc
+from datetime import date, timedelta
+from itertools import cycle, islice
+
+import django
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import AsyncClient, Client
+from django.test.utils import CaptureQueriesContext, setup_test_environment, teardown_test_environment
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+
+from kanmind_board_app.export import iter_board_ndjson
+from kanmind_board_app.models import Board, Task, Comment, BoardStats, BoardChange
+from users.api.authentication import token_cache
+
+
+class Dataset:
+    """
+    Synthetic data seeded with bulk inserts.
+    The first user is a member of every board and the
+    assignee and reviewer of every task, i.e. the heaviest user.
+    """
+
+    def __init__(self, users, boards, members, tasks, comments):
+        password = make_password('benchmark')
+        self.users = User.objects.bulk_create([
+            User(username=f'bench{i}@example.com', email=f'bench{i}@example.com',
+                 first_name='Bench', last_name=f'User {i}', password=password)
+            for i in range(users)
+        ])
+        self.user = self.users[0]
+        self.token = Token.objects.create(user=self.user).key
+
+        self.boards = Board.objects.bulk_create([
+            Board(title=f'Board {i}', owner=self.users[i % users]) for i in range(boards)
+        ])
+        Board.members.through.objects.bulk_create([
+            Board.members.through(board_id=board.id, user_id=self.users[(b + m) % users].id)
+            for b, board in enumerate(self.boards) for m in range(min(members, users))
+        ])
+
+        statuses, priorities = Task.Status.values, Task.Priority.values
+        self.tasks = Task.objects.bulk_create([
+            Task(board=board, title=f'Task {t}', description='Lorem ipsum ' * 10,
+                 status=statuses[t % len(statuses)], priority=priorities[t % len(priorities)],
+                 assignee=self.user, reviewer=self.user, owner=self.user,
+                 due_date=date.today() + timedelta(days=t % 30))
+            for board in self.boards for t in range(tasks)
+        ], batch_size=1000)
+        Comment.objects.bulk_create([
+            Comment(task=task, author=self.user, content=f'Comment {c}')
+            for task in self.tasks for c in range(comments)
+        ], batch_size=1000)
+        BoardStats.recompute()
+
+    def new_task(self):
+        return Task.objects.create(board=self.boards[0], title='Scratch', assignee=self.user,
+                                   reviewer=self.user, owner=self.user, due_date=date.today())
+
+    def new_board(self):
+        return Board.objects.create(title='Scratch', owner=self.user)
+
+    def changes_cursor(self, board, count):
+        """
+        Sync cursor of the board that is followed by exactly `count`
+        changes, logging task changes first if there are fewer.
+        """
+        recent = list(BoardChange.objects.filter(board_id=board.id).order_by('-id')
+                      .values_list('id', flat=True)[:count])
+        if len(recent) < count:
+            task_ids = cycle(Task.objects.filter(board=board).values_list('id', flat=True))
+            BoardChange.record(board.id, BoardChange.Kind.task, islice(task_ids, count - len(recent)),
+                               BoardChange.Action.upsert)
+            return self.changes_cursor(board, count)
+        return recent[-1] - 1
+
+
+def scenarios(data):
+    """
+    Return (name, method, prepare) for every API route.
+    `prepare` runs untimed and returns (path, payload). Besides the HTTP
+    methods, `method` can be 'upload' (payload is a file sent as multipart
+    `file`) or 'events' (payload is the number of replayed events to read
+    from the stream before disconnecting).
+    """
+    board = data.boards[0]
+    task = data.tasks[0]
+    board_tasks = [task for task in data.tasks if task.board_id == board.id]
+    counter = iter(range(10 ** 9))
+    statuses = Task.Status.values
+    task_payload = {'board': board.id, 'title': 'New', 'assignee_id': data.user.id,
+                    'reviewer_id': data.user.id, 'due_date': '2030-01-01'}
+    dump = b''.join(iter_board_ndjson(board.id))
+
+    def comment_on_task():
+        comment = Comment.objects.create(task=task, author=data.user, content='Scratch')
+        return reverse('comment-delete', args=[task.id, comment.id]), None
+
+    def bulk_update():
+        status = statuses[next(counter) % len(statuses)]
+        return reverse('tasks-bulk'), [{'action': 'update', 'id': task.id, 'status': status}
+                                       for task in board_tasks[:50]]
+
+    def move():
+        return reverse('task-move', args=[task.id]), {'status': statuses[next(counter) % len(statuses)]}
+
+    def changes():
+        since = data.changes_cursor(board, 100)
+        return reverse('board-changes', args=[board.id]) + f'?since={since}', None
+
+    def replay():
+        since = data.changes_cursor(board, 50)
+        return reverse('board-events', args=[board.id]) + f'?since={since}', 50
+
+    return [
+        ('GET boards/', 'get', lambda: (reverse('boards-list-create'), None)),
+        ('POST boards/', 'post', lambda: (reverse('boards-list-create'), {'title': 'New', 'members': [data.user.id]})),
+        ('GET boards/<pk>/', 'get', lambda: (reverse('board-detail', args=[board.id]), None)),
+        ('PATCH boards/<pk>/', 'patch', lambda: (reverse('board-detail', args=[board.id]), {'title': 'Renamed'})),
+        ('DELETE boards/<pk>/', 'delete', lambda: (reverse('board-detail', args=[data.new_board().id]), None)),
+        ('GET boards/<pk>/changes/', 'get', changes),
+        ('GET boards/<pk>/events/ (replay 50)', 'events', replay),
+        ('GET boards/<pk>/export/', 'get', lambda: (reverse('board-export', args=[board.id]), None)),
+        ('POST boards/import/', 'upload', lambda: (reverse('board-import'), dump)),
+        ('GET email-check/', 'get', lambda: (reverse('email-check') + f'?email={data.user.email}', None)),
+        ('POST tasks/', 'post', lambda: (reverse('task-create'), task_payload)),
+        ('POST tasks/bulk/', 'post', lambda: (reverse('tasks-bulk'), [dict(task_payload, action='create')] * 50)),
+        ('POST tasks/bulk/ (update)', 'post', bulk_update),
+        ('GET tasks/assigned-to-me/', 'get', lambda: (reverse('tasks-assigned-to-me'), None)),
+        ('GET tasks/reviewing/', 'get', lambda: (reverse('tasks-reviewing'), None)),
+        ('GET tasks/search/', 'get', lambda: (reverse('tasks-search') + '?q=lorem', None)),
+        ('GET tasks/summary/', 'get', lambda: (reverse('tasks-summary'), None)),
+        ('PATCH tasks/<pk>/', 'patch', lambda: (reverse('task-detail', args=[task.id]), {'status': 'review'})),
+        ('POST tasks/<pk>/move/', 'post', move),
+        ('DELETE tasks/<pk>/', 'delete', lambda: (reverse('task-detail', args=[data.new_task().id]), None)),
+        ('GET tasks/<pk>/comments/', 'get', lambda: (reverse('comments', args=[task.id]), None)),
+        ('POST tasks/<pk>/comments/', 'post', lambda: (reverse('comments', args=[task.id]), {'content': 'Hi'})),
+        ('DELETE tasks/<pk>/comments/<pk>/', 'delete', comment_on_task),
+        ('POST registration/', 'post', lambda: (reverse('registration'), {
+            'fullname': 'New User', 'email': f'new{next(counter)}@example.com',
+            'password': 'pw', 'repeated_password': 'pw'})),
+        ('POST login/', 'post', lambda: (reverse('login'), {'email': data.user.email, 'password': 'benchmark'})),
+    ]
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, round(fraction * (len(ordered) - 1)))
+    return ordered[index]
+
+
+class Command(BaseCommand):
+    """
+    Seed a synthetic dataset into a throwaway test database and drive
+    every API route through the Django test client. Records latency
+    percentiles, query counts and peak Python memory per endpoint and
+    writes them as JSON, so runs can be compared across commits.
+    """
+    help = 'Benchmark every API endpoint against a synthetic dataset.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=50)
+        parser.add_argument('--boards', type=int, default=20)
+        parser.add_argument('--members', type=int, default=10, help='Members per board.')
+        parser.add_argument('--tasks', type=int, default=50, help='Tasks per board.')
+        parser.add_argument('--comments', type=int, default=3, help='Comments per task.')
+        parser.add_argument('--iterations', type=int, default=20, help='Timed requests per endpoint.')
+        parser.add_argument('--cold', action='store_true', help='Clear all caches before every request.')
+        parser.add_argument('--only', help='Only run endpoints whose name contains this text.')
+        parser.add_argument('--output', help='Write the JSON report to this file instead of stdout.')
+
+    def handle(self, *args, **options):
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            report = self.run(options)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+        output = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as file:
+                file.write(output)
+            self.stdout.write(self.style.SUCCESS(f'Report written to {options["output"]}'))
+        else:
+            self.stdout.write(output)
+
+    def run(self, options):
+        started = time.perf_counter()
+        data = Dataset(options['users'], options['boards'], options['members'],
+                       options['tasks'], options['comments'])
+        seed_seconds = time.perf_counter() - started
+
+        client = Client(HTTP_AUTHORIZATION=f'Token {data.token}')
+        client.async_client = AsyncClient()
+        client.token = data.token
+        results = {}
+        for name, method, prepare in scenarios(data):
+            if options['only'] and options['only'] not in name:
+                continue
+            self.stderr.write(f'{name} ...')
+            results[name] = self.measure(client, method, prepare, options)
+
+        return {
+            'meta': {
+                'commit': self.git_commit(),
+                'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'database': connection.vendor,
+                'seed_seconds': round(seed_seconds, 3),
+            },
+            'dataset': {name: options[name] for name in ('users', 'boards', 'members', 'tasks', 'comments')},
+            'iterations': options['iterations'],
+            'cold': options['cold'],
+            'endpoints': results,
+        }
+
+    def request(self, client, method, prepare, options):
+        """
+        Prepare one request and return a call that sends it
+        and returns (status code, response size in bytes).
+        """
+        path, payload = prepare()
+        if options['cold']:
+            self.clear_caches()
+        if method == 'events':
+            return lambda: async_to_sync(self.read_events)(client, path, payload)
+        if method == 'upload':
+            data = {'file': SimpleUploadedFile('board.ndjson', payload, content_type='application/x-ndjson')}
+            return lambda: self.send(client.post, path, {'data': data})
+        kwargs = {'content_type': 'application/json', 'data': json.dumps(payload)} if payload is not None else {}
+        return lambda: self.send(getattr(client, method), path, kwargs)
+
+    def send(self, call, path, kwargs):
+        response = call(path, **kwargs)
+        if response.streaming:
+            return response.status_code, sum(len(chunk) for chunk in response.streaming_content)
+        return response.status_code, len(response.content)
+
+    async def read_events(self, client, path, count):
+        """
+        Connect to the event stream, read the retry line and `count`
+        replayed events, then disconnect.
+        """
+        response = await client.async_client.get(path, headers={'Authorization': f'Token {client.token}'})
+        if not response.streaming:
+            return response.status_code, len(response.content)
+        content = aiter(response.streaming_content)
+        size = 0
+        try:
+            for _ in range(count + 1):
+                size += len(await asyncio.wait_for(anext(content), 10))
+        finally:
+            await content.aclose()
+        return response.status_code, size
+
+    def measure(self, client, method, prepare, options):
+        """
+        Time the endpoint, then repeat one request with query capture
+        and tracemalloc so they don't distort the latencies.
+        """
+        self.request(client, method, prepare, options)()
+
+        latencies = []
+        statuses = set()
+        for _ in range(options['iterations']):
+            send = self.request(client, method, prepare, options)
+            started = time.perf_counter()
+            status_code, size = send()
+            latencies.append((time.perf_counter() - started) * 1000)
+            statuses.add(status_code)
+
+        send = self.request(client, method, prepare, options)
+        tracemalloc.start()
+        with CaptureQueriesContext(connection) as queries:
+            status_code, size = send()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        return {
+            'status_codes': sorted(statuses),
+            'latency_ms': {
+                'p50': round(percentile(latencies, 0.50), 3),
+                'p90': round(percentile(latencies, 0.90), 3),
+                'p99': round(percentile(latencies, 0.99), 3),
+                'mean': round(statistics.fmean(latencies), 3),
+                'max': round(max(latencies), 3),
+            },
+            'queries': len(queries),
+            'peak_memory_kb': round(peak / 1024, 1),
+            'response_bytes': size,
+        }
+
+    def clear_caches(self):
+        for alias in settings.CACHES:
+            caches[alias].clear()
+        token_cache.clear()
+
+    def git_commit(self):
+        try:
+            return subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True,
+                                  cwd=settings.BASE_DIR, check=True).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
@@ -0,0 +1,198 @@
+import asyncio
+import json
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import ModuleType
+
+from asgiref.sync import ThreadSensitiveContext
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection, connections
+from django.db.backends.signals import connection_created
+from django.test import AsyncClient, Client
+from django.test.utils import override_settings, setup_test_environment, teardown_test_environment
+from django.urls import include, path, reverse
+
+from kanmind_board_app.api import async_views
+from kanmind_board_app.api.urls import urlpatterns as api_urlpatterns
+from .benchmark_api import Dataset, percentile
+
+
+MODES = ('wsgi', 'asgi-sync', 'asgi-async')
+
+ASYNC_VIEWS = {
+    'boards-list-create': async_views.boards,
+    'board-detail': async_views.board_detail,
+    'tasks-assigned-to-me': async_views.assigned_tasks,
+    'tasks-reviewing': async_views.reviewing_tasks,
+    'comments': async_views.task_comments,
+}
+
+
+def async_urlconf():
+    """
+    Root URLconf that serves the read paths from the async views,
+    as KANMIND_ASYNC_VIEWS would.
+    """
+    api = [path(str(pattern.pattern), ASYNC_VIEWS[pattern.name], name=pattern.name)
+           if pattern.name in ASYNC_VIEWS else pattern for pattern in api_urlpatterns]
+    urlconf = ModuleType('kanmind_async_urls')
+    urlconf.urlpatterns = [
+        path('api/', include(api)),
+        path('api/', include('users.api.urls')),
+    ]
+    return urlconf
+
+
+class Command(BaseCommand):
+    """
+    Compare how the read endpoints hold up under concurrent load when
+    served by the WSGI handler (one thread per request), the ASGI handler
+    with the sync DRF views, and the ASGI handler with the async views
+    (KANMIND_ASYNC_VIEWS). Requests go through Django's in-process test
+    handlers against a throwaway test database, so no server is needed;
+    --db-latency adds a delay to every query to stand in for the network
+    round trip to a remote database, which is where async views pay off.
+    For numbers from a real server, run `uvicorn kanmind.asgi:application`
+    (or gunicorn for WSGI) and point a load generator at the same paths.
+    """
+    help = 'Benchmark WSGI vs ASGI (sync and async views) under concurrent requests.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=50)
+        parser.add_argument('--boards', type=int, default=20)
+        parser.add_argument('--members', type=int, default=10, help='Members per board.')
+        parser.add_argument('--tasks', type=int, default=50, help='Tasks per board.')
+        parser.add_argument('--comments', type=int, default=3, help='Comments per task.')
+        parser.add_argument('--concurrency', type=int, default=50, help='Requests in flight at once.')
+        parser.add_argument('--threads', type=int, default=8,
+                            help='Worker threads for the WSGI mode, like a WSGI server would have.')
+        parser.add_argument('--requests', type=int, default=500, help='Requests per mode.')
+        parser.add_argument('--db-latency', type=float, default=0, help='Milliseconds added to every query.')
+        parser.add_argument('--no-response-cache', action='store_true',
+                            help='Bypass the board response cache, so every request hits the database.')
+        parser.add_argument('--modes', default=','.join(MODES), help=f'Comma separated subset of {", ".join(MODES)}.')
+        parser.add_argument('--output', help='Write the JSON report to this file instead of stdout.')
+
+    def handle(self, *args, **options):
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            report = self.run(options)
+        finally:
+            connection_created.disconnect(self.add_latency)
+            connections.close_all()
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+        output = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as file:
+                file.write(output)
+            self.stdout.write(self.style.SUCCESS(f'Report written to {options["output"]}'))
+        else:
+            self.stdout.write(output)
+
+    def run(self, options):
+        data = Dataset(options['users'], options['boards'], options['members'],
+                       options['tasks'], options['comments'])
+        board, task = data.boards[0], data.tasks[0]
+        paths = [
+            reverse('boards-list-create'),
+            reverse('board-detail', args=[board.id]),
+            reverse('tasks-assigned-to-me'),
+            reverse('tasks-reviewing'),
+            reverse('comments', args=[task.id]),
+        ]
+        requests = [paths[i % len(paths)] for i in range(options['requests'])]
+
+        self.latency = options['db_latency'] / 1000
+        if self.latency:
+            connection.execute_wrappers.append(self.sleep)
+            connection_created.connect(self.add_latency)
+
+        overrides = {}
+        if options['no_response_cache']:
+            overrides = {
+                'CACHES': dict(settings.CACHES, benchmark={'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}),
+                'KANMIND_RESPONSE_CACHE': 'benchmark',
+            }
+
+        results = {}
+        for mode in options['modes'].split(','):
+            self.stderr.write(f'{mode} ...')
+            urlconf = async_urlconf() if mode == 'asgi-async' else settings.ROOT_URLCONF
+            with override_settings(ROOT_URLCONF=urlconf, **overrides):
+                if mode == 'wsgi':
+                    results[mode] = self.run_wsgi(requests, data.token, options)
+                else:
+                    results[mode] = asyncio.run(self.run_asgi(requests, data.token, options))
+
+        return {
+            'dataset': {name: options[name] for name in ('users', 'boards', 'members', 'tasks', 'comments')},
+            'requests': options['requests'],
+            'concurrency': options['concurrency'],
+            'wsgi_threads': options['threads'],
+            'db_latency_ms': options['db_latency'],
+            'response_cache': not options['no_response_cache'],
+            'modes': results,
+        }
+
+    def sleep(self, execute, sql, params, many, context):
+        time.sleep(self.latency)
+        return execute(sql, params, many, context)
+
+    def add_latency(self, sender, connection, **kwargs):
+        connection.execute_wrappers.append(self.sleep)
+
+    def run_wsgi(self, requests, token, options):
+        local = threading.local()
+
+        def call(path):
+            if not hasattr(local, 'client'):
+                local.client = Client(HTTP_AUTHORIZATION=f'Token {token}')
+            started = time.perf_counter()
+            response = local.client.get(path)
+            return (time.perf_counter() - started) * 1000, response.status_code
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options['threads']) as pool:
+            results = list(pool.map(call, requests))
+        return self.summary(results, time.perf_counter() - started)
+
+    async def run_asgi(self, requests, token, options):
+        client = AsyncClient()
+        headers = {'Authorization': f'Token {token}'}
+        limit = asyncio.Semaphore(options['concurrency'])
+
+        async def call(path):
+            async with limit:
+                started = time.perf_counter()
+                # A real ASGI server gives every request its own thread-sensitive context.
+                async with ThreadSensitiveContext():
+                    response = await client.get(path, headers=headers)
+                return (time.perf_counter() - started) * 1000, response.status_code
+
+        started = time.perf_counter()
+        results = await asyncio.gather(*(call(path) for path in requests))
+        return self.summary(results, time.perf_counter() - started)
+
+    def summary(self, results, seconds):
+        latencies = [latency for latency, status in results]
+        statuses = {}
+        for latency, status in results:
+            statuses[status] = statuses.get(status, 0) + 1
+        return {
+            'seconds': round(seconds, 3),
+            'requests_per_second': round(len(results) / seconds, 1),
+            'status_codes': statuses,
+            'latency_ms': {
+                'p50': round(percentile(latencies, 0.50), 3),
+                'p90': round(percentile(latencies, 0.90), 3),
+                'p99': round(percentile(latencies, 0.99), 3),
+                'mean': round(statistics.fmean(latencies), 3),
+                'max': round(max(latencies), 3),
+            },
+        }
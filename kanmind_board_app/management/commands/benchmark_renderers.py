@@ -0,0 +1,82 @@
+import json
+import statistics
+import time
+from datetime import date, datetime, timedelta, timezone
+
+from django.core.management.base import BaseCommand
+from rest_framework.renderers import JSONRenderer
+
+from kanmind_board_app.api import renderers
+
+
+def board_payload(tasks, members):
+    """
+    Synthetic board detail payload (BoardDetailSerializer shape) with
+    `tasks` tasks, plus native dates/datetimes as the export rows have.
+    """
+    users = [{'id': i, 'fullname': f'Bench User {i}', 'email': f'bench{i}@example.com'} for i in range(members)]
+    start = datetime(2030, 1, 1, tzinfo=timezone.utc)
+    return {
+        'id': 1,
+        'title': 'Benchmark board',
+        'owner_id': 0,
+        'members': users,
+        'tasks': [{
+            'id': t,
+            'board': 1,
+            'title': f'Task {t} – ünïcode',
+            'description': 'Lorem ipsum dolor sit amet ' * 4,
+            'status': 'to_do',
+            'priority': 'high',
+            'due_date': date(2030, 1, 1) + timedelta(days=t % 30),
+            'updated_at': start + timedelta(seconds=t, microseconds=t),
+            'assignee': users[t % members],
+            'reviewer': users[(t + 1) % members],
+            'comments_count': t % 7,
+        } for t in range(tasks)],
+    }
+
+
+class Command(BaseCommand):
+    """
+    Time DRF's JSONRenderer against FastJSONRenderer (orjson, if
+    installed, and the stdlib fallback) on a synthetic board payload,
+    and check that all of them produce the same bytes. No database needed.
+    """
+    help = 'Microbenchmark the JSON renderers on a synthetic board payload.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tasks', type=int, default=1000)
+        parser.add_argument('--members', type=int, default=20)
+        parser.add_argument('--repeat', type=int, default=50)
+
+    def handle(self, *args, **options):
+        data = board_payload(options['tasks'], options['members'])
+        candidates = {
+            'drf': JSONRenderer(),
+            'stdlib': type('StdlibJSONRenderer', (renderers.FastJSONRenderer,), {'use_orjson': False})(),
+        }
+        if renderers.orjson is not None:
+            candidates['orjson'] = renderers.FastJSONRenderer()
+
+        expected = candidates['drf'].render(data)
+        results = {}
+        for name, renderer in candidates.items():
+            times = []
+            for _ in range(options['repeat']):
+                start = time.perf_counter()
+                body = renderer.render(data)
+                times.append((time.perf_counter() - start) * 1000)
+            results[name] = {
+                'median_ms': round(statistics.median(times), 3),
+                'identical': body == expected,
+            }
+        for name in results:
+            results[name]['speedup'] = round(results['drf']['median_ms'] / results[name]['median_ms'], 2)
+
+        self.stdout.write(json.dumps({
+            'tasks': options['tasks'],
+            'bytes': len(expected),
+            'repeat': options['repeat'],
+            'renderers': results,
+        }, indent=2))
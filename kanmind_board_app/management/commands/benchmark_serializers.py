@@ -0,0 +1,107 @@
+import json
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import CaptureQueriesContext, setup_test_environment, teardown_test_environment
+from rest_framework.renderers import JSONRenderer
+
+from kanmind_board_app.api import fast_serializers
+from kanmind_board_app.api.seralizers import (
+    BoardDetailSerializer, TaskSerializer, TaskAssignOrReviewerSerializer, CommentResponseSerializer
+)
+from kanmind_board_app.models import Board, Task, Comment
+from .benchmark_api import Dataset
+
+
+def shapes(data):
+    """
+    Return (name, drf, fast) pairs of callables producing the same payload,
+    each including its queries.
+    """
+    board, task, user = data.boards[0], data.tasks[0], data.user
+    return [
+        ('board_detail',
+         lambda: BoardDetailSerializer(Board.objects.with_details().get(pk=board.id)).data,
+         lambda: fast_serializers.board_detail(board.id)),
+        ('board_tasks',
+         lambda: TaskSerializer(Task.objects.with_profiles().filter(board=board).order_by('id'), many=True).data,
+         lambda: fast_serializers.FastTaskSerializer(
+             fast_serializers.task_rows(Task.objects.filter(board=board).order_by('id')), many=True).data),
+        ('assigned_tasks',
+         lambda: TaskAssignOrReviewerSerializer(Task.objects.with_profiles().filter(assignee=user), many=True).data,
+         lambda: fast_serializers.FastTaskSerializer(
+             fast_serializers.task_rows(Task.objects.filter(assignee=user)), many=True).data),
+        ('comments',
+         lambda: CommentResponseSerializer(Comment.objects.filter(task=task).select_related('author'), many=True).data,
+         lambda: fast_serializers.FastCommentSerializer(
+             fast_serializers.FastCommentSerializer.rows(Comment.objects.filter(task=task)), many=True).data),
+    ]
+
+
+class Command(BaseCommand):
+    """
+    Compare the DRF serializers with api/fast_serializers for the hot
+    response shapes on a throwaway test database: time to build and
+    render the payload (queries included), number of queries, and
+    whether the rendered bytes are identical.
+    """
+    help = 'Benchmark the fast serialization path against the DRF serializers.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=50)
+        parser.add_argument('--boards', type=int, default=5)
+        parser.add_argument('--members', type=int, default=20, help='Members per board.')
+        parser.add_argument('--tasks', type=int, default=500, help='Tasks per board.')
+        parser.add_argument('--comments', type=int, default=2, help='Comments per task.')
+        parser.add_argument('--repeat', type=int, default=20, help='Timed runs per shape and serializer.')
+        parser.add_argument('--output', help='Write the JSON report to this file instead of stdout.')
+
+    def handle(self, *args, **options):
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            report = self.run(options)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+        output = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as file:
+                file.write(output)
+            self.stdout.write(self.style.SUCCESS(f'Report written to {options["output"]}'))
+        else:
+            self.stdout.write(output)
+
+    def run(self, options):
+        data = Dataset(options['users'], options['boards'], options['members'],
+                       options['tasks'], options['comments'])
+        renderer = JSONRenderer()
+        results = {}
+        for name, drf, fast in shapes(data):
+            drf_body, drf_queries, drf_times = self.measure(drf, renderer, options['repeat'])
+            fast_body, fast_queries, fast_times = self.measure(fast, renderer, options['repeat'])
+            results[name] = {
+                'bytes': len(drf_body),
+                'identical': drf_body == fast_body,
+                'drf': {'median_ms': statistics.median(drf_times), 'queries': drf_queries},
+                'fast': {'median_ms': statistics.median(fast_times), 'queries': fast_queries},
+                'speedup': round(statistics.median(drf_times) / statistics.median(fast_times), 2),
+            }
+        return {
+            'dataset': {name: options[name] for name in ('users', 'boards', 'members', 'tasks', 'comments')},
+            'repeat': options['repeat'],
+            'shapes': results,
+        }
+
+    def measure(self, build, renderer, repeat):
+        with CaptureQueriesContext(connection) as queries:
+            body = renderer.render(build())
+        times = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            renderer.render(build())
+            times.append(round((time.perf_counter() - start) * 1000, 3))
+        return body, len(queries), times
@@ -0,0 +1,71 @@
+import re
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from kanmind_board_app.api import conditional, fast_serializers
+from kanmind_board_app.models import Board, Task, Comment
+
+
+FULL_SCAN_PATTERNS = {
+    # SQLite: "SCAN <table>" without an index, PostgreSQL: "Seq Scan on <table>"
+    'sqlite': re.compile(r'\bSCAN (?!.*\bUSING\b.*\bINDEX\b)'),
+    'postgresql': re.compile(r'\bSeq Scan on\b'),
+}
+
+
+def hot_queries(user_id, board_id, task_id):
+    """
+    Return (name, queryset) pairs mirroring the queries
+    the API views and serializers run on every request.
+    """
+    user = User(pk=user_id)
+    board, tasks = fast_serializers.board_detail_queries(board_id)
+    loaded_tasks = [{'assignee_id': user_id, 'reviewer_id': user_id}]
+    comments = Comment.objects.filter(task_id=task_id).order_by('created_at', 'id')
+    return [
+        ('boards list', Board.objects.visible_to(user).select_related('stats').order_by('id')),
+        ('board detail state', conditional.board_state_query(board_id, user)),
+        ('board detail', board),
+        ('board detail tasks', tasks),
+        ('board detail users', fast_serializers.board_people(board_id, loaded_tasks)),
+        ('tasks assigned to me', fast_serializers.task_rows(Task.objects.filter(assignee=user).order_by('id'))),
+        ('tasks reviewing', fast_serializers.task_rows(Task.objects.filter(reviewer=user).order_by('id'))),
+        ('task comments', fast_serializers.FastCommentSerializer.rows(comments)),
+    ]
+
+
+class Command(BaseCommand):
+    """
+    Run EXPLAIN on the hot endpoint queries and flag full table scans.
+    Use it after changing a query or an index to check that the
+    queries are still served by an index.
+    """
+    help = 'EXPLAIN the hot API queries and flag full table scans.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', type=int, default=1, help='User id used in the filters.')
+        parser.add_argument('--board', type=int, default=1, help='Board id used in the filters.')
+        parser.add_argument('--task', type=int, default=1, help='Task id used in the filters.')
+        parser.add_argument('--fail-on-scan', action='store_true', help='Exit with an error if a full scan is found.')
+
+    def handle(self, *args, **options):
+        pattern = FULL_SCAN_PATTERNS.get(connection.vendor)
+        if pattern is None:
+            self.stderr.write(f'No full scan detection for {connection.vendor}, printing plans only.')
+
+        flagged = []
+        for name, queryset in hot_queries(options['user'], options['board'], options['task']):
+            plan = queryset.explain()
+            scans = [line for line in plan.splitlines() if pattern and pattern.search(line)]
+            if scans:
+                flagged.append(name)
+                self.stdout.write(self.style.WARNING(f'[FULL SCAN] {name}'))
+            else:
+                self.stdout.write(self.style.SUCCESS(f'[OK] {name}'))
+            self.stdout.write(plan)
+            self.stdout.write('')
+
+        if flagged and options['fail_on_scan']:
+            raise CommandError(f'Full scans in: {", ".join(flagged)}')
@@ -0,0 +1,33 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from kanmind_board_app.export import CHUNK_SIZE, iter_board_ndjson
+from kanmind_board_app.models import Board
+
+
+class Command(BaseCommand):
+    """
+    Stream a board with its members, tasks and comments as NDJSON.
+    """
+    help = 'Export a board as NDJSON to a file or stdout.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('board_id', type=int)
+        parser.add_argument('--output', help='File to write, defaults to stdout.')
+        parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE, help='Rows fetched per database round trip.')
+
+    def handle(self, *args, **options):
+        if not Board.objects.filter(pk=options['board_id']).exists():
+            raise CommandError(f'Board {options["board_id"]} does not exist.')
+
+        chunks = iter_board_ndjson(options['board_id'], chunk_size=options['chunk_size'])
+        if options['output']:
+            with open(options['output'], 'wb') as file:
+                for chunk in chunks:
+                    file.write(chunk)
+            self.stderr.write(self.style.SUCCESS(f'Board exported to {options["output"]}'))
+        else:
+            for chunk in chunks:
+                sys.stdout.buffer.write(chunk)
+            sys.stdout.buffer.flush()
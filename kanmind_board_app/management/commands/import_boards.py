@@ -0,0 +1,55 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from kanmind_board_app.importer import BATCH_SIZE, BoardImporter, BoardImportError, iter_records
+from kanmind_board_app.models import ImportJob
+
+
+class Command(BaseCommand):
+    """
+    Import boards with members, tasks and comments from an NDJSON or
+    JSON array dump (the format written by export_board).
+    Rows are inserted with bulk_create in batches; a failed import
+    can be resumed with --resume <job id>.
+    """
+    help = 'Import boards from an NDJSON/JSON dump in batches.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE, help='Records per transaction.')
+        parser.add_argument('--resume', type=int, metavar='JOB_ID', help='Continue a failed import job.')
+        parser.add_argument('--owner', help='Email of the user who owns all imported boards.')
+
+    def handle(self, *args, **options):
+        owner = None
+        if options['owner']:
+            owner = User.objects.filter(email=options['owner']).first()
+            if owner is None:
+                raise CommandError(f'User {options["owner"]} does not exist.')
+
+        if options['resume']:
+            job = ImportJob.objects.filter(pk=options['resume']).first()
+            if job is None:
+                raise CommandError(f'Import job {options["resume"]} does not exist.')
+            if job.status == ImportJob.Status.done:
+                raise CommandError(f'Import job {job.pk} is already done.')
+        else:
+            job = ImportJob.objects.create(source=options['path'], owner=owner)
+        self.stderr.write(f'Import job {job.pk}, starting after record {job.records_done}')
+
+        importer = BoardImporter(job, batch_size=options['batch_size'], owner=owner)
+        try:
+            with open(options['path'], 'rb') as file:
+                report = importer.run(iter_records(file), progress=self.progress)
+        except BoardImportError as error:
+            raise CommandError(f'{error} Resume with --resume {job.pk} after fixing the input.')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Imported {report["records"]} records in {report["seconds"]}s '
+            f'({report["records_per_second"]} records/s): {report["board"]} boards, '
+            f'{report["member"]} members, {report["task"]} tasks, {report["comment"]} comments, '
+            f'{report["unknown_users"]} unknown users.'
+        ))
+
+    def progress(self, job):
+        self.stderr.write(f'  {job.records_done} records committed')
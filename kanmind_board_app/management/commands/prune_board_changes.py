@@ -0,0 +1,25 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from kanmind_board_app.models import BoardChange
+
+
+class Command(BaseCommand):
+    """
+    Delete board changes older than the retention period, so the change
+    log behind boards/<pk>/changes/ does not grow without bound. Clients
+    whose cursor points into the deleted part get a full snapshot with
+    `reset` on their next poll. Run it periodically, e.g. from cron.
+    """
+    help = 'Delete old rows of the board change log.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=float, default=getattr(settings, 'KANMIND_SYNC_RETENTION_DAYS', 30),
+                            help='Keep the changes of this many days.')
+
+    def handle(self, *args, **options):
+        deleted = BoardChange.prune(timezone.now() - timedelta(days=options['days']))
+        self.stdout.write(self.style.SUCCESS(f'Deleted {deleted} board change(s).'))
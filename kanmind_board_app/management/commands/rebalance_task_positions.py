@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from kanmind_board_app.models import Task
+
+
+class Command(BaseCommand):
+    """
+    Spread out the positions of the status columns whose neighbouring
+    tasks have come too close after many moves into the same gap.
+    Moves rebalance a column themselves when its gap runs out; running
+    this periodically (e.g. from cron) keeps that off the request path.
+    """
+    help = 'Rebalance task positions in crowded status columns.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('board_ids', nargs='*', type=int, help='Limit to these board ids.')
+        parser.add_argument('--min-gap', type=float, default=Task.POSITION_STEP / 2 ** 20,
+                            help='Rebalance columns with neighbours closer than this.')
+
+    def handle(self, *args, **options):
+        tasks = Task.objects.all()
+        if options['board_ids']:
+            tasks = tasks.filter(board_id__in=options['board_ids'])
+        columns = tasks.crowded_columns(min_gap=options['min_gap'])
+        renumbered = 0
+        for board_id, status in columns:
+            with transaction.atomic():
+                renumbered += Task.objects.rebalance(board_id, status)
+        self.stdout.write(self.style.SUCCESS(
+            f'Rebalanced {len(columns)} column(s), {renumbered} task(s) renumbered.'))
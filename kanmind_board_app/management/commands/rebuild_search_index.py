@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from kanmind_board_app import search
+
+
+class Command(BaseCommand):
+    """
+    Refill the SQLite FTS5 search table from the task and comment
+    tables, e.g. after rows were changed with raw SQL. PostgreSQL
+    uses expression indexes, which need no rebuild.
+    """
+    help = 'Rebuild the full-text search index.'
+
+    def handle(self, *args, **options):
+        kind = search.backend()
+        if kind == 'postgres':
+            self.stdout.write('PostgreSQL search uses expression indexes, nothing to rebuild.')
+            return
+        if kind != 'fts5':
+            raise CommandError('No search index: SQLite was built without FTS5, searches fall back to scans.')
+        with transaction.atomic():
+            search.rebuild()
+        self.stdout.write(self.style.SUCCESS('Search index rebuilt.'))
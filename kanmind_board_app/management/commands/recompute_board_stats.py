@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from kanmind_board_app.models import BoardStats
+
+
+class Command(BaseCommand):
+    """
+    Recompute the BoardStats counters from the source tables.
+    With --check the counters are only verified and the command
+    fails if any board is missing its row or has a wrong count.
+    """
+    help = 'Recompute or verify the denormalized board counters.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('board_ids', nargs='*', type=int, help='Limit to these board ids.')
+        parser.add_argument('--check', action='store_true', help='Only verify, do not write.')
+
+    def handle(self, *args, **options):
+        board_ids = options['board_ids'] or None
+
+        if options['check']:
+            mismatches = BoardStats.verify(board_ids=board_ids)
+            for board_id, stored, expected in mismatches:
+                self.stderr.write(f'Board {board_id}: stored {stored}, expected {expected}')
+            if mismatches:
+                raise CommandError(f'{len(mismatches)} board(s) have wrong counters.')
+            self.stdout.write(self.style.SUCCESS('All board counters are correct.'))
+            return
+
+        with transaction.atomic():
+            fixed = BoardStats.recompute(board_ids=board_ids)
+        self.stdout.write(self.style.SUCCESS(f'Recomputed counters, {fixed} board(s) fixed.'))
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.8 on 2026-10-18 07:06
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def populate_board_stats(apps, schema_editor):
+    Board = apps.get_model('kanmind_board_app', 'Board')
+    BoardStats = apps.get_model('kanmind_board_app', 'BoardStats')
+    BoardStats.objects.bulk_create([
+        BoardStats(
+            board=board,
+            member_count=board.members.count(),
+            ticket_count=board.tasks.count(),
+            tasks_to_do_count=board.tasks.filter(status='to_do').count(),
+            tasks_high_prio_count=board.tasks.filter(priority='high').count(),
+        )
+        for board in Board.objects.all()
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('kanmind_board_app', '0004_alter_task_priority_alter_task_status'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BoardStats',
+            fields=[
+                ('board', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='kanmind_board_app.board')),
+                ('member_count', models.PositiveIntegerField(default=0)),
+                ('ticket_count', models.PositiveIntegerField(default=0)),
+                ('tasks_to_do_count', models.PositiveIntegerField(default=0)),
+                ('tasks_high_prio_count', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(populate_board_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.8 on 2026-10-18 07:07
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('kanmind_board_app', '0005_boardstats'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['task', 'created_at'], name='comment_task_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['board', 'status'], name='task_board_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['board', 'priority'], name='task_board_priority_idx'),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.8 on 2026-10-18 07:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('kanmind_board_app', '0008_import_jobs'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BoardChange',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('board_id', models.BigIntegerField()),
+                ('kind', models.CharField(choices=[('board', 'Board'), ('task', 'Task'), ('comment', 'Comment'), ('member', 'Member')], max_length=10)),
+                ('object_id', models.BigIntegerField()),
+                ('action', models.CharField(choices=[('upsert', 'Upsert'), ('delete', 'Delete')], max_length=10)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['board_id', 'id'], name='board_change_cursor_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,59 @@
+from django.db import migrations
+
+
+# The SQL is spelled out here instead of imported from kanmind_board_app.search,
+# so later changes to that module cannot change what this migration does.
+
+TASK_VECTOR = "to_tsvector('simple', coalesce(title, '') || ' ' || coalesce(description, ''))"
+COMMENT_VECTOR = "to_tsvector('simple', coalesce(content, ''))"
+
+
+def fts5_available(schema_editor):
+    try:
+        with schema_editor.connection.cursor() as cursor:
+            cursor.execute('CREATE VIRTUAL TABLE temp.kanmind_fts5_probe USING fts5(content)')
+            cursor.execute('DROP TABLE temp.kanmind_fts5_probe')
+    except Exception:
+        return False
+    return True
+
+
+def create_search_index(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor == 'sqlite' and fts5_available(schema_editor):
+        schema_editor.execute(
+            "CREATE VIRTUAL TABLE kanmind_search USING fts5("
+            "content, kind UNINDEXED, task_id UNINDEXED, board_id UNINDEXED, "
+            "tokenize = 'unicode61 remove_diacritics 2')")
+        schema_editor.execute(
+            "INSERT INTO kanmind_search (rowid, kind, task_id, board_id, content) "
+            "SELECT id * 2, 'task', id, board_id, title || char(10) || description FROM kanmind_board_app_task")
+        schema_editor.execute(
+            "INSERT INTO kanmind_search (rowid, kind, task_id, board_id, content) "
+            "SELECT c.id * 2 + 1, 'comment', c.task_id, t.board_id, c.content "
+            "FROM kanmind_board_app_comment c JOIN kanmind_board_app_task t ON t.id = c.task_id")
+    elif connection.vendor == 'postgresql':
+        schema_editor.execute(
+            f'CREATE INDEX task_search_idx ON kanmind_board_app_task USING GIN ({TASK_VECTOR})')
+        schema_editor.execute(
+            f'CREATE INDEX comment_search_idx ON kanmind_board_app_comment USING GIN ({COMMENT_VECTOR})')
+
+
+def drop_search_index(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor == 'sqlite':
+        schema_editor.execute('DROP TABLE IF EXISTS kanmind_search')
+    elif connection.vendor == 'postgresql':
+        schema_editor.execute('DROP INDEX IF EXISTS task_search_idx')
+        schema_editor.execute('DROP INDEX IF EXISTS comment_search_idx')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('kanmind_board_app', '0009_board_changes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.8 on 2026-10-18 07:53
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+
+
+def number_columns(apps, schema_editor):
+    """
+    Existing tasks keep their creation (id) order within each column.
+    """
+    Task = apps.get_model('kanmind_board_app', 'Task')
+    rank = (Task.objects.filter(board_id=OuterRef('board_id'), status=OuterRef('status'), id__lte=OuterRef('id'))
+            .order_by().values('board_id').annotate(rank=Count('id')).values('rank'))
+    Task.objects.update(position=Subquery(rank) * 1024.0)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('kanmind_board_app', '0010_search_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='task',
+            name='task_board_status_idx',
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='position',
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['board', 'status', 'position'], name='task_board_status_pos_idx'),
+        ),
+        migrations.RunPython(number_columns, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-18 07:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('kanmind_board_app', '0011_task_position'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='task',
+            name='version',
+            field=models.PositiveIntegerField(default=1),
+        ),
+    ]
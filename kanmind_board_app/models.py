@@ -1,7 +1,159 @@
+from datetime import timedelta
+
 from django.db import models
+from django.db.models import Count, F, Max, Min, OuterRef, Prefetch, Q, Subquery, Window
+from django.db.models.functions import Coalesce, Lag
 from django.contrib.auth.models import User
 
 
+class BoardQuerySet(models.QuerySet):
+
+    def visible_to(self, user):
+        """
+        Boards where the user is owner or member.
+        Membership is checked with a subquery so the members
+        join does not multiply rows or restrict later annotations.
+        """
+        member_of = Board.members.through.objects.filter(user=user).values('board_id')
+        return self.filter(Q(owner=user) | Q(id__in=member_of))
+
+    def with_counts(self):
+        """
+        Annotate member_count, ticket_count, tasks_to_do_count and
+        tasks_high_prio_count. Each count is a correlated subquery,
+        so the whole list is loaded in a single query.
+        """
+        members = (Board.members.through.objects
+                   .filter(board_id=OuterRef('pk'))
+                   .order_by().values('board_id'))
+        tasks = Task.objects.filter(board=OuterRef('pk')).order_by().values('board')
+
+        def count_of(queryset, **filters):
+            counted = queryset.annotate(c=Count('pk', filter=Q(**filters) if filters else None))
+            return Coalesce(Subquery(counted.values('c')), 0)
+
+        return self.annotate(
+            member_count=count_of(members),
+            ticket_count=count_of(tasks),
+            tasks_to_do_count=count_of(tasks, status=Task.Status.to_do),
+            tasks_high_prio_count=count_of(tasks, priority=Task.Priority.high),
+        )
+
+    def with_details(self):
+        """
+        Prefetch members and tasks (with assignee, reviewer and
+        comments_count) for the board detail payload.
+        """
+        return self.prefetch_related(
+            'members',
+            Prefetch('tasks', queryset=Task.objects.with_profiles().in_column_order()),
+        )
+
+
+class TaskQuerySet(models.QuerySet):
+
+    def with_profiles(self):
+        """
+        Join assignee and reviewer and annotate comments_count,
+        so serializing a task list needs no per-task queries.
+        """
+        return self.select_related('assignee', 'reviewer').annotate(comments_count=Count('comments'))
+
+    def in_column_order(self):
+        """
+        Order by status column and position within it,
+        as stored in the (board, status, position) index.
+        """
+        return self.order_by('status', 'position', 'id')
+
+    def column(self, board_id, status):
+        return self.filter(board_id=board_id, status=status).order_by('position', 'id')
+
+    def end_position(self, board_id, status):
+        """
+        Position after the last task of a column.
+        """
+        top = self.filter(board_id=board_id, status=status).aggregate(top=Max('position'))['top']
+        return (top or 0) + Task.POSITION_STEP
+
+    def assign_end_positions(self, tasks):
+        """
+        Give unsaved tasks positions at the end of their columns,
+        in list order, with one query for all columns.
+        """
+        def column_of(task):
+            # The board may have been saved after the task was built.
+            return task.board_id if task.board_id is not None else task.board.pk, task.status
+
+        columns = {column_of(task) for task in tasks}
+        tops = {}
+        if columns:
+            rows = (self.filter(board_id__in={board_id for board_id, status in columns})
+                    .values('board_id', 'status').annotate(top=Max('position')).order_by())
+            tops = {(row['board_id'], row['status']): row['top'] for row in rows}
+        for task in tasks:
+            column = column_of(task)
+            task.position = tops[column] = (tops.get(column) or 0) + Task.POSITION_STEP
+
+    def rebalance(self, board_id, status):
+        """
+        Spread the positions of a column evenly, POSITION_STEP apart,
+        keeping the order. Returns the number of tasks renumbered.
+        """
+        tasks = list(self.column(board_id, status).only('id', 'position'))
+        for index, task in enumerate(tasks, start=1):
+            task.position = index * Task.POSITION_STEP
+        self.bulk_update(tasks, ['position'], batch_size=500)
+        return len(tasks)
+
+    def crowded_columns(self, min_gap=None):
+        """
+        (board_id, status) of the columns where two neighbouring
+        tasks are closer than `min_gap` (default POSITION_MIN_GAP).
+        """
+        min_gap = Task.POSITION_MIN_GAP if min_gap is None else min_gap
+        previous = Window(Lag('position'), partition_by=[F('board_id'), F('status')],
+                          order_by=[F('position').asc(), F('id').asc()])
+        gaps = self.annotate(gap=F('position') - previous).order_by()
+        return sorted({(row['board_id'], row['status'])
+                       for row in gaps.filter(gap__lt=min_gap).values('board_id', 'status')})
+
+    def summary_for(self, user, today):
+        """
+        Counts of the tasks the user is assigned to and reviewing, in one
+        aggregate query with a filtered COUNT per number:
+        - total, by_status, by_priority
+        - overdue: due before today and not done
+        - due_this_week: due from today until Sunday and not done
+        - next_due_date: earliest due date from today on of a task not done
+        """
+        roles = {'assigned': Q(assignee=user), 'reviewing': Q(reviewer=user)}
+        not_done = ~Q(status=Task.Status.done)
+        week_end = today + timedelta(days=6 - today.weekday())
+        aggregates = {}
+        for role, mine in roles.items():
+            aggregates[f'{role}_total'] = Count('pk', filter=mine)
+            for status in Task.Status.values:
+                aggregates[f'{role}_status_{status}'] = Count('pk', filter=mine & Q(status=status))
+            for priority in Task.Priority.values:
+                aggregates[f'{role}_priority_{priority}'] = Count('pk', filter=mine & Q(priority=priority))
+            aggregates[f'{role}_overdue'] = Count('pk', filter=mine & not_done & Q(due_date__lt=today))
+            aggregates[f'{role}_due_this_week'] = Count(
+                'pk', filter=mine & not_done & Q(due_date__gte=today, due_date__lte=week_end))
+            aggregates[f'{role}_next_due_date'] = Min('due_date', filter=mine & not_done & Q(due_date__gte=today))
+
+        values = self.filter(roles['assigned'] | roles['reviewing']).aggregate(**aggregates)
+        return {
+            role: {
+                'total': values[f'{role}_total'],
+                'by_status': {status: values[f'{role}_status_{status}'] for status in Task.Status.values},
+                'by_priority': {priority: values[f'{role}_priority_{priority}'] for priority in Task.Priority.values},
+                'overdue': values[f'{role}_overdue'],
+                'due_this_week': values[f'{role}_due_this_week'],
+                'next_due_date': values[f'{role}_next_due_date'],
+            }
+            for role in roles
+        }
 
 
 class Board(models.Model):
@@ -11,10 +163,14 @@ class Board(models.Model):
     - title: Name of the board
     - owner: User who created the board (one-to-many)
     - members: Users who are members of the board (many-to-many)
+    - updated_at: Timestamp of the last change
     """
     title = models.CharField(max_length=30)
     owner = models.ForeignKey(User, on_delete=models.CASCADE, related_name='boards_owner')
     members = models.ManyToManyField(User, related_name='boards_member', blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = BoardQuerySet.as_manager()
 
 
     def __str__(self):
@@ -34,7 +190,13 @@ class Task(models.Model):
     - reviewer: User assigned to review the task
     - due_date: Deadline for the task
     - owner: User who created the task
+    - updated_at: Timestamp of the last change
+    - position: Rank within the status column, see place()
+    - version: Incremented on every write, for optimistic concurrency
     """
+    POSITION_STEP = 1024.0
+    POSITION_MIN_GAP = 1e-6
+
     class Status(models.TextChoices):
         to_do = "to_do", "To Do"
         progress = "progress", "In Progress"
@@ -54,9 +216,59 @@ class Task(models.Model):
     reviewer = models.ForeignKey(User,on_delete=models.CASCADE, related_name='reviewed_tasks')
     due_date = models.DateField()
     owner = models.ForeignKey(User, on_delete=models.CASCADE, related_name='task_owner', null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    position = models.FloatField(default=0)
+    version = models.PositiveIntegerField(default=1)
+
+    objects = TaskQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['board', 'status', 'position'], name='task_board_status_pos_idx'),
+            models.Index(fields=['board', 'priority'], name='task_board_priority_idx'),
+        ]
 
     def __str__(self):
         return self.title
+
+    def place(self, status, after=None, before=None):
+        """
+        Move the task into `status`, directly after the task `after` or
+        before the task `before` (both in that column), or to its end.
+        Positions are sparse floats, so the task gets the midpoint of
+        its neighbours and no other row changes. Only when the gap has
+        run out is the column rebalanced first. Does not save.
+        """
+        column = Task.objects.column(self.board_id, status).exclude(pk=self.pk)
+        for attempt in range(2):
+            if after is not None:
+                low = after.position
+                following = column.filter(Q(position__gt=after.position) | Q(position=after.position, id__gt=after.id))
+                high = following.values_list('position', flat=True).first()
+            elif before is not None:
+                high = before.position
+                preceding = column.filter(Q(position__lt=before.position) | Q(position=before.position, id__lt=before.id))
+                low = preceding.reverse().values_list('position', flat=True).first()
+            else:
+                low, high = column.reverse().values_list('position', flat=True).first(), None
+
+            if low is None and high is None:
+                position = self.POSITION_STEP
+            elif high is None:
+                position = low + self.POSITION_STEP
+            elif low is None:
+                position = high - self.POSITION_STEP
+            else:
+                position = (low + high) / 2
+            if (high is None or high - position >= self.POSITION_MIN_GAP) and (
+                    low is None or position - low >= self.POSITION_MIN_GAP):
+                break
+            Task.objects.rebalance(self.board_id, status)
+            for neighbour in (after, before):
+                if neighbour is not None:
+                    neighbour.refresh_from_db(fields=['position'])
+        self.status = status
+        self.position = position
     
 class Comment(models.Model):
     """
@@ -66,14 +278,244 @@ class Comment(models.Model):
     - author: User who wrote the comment
     - content: Text content of the comment 
     - created_at: Timestamp of when the comment was created
+    - updated_at: Timestamp of the last change
     """
     task = models.ForeignKey(Task, on_delete=models.CASCADE, related_name='comments')
     author = models.ForeignKey(User, on_delete=models.CASCADE, related_name='authored_comments')
     content = models.TextField(max_length=200, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['task', 'created_at'], name='comment_task_created_idx'),
+        ]
 
     def __str__(self):
         return f'Comment by {self.author.username} on {self.task.title}'
 
-    
\ No newline at end of file
+    
+
+class BoardStats(models.Model):
+    """
+    Denormalized counters of a board, maintained on write.
+    Fields:
+    - board: Board the counters belong to (one-to-one)
+    - member_count: Number of board members
+    - ticket_count: Number of tasks on the board
+    - tasks_to_do_count: Number of tasks with status to_do
+    - tasks_high_prio_count: Number of tasks with priority high
+    """
+    COUNTERS = ('member_count', 'ticket_count', 'tasks_to_do_count', 'tasks_high_prio_count')
+
+    board = models.OneToOneField(Board, on_delete=models.CASCADE, primary_key=True, related_name='stats')
+    member_count = models.PositiveIntegerField(default=0)
+    ticket_count = models.PositiveIntegerField(default=0)
+    tasks_to_do_count = models.PositiveIntegerField(default=0)
+    tasks_high_prio_count = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f'Stats of board {self.board_id}'
+
+    @staticmethod
+    def task_counters(status, priority):
+        """
+        Return the counters a single task with the given
+        status and priority contributes to.
+        """
+        return {
+            'ticket_count': 1,
+            'tasks_to_do_count': int(status == Task.Status.to_do),
+            'tasks_high_prio_count': int(priority == Task.Priority.high),
+        }
+
+    @classmethod
+    def apply_task_change(cls, board_id, before=None, after=None):
+        """
+        Adjust the counters for a task change.
+        - before: (status, priority) of the task before the write, None on create
+        - after: (status, priority) of the task after the write, None on delete
+        Must be called after the write, inside the same transaction.
+        """
+        cls.apply_task_changes([(board_id, before, after)])
+
+    @classmethod
+    def apply_task_changes(cls, changes):
+        """
+        Adjust the counters for many task changes at once,
+        issuing one UPDATE per affected board.
+        - changes: iterable of (board_id, before, after) as in apply_task_change
+        """
+        deltas_by_board = {}
+        for board_id, before, after in changes:
+            deltas = deltas_by_board.setdefault(board_id, dict.fromkeys(cls.COUNTERS[1:], 0))
+            if before is not None:
+                for name, value in cls.task_counters(*before).items():
+                    deltas[name] -= value
+            if after is not None:
+                for name, value in cls.task_counters(*after).items():
+                    deltas[name] += value
+
+        for board_id, deltas in deltas_by_board.items():
+            changes = {name: F(name) + delta for name, delta in deltas.items() if delta}
+            if changes and not cls.objects.filter(board_id=board_id).update(**changes):
+                cls.recompute(board_ids=[board_id])
+
+    @classmethod
+    def refresh_members(cls, board):
+        """
+        Recount the members of a board after a membership change.
+        """
+        updated = cls.objects.filter(board=board).update(member_count=board.members.count())
+        if not updated:
+            cls.recompute(board_ids=[board.id])
+
+    @classmethod
+    def recompute(cls, board_ids=None):
+        """
+        Recompute counters from the source tables.
+        Returns the number of rows that were missing or wrong.
+        """
+        fixed = 0
+        for board, expected in cls._expected(board_ids):
+            stats = getattr(board, 'stats', None)
+            if stats is not None and all(getattr(stats, name) == expected[name] for name in cls.COUNTERS):
+                continue
+            cls.objects.update_or_create(board=board, defaults=expected)
+            fixed += 1
+        return fixed
+
+    @classmethod
+    def verify(cls, board_ids=None):
+        """
+        Compare stored counters with the source tables without writing.
+        Returns a list of (board_id, stored, expected) for mismatches.
+        """
+        mismatches = []
+        for board, expected in cls._expected(board_ids):
+            stats = getattr(board, 'stats', None)
+            stored = {name: getattr(stats, name) for name in cls.COUNTERS} if stats else None
+            if stored != expected:
+                mismatches.append((board.id, stored, expected))
+        return mismatches
+
+    @classmethod
+    def _expected(cls, board_ids):
+        boards = Board.objects.with_counts().select_related('stats').order_by('id')
+        if board_ids is not None:
+            boards = boards.filter(id__in=board_ids)
+        for board in boards:
+            yield board, {name: getattr(board, name) for name in cls.COUNTERS}
+
+
+class ImportJob(models.Model):
+    """
+    Progress of a board import, used to resume it after a failure.
+    Fields:
+    - source: Name of the imported file
+    - owner: User who started the import, owner of the boards when set
+    - status: running, done or failed
+    - records_done: Number of input records already committed
+    - current_board: Board the following task/member rows belong to
+    - created_at / updated_at: Timestamps
+    """
+    class Status(models.TextChoices):
+        running = "running", "Running"
+        done = "done", "Done"
+        failed = "failed", "Failed"
+
+    source = models.CharField(max_length=255)
+    owner = models.ForeignKey(User, on_delete=models.SET_NULL, related_name='import_jobs', null=True, blank=True)
+    status = models.CharField(max_length=20, choices=Status.choices, default=Status.running)
+    records_done = models.PositiveBigIntegerField(default=0)
+    current_board = models.ForeignKey(Board, on_delete=models.SET_NULL, related_name='+', null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f'Import {self.pk} of {self.source}'
+
+
+class ImportedObject(models.Model):
+    """
+    Maps an id from an import file to the row created for it.
+    Fields:
+    - job: Import the row belongs to
+    - kind: 'board' or 'task'
+    - source_id: Id in the import file
+    - target_id: Id of the created row
+    """
+    job = models.ForeignKey(ImportJob, on_delete=models.CASCADE, related_name='imported_objects')
+    kind = models.CharField(max_length=10)
+    source_id = models.BigIntegerField()
+    target_id = models.BigIntegerField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['job', 'kind', 'source_id'], name='imported_object_unique'),
+        ]
+
+
+class BoardChange(models.Model):
+    """
+    Change log of a board, read by the incremental sync endpoint.
+    Fields:
+    - id: Monotonically increasing sequence, used as the sync cursor
+    - board_id: Board the change belongs to (no FK, so rows can be
+      written while the board is being deleted)
+    - kind: Changed object type (board, task, comment, member)
+    - object_id: Id of the changed object (user id for members)
+    - action: upsert or delete
+    - created_at: Timestamp of the change
+    """
+    class Kind(models.TextChoices):
+        board = "board", "Board"
+        task = "task", "Task"
+        comment = "comment", "Comment"
+        member = "member", "Member"
+
+    class Action(models.TextChoices):
+        upsert = "upsert", "Upsert"
+        delete = "delete", "Delete"
+
+    board_id = models.BigIntegerField()
+    kind = models.CharField(max_length=10, choices=Kind.choices)
+    object_id = models.BigIntegerField()
+    action = models.CharField(max_length=10, choices=Action.choices)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['board_id', 'id'], name='board_change_cursor_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.action} {self.kind} {self.object_id} on board {self.board_id}'
+
+    @classmethod
+    def record(cls, board_id, kind, object_ids, action):
+        """
+        Append one change per object id and return the new rows.
+        """
+        return cls.objects.bulk_create([
+            cls(board_id=board_id, kind=kind, object_id=object_id, action=action)
+            for object_id in object_ids
+        ])
+
+    @classmethod
+    def oldest_id(cls):
+        return cls.objects.order_by('id').values_list('id', flat=True).first()
+
+    @classmethod
+    def prune(cls, before):
+        """
+        Delete the changes logged before `before`, by id, so that every
+        remaining change is newer than every deleted one. The latest
+        change is always kept, so oldest_id() still shows how far the
+        log was pruned. Returns the number of rows deleted.
+        """
+        bounds = cls.objects.aggregate(horizon=Max('id', filter=Q(created_at__lt=before)), latest=Max('id'))
+        if bounds['horizon'] is None:
+            return 0
+        deleted, _ = cls.objects.filter(id__lte=min(bounds['horizon'], bounds['latest'] - 1)).delete()
+        return deleted
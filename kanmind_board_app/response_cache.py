@@ -0,0 +1,116 @@
+"""
+Versioned response cache for the board endpoints.
+
+Every board and every user has a version number stored in the cache.
+Cached payloads are keyed by that version, so bumping the version on
+write makes old entries unreachable without having to find and delete them.
+Versions start at a time based value, so an evicted version can never
+fall back onto an older payload. Payloads that are about to be cached
+are read from the primary database (see filling()), as a replica may
+still return the data from before the write that bumped the version.
+"""
+import contextlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.http import HttpResponse
+
+from kanmind.database import primary
+from kanmind_board_app.api.renderers import json_renderer
+
+
+def get_cache():
+    """
+    Return the cache backend configured in KANMIND_RESPONSE_CACHE.
+    """
+    return caches[getattr(settings, 'KANMIND_RESPONSE_CACHE', 'default')]
+
+
+def get_timeout():
+    return getattr(settings, 'KANMIND_RESPONSE_CACHE_TIMEOUT', 300)
+
+
+def _version(key):
+    cache = get_cache()
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, time.time_ns(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+async def _aversion(key):
+    cache = get_cache()
+    version = await cache.aget(key)
+    if version is None:
+        await cache.aadd(key, time.time_ns(), timeout=None)
+        version = await cache.aget(key)
+    return version
+
+
+def _bump(key):
+    cache = get_cache()
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time.time_ns(), timeout=None)
+
+
+def board_detail_key(board_id):
+    return f'kanmind:board-detail:{board_id}:{_version(f"kanmind:board-version:{board_id}")}'
+
+
+def board_list_key(user_id):
+    return f'kanmind:board-list:{user_id}:{_version(f"kanmind:user-version:{user_id}")}'
+
+
+async def aboard_detail_key(board_id):
+    return f'kanmind:board-detail:{board_id}:{await _aversion(f"kanmind:board-version:{board_id}")}'
+
+
+async def aboard_list_key(user_id):
+    return f'kanmind:board-list:{user_id}:{await _aversion(f"kanmind:user-version:{user_id}")}'
+
+
+def invalidate(board_ids=(), user_ids=()):
+    """
+    Bump the versions of the given boards and users.
+    The bump runs now and again after the transaction commits,
+    so a read racing with the write cannot cache the old data
+    under the new version.
+    """
+    keys = [f'kanmind:board-version:{board_id}' for board_id in board_ids]
+    keys += [f'kanmind:user-version:{user_id}' for user_id in user_ids]
+
+    def bump():
+        for key in keys:
+            _bump(key)
+
+    bump()
+    transaction.on_commit(bump)
+
+
+def is_cacheable(request):
+    """
+    Only plain JSON requests are served from the cache; paginated
+    and browsable API requests always go through the serializers.
+    """
+    return not request.query_params and request.accepted_renderer.format == 'json'
+
+
+def filling(cacheable=True):
+    """
+    Context for loading a payload (and its ETag) that will be cached:
+    reads go to the primary if `cacheable`, else nothing changes.
+    """
+    return primary() if cacheable else contextlib.nullcontext()
+
+
+def render(data):
+    return json_renderer().render(data)
+
+
+def json_response(body, status=200):
+    return HttpResponse(body, content_type='application/json', status=status)
@@ -0,0 +1,199 @@
+"""
+Full-text search over task titles, descriptions and comments.
+
+- SQLite: an FTS5 table (kanmind_search) with one row per task and one
+  per comment, kept in sync by the signals in kanmind_board_app.signals
+  and by explicit index_* calls on the bulk paths. Row ids encode the
+  object (task id * 2, comment id * 2 + 1), so updates and deletes are
+  rowid lookups.
+- PostgreSQL: GIN indexes on to_tsvector() of the same columns, queried
+  with the identical expression so the planner can use them (keep
+  PG_*_VECTOR in step with migration 0010). Nothing has to be kept in
+  sync.
+- Anything else (or SQLite built without FTS5): icontains scans.
+
+TaskSearch gives the ranked ids of matching tasks.
+"""
+import re
+
+from django.db import connection
+from django.db.models import Q
+
+from kanmind_board_app.models import Board, Task, Comment
+
+
+FTS_TABLE = 'kanmind_search'
+
+PG_TASK_VECTOR = "to_tsvector('simple', coalesce(title, '') || ' ' || coalesce(description, ''))"
+PG_COMMENT_VECTOR = "to_tsvector('simple', coalesce(content, ''))"
+
+
+def backend():
+    """
+    Return 'fts5', 'postgres' or 'scan' for the current database.
+    """
+    if connection.vendor == 'postgresql':
+        return 'postgres'
+    if connection.vendor == 'sqlite' and has_fts_table():
+        return 'fts5'
+    return 'scan'
+
+
+def has_fts_table():
+    if getattr(connection, '_kanmind_fts5', False):
+        return True
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", [FTS_TABLE])
+        found = cursor.fetchone() is not None
+    if found:
+        connection._kanmind_fts5 = True
+    return found
+
+
+def fts_query(text):
+    """
+    Turn user input into an FTS5 query: every word must match,
+    as a prefix, and FTS5 operators in the input are ignored.
+    """
+    words = re.findall(r'\w+', text)
+    return ' '.join(f'"{word}"*' for word in words)
+
+
+def task_row(task):
+    return (task.id * 2, 'task', task.id, task.board_id, f'{task.title}\n{task.description}')
+
+
+def comment_row(comment, board_id):
+    return (comment.id * 2 + 1, 'comment', comment.task_id, board_id, comment.content)
+
+
+def write_rows(rows):
+    rows = list(rows)
+    if not rows:
+        return
+    with connection.cursor() as cursor:
+        cursor.executemany(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [(row[0],) for row in rows])
+        cursor.executemany(
+            f'INSERT INTO {FTS_TABLE} (rowid, kind, task_id, board_id, content) VALUES (%s, %s, %s, %s, %s)', rows)
+
+
+def delete_rows(rowids):
+    rowids = list(rowids)
+    if rowids:
+        with connection.cursor() as cursor:
+            cursor.executemany(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [(rowid,) for rowid in rowids])
+
+
+def index_tasks(tasks):
+    if backend() == 'fts5':
+        write_rows(task_row(task) for task in tasks)
+
+
+def index_comments(comments):
+    """
+    (Re)index comments, given as (comment, board_id) pairs.
+    """
+    if backend() == 'fts5':
+        write_rows(comment_row(comment, board_id) for comment, board_id in comments)
+
+
+def unindex_task(task_id):
+    if backend() == 'fts5':
+        delete_rows([task_id * 2])
+
+
+def unindex_comment(comment_id):
+    if backend() == 'fts5':
+        delete_rows([comment_id * 2 + 1])
+
+
+def unindex_board(board_id):
+    """
+    Remove the rows of all tasks and comments of a board in one statement.
+    """
+    if backend() == 'fts5':
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE board_id = %s', [board_id])
+
+
+def rebuild():
+    """
+    Refill the FTS5 table from the task and comment tables.
+    """
+    task_table, comment_table = Task._meta.db_table, Comment._meta.db_table
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {FTS_TABLE}')
+        cursor.execute(
+            f"INSERT INTO {FTS_TABLE} (rowid, kind, task_id, board_id, content) "
+            f"SELECT id * 2, 'task', id, board_id, title || char(10) || description FROM {task_table}")
+        cursor.execute(
+            f"INSERT INTO {FTS_TABLE} (rowid, kind, task_id, board_id, content) "
+            f"SELECT c.id * 2 + 1, 'comment', c.task_id, t.board_id, c.content "
+            f"FROM {comment_table} c JOIN {task_table} t ON t.id = c.task_id")
+
+
+class TaskSearch:
+    """
+    Ranked ids of the tasks on boards the user can access whose title,
+    description or comments match `text`, best match first. Evaluated
+    lazily with count() and slicing, so Django's Paginator (and DRF's
+    page number pagination) only fetch the requested page.
+    """
+
+    def __init__(self, user, text):
+        self.user = user
+        self.text = text
+        self.kind = backend()
+        self.words = re.findall(r'\w+', text)
+
+    def source(self):
+        boards_sql, boards_params = Board.objects.visible_to(self.user).values('id').query.sql_with_params()
+        if self.kind == 'fts5':
+            # LIMIT -1 keeps SQLite from flattening the subquery, bm25() only works directly on the FTS table.
+            sql = (f'SELECT task_id, MIN(score) AS rank FROM ('
+                   f'SELECT task_id, bm25({FTS_TABLE}) AS score FROM {FTS_TABLE} '
+                   f'WHERE {FTS_TABLE} MATCH %s AND board_id IN ({boards_sql}) LIMIT -1'
+                   f') hits GROUP BY task_id')
+            return sql, [fts_query(self.text), *boards_params], 'rank, task_id'
+
+        task_table, comment_table = Task._meta.db_table, Comment._meta.db_table
+        sql = (
+            f"SELECT task_id, MAX(rank) AS rank FROM ("
+            f"SELECT id AS task_id, ts_rank({PG_TASK_VECTOR}, websearch_to_tsquery('simple', %s)) AS rank "
+            f"FROM {task_table} WHERE {PG_TASK_VECTOR} @@ websearch_to_tsquery('simple', %s) "
+            f"AND board_id IN ({boards_sql}) "
+            f"UNION ALL "
+            f"SELECT task_id, ts_rank({PG_COMMENT_VECTOR}, websearch_to_tsquery('simple', %s)) "
+            f"FROM {comment_table} WHERE {PG_COMMENT_VECTOR} @@ websearch_to_tsquery('simple', %s) "
+            f"AND task_id IN (SELECT id FROM {task_table} WHERE board_id IN ({boards_sql}))"
+            f") hits GROUP BY task_id")
+        text = self.text
+        return sql, [text, text, *boards_params, text, text, *boards_params], 'rank DESC, task_id'
+
+    def scan(self):
+        matches = Q()
+        for word in self.words:
+            matches &= Q(title__icontains=word) | Q(description__icontains=word) | Q(comments__content__icontains=word)
+        return (Task.objects.filter(board__in=Board.objects.visible_to(self.user)).filter(matches)
+                .distinct().order_by('-updated_at', 'id').values_list('id', flat=True))
+
+    def count(self):
+        if not self.words:
+            return 0
+        if self.kind == 'scan':
+            return self.scan().count()
+        sql, params, order = self.source()
+        with connection.cursor() as cursor:
+            cursor.execute(f'SELECT COUNT(*) FROM ({sql}) matches', params)
+            return cursor.fetchone()[0]
+
+    def __getitem__(self, page):
+        if not self.words:
+            return []
+        if self.kind == 'scan':
+            return list(self.scan()[page])
+        sql, params, order = self.source()
+        with connection.cursor() as cursor:
+            cursor.execute(f'SELECT task_id FROM ({sql}) matches ORDER BY {order} LIMIT %s OFFSET %s',
+                           [*params, page.stop - page.start, page.start])
+            return [row[0] for row in cursor.fetchall()]
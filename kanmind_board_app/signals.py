@@ -0,0 +1,163 @@
+from django.contrib.auth.models import User
+from django.db.models import Q, QuerySet
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from kanmind_board_app import events, response_cache, search
+from kanmind_board_app.models import Board, Task, Comment, BoardChange, BoardStats
+
+
+def board_user_ids(board_id):
+    """
+    Return the ids of the owner and all members of a board.
+    """
+    owner_ids = Board.objects.filter(pk=board_id).values_list('owner_id', flat=True)
+    member_ids = Board.members.through.objects.filter(board_id=board_id).values_list('user_id', flat=True)
+    return set(owner_ids) | set(member_ids)
+
+
+def invalidate_board(board_id, user_ids=()):
+    """
+    Invalidate the detail of a board and the board list of everyone who sees it.
+    """
+    response_cache.invalidate(board_ids=[board_id], user_ids=set(user_ids) | board_user_ids(board_id))
+
+
+def record_change(board_id, kind, object_ids, action):
+    """
+    Log the change for incremental sync and publish it to live subscribers.
+    """
+    events.publish_changes(BoardChange.record(board_id, kind, object_ids, action))
+
+
+def upsert_or_delete(signal):
+    return BoardChange.Action.delete if signal is post_delete else BoardChange.Action.upsert
+
+
+def deleted_with_board(signal, origin):
+    """
+    Whether a post_delete comes from a cascade of a board delete. The
+    board's own handlers invalidate it, drop its change log and search
+    rows once, so its tasks and comments need nothing per row.
+    """
+    if signal is not post_delete:
+        return False
+    return isinstance(origin, Board) or (isinstance(origin, QuerySet) and origin.model is Board)
+
+
+@receiver(post_save, sender=Board)
+def board_saved(sender, instance, **kwargs):
+    invalidate_board(instance.pk)
+    record_change(instance.pk, BoardChange.Kind.board, [instance.pk], BoardChange.Action.upsert)
+
+
+@receiver(pre_delete, sender=Board)
+def board_deleted(sender, instance, **kwargs):
+    invalidate_board(instance.pk)
+    search.unindex_board(instance.pk)
+
+
+@receiver(post_delete, sender=Board)
+def board_change_log_deleted(sender, instance, **kwargs):
+    BoardChange.objects.filter(board_id=instance.pk).delete()
+    events.publish_board_deleted(instance.pk)
+
+
+@receiver(m2m_changed, sender=Board.members.through)
+def board_members_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'pre_clear'):
+        return
+    change = BoardChange.Action.upsert if action == 'post_add' else BoardChange.Action.delete
+    if reverse:
+        board_ids = pk_set if pk_set is not None else instance.boards_member.values_list('id', flat=True)
+        for board_id in list(board_ids):
+            invalidate_board(board_id, user_ids=[instance.pk])
+            record_change(board_id, BoardChange.Kind.member, [instance.pk], change)
+    else:
+        if pk_set is None:
+            pk_set = set(instance.members.values_list('id', flat=True))
+        invalidate_board(instance.pk, user_ids=pk_set)
+        record_change(instance.pk, BoardChange.Kind.member, pk_set, change)
+
+
+@receiver([post_save, post_delete], sender=Task)
+def task_changed(sender, instance, signal, origin=None, **kwargs):
+    if deleted_with_board(signal, origin):
+        return
+    invalidate_board(instance.board_id)
+    record_change(instance.board_id, BoardChange.Kind.task, [instance.pk], upsert_or_delete(signal))
+    if signal is post_delete:
+        search.unindex_task(instance.pk)
+    else:
+        search.index_tasks([instance])
+
+
+@receiver([post_save, post_delete], sender=Comment)
+def comment_changed(sender, instance, signal, origin=None, **kwargs):
+    """
+    Comments only show up as comments_count in the board detail,
+    so only the board version is bumped. The task is logged as
+    changed too, as its comments_count changed.
+    """
+    if deleted_with_board(signal, origin):
+        return
+    if Comment.task.is_cached(instance):
+        board_id = instance.task.board_id
+    else:
+        board_id = Task.objects.filter(pk=instance.task_id).values_list('board_id', flat=True).first()
+    if board_id is not None:
+        response_cache.invalidate(board_ids=[board_id])
+        record_change(board_id, BoardChange.Kind.comment, [instance.pk], upsert_or_delete(signal))
+        record_change(board_id, BoardChange.Kind.task, [instance.task_id], BoardChange.Action.upsert)
+    if signal is post_delete:
+        search.unindex_comment(instance.pk)
+    elif board_id is not None:
+        search.index_comments([(instance, board_id)])
+
+
+@receiver(pre_delete, sender=User)
+def user_deleting(sender, instance, **kwargs):
+    """
+    Deleting a user cascades to their tasks and memberships without
+    going through the write paths that maintain BoardStats. Remember
+    the boards involved, so they can be recomputed after the delete.
+    """
+    tasks = Task.objects.filter(Q(owner=instance) | Q(assignee=instance) | Q(reviewer=instance))
+    instance._kanmind_stats_board_ids = (set(tasks.values_list('board_id', flat=True))
+                                         | set(instance.boards_member.values_list('id', flat=True)))
+
+
+@receiver(post_delete, sender=User)
+def user_deleted(sender, instance, **kwargs):
+    board_ids = getattr(instance, '_kanmind_stats_board_ids', None)
+    if board_ids:
+        BoardStats.recompute(board_ids=board_ids)
+
+
+@receiver(post_save, sender=User)
+def user_profile_changed(sender, instance, created, update_fields=None, **kwargs):
+    """
+    Board details and task lists embed the name and email of members,
+    assignees and reviewers. Touch the boards the user appears on and
+    the tasks they are assignee or reviewer of, so the ETags of both
+    change, bump the cached details and log the tasks as changed.
+    Saves that cannot change the profile (e.g. last_login only) are
+    skipped.
+    """
+    if created or (update_fields is not None and not {'first_name', 'last_name', 'email'} & set(update_fields)):
+        return
+    now = timezone.now()
+    tasks = Task.objects.filter(Q(assignee=instance) | Q(reviewer=instance))
+    task_ids_by_board = {}
+    for task_id, board_id in tasks.values_list('id', 'board_id'):
+        task_ids_by_board.setdefault(board_id, []).append(task_id)
+    if task_ids_by_board:
+        Task.objects.filter(id__in=[pk for ids in task_ids_by_board.values() for pk in ids]).update(updated_at=now)
+    memberships = Board.members.through.objects.filter(user=instance)
+    board_ids = set(memberships.values_list('board_id', flat=True)) | set(task_ids_by_board)
+    if board_ids:
+        Board.objects.filter(id__in=board_ids).update(updated_at=now)
+        response_cache.invalidate(board_ids=board_ids)
+    for board_id, task_ids in task_ids_by_board.items():
+        record_change(board_id, BoardChange.Kind.task, task_ids, BoardChange.Action.upsert)
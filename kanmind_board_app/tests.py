@@ -1,3 +1,1346 @@
-from django.test import TestCase
+import asyncio
+import json
+import time as time_module
+from datetime import date, datetime, time, timedelta, timezone as dt_timezone
+from decimal import Decimal
+from io import BytesIO, StringIO
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.http import JsonResponse
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import AsyncRequestFactory, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import serializers
+from rest_framework.authtoken.models import Token
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.serializer_helpers import ReturnDict
+from rest_framework.test import APITestCase
+
+from kanmind.database import ReadReplicaRouter, database_config, database_routers, use_replica
+from kanmind.middleware import QueryInstrumentationMiddleware, ReadReplicaMiddleware
+from kanmind_board_app.models import Board, Task, Comment, BoardStats, ImportJob, BoardChange
+from kanmind_board_app.export import iter_board_ndjson, iter_board_rows
+from kanmind_board_app.importer import BoardImporter, BoardImportError, iter_records
+from kanmind_board_app import events, response_cache, search
+from kanmind_board_app.api import async_views, fast_serializers, renderers, stream, views
+from kanmind_board_app.management.commands.explain_hot_queries import hot_queries
+from kanmind_board_app.api.seralizers import (
+    BoardDetailSerializer, TaskSerializer, TaskAssignOrReviewerSerializer, CommentResponseSerializer
+)
+
+
+class KanmindTestCase(APITestCase):
+    """
+    Base test case that starts every test with an empty response cache.
+    """
+
+    def setUp(self):
+        response_cache.get_cache().clear()
+
+
+class BoardsViewTests(KanmindTestCase):
+    """
+    Tests for the board overview (GET /api/boards/).
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user('owner@example.com', 'owner@example.com', 'pw')
+        self.other = User.objects.create_user('member@example.com', 'member@example.com', 'pw')
+        self.client.force_authenticate(self.user)
+
+    def create_board(self, tasks=3):
+        board = Board.objects.create(title='Board', owner=self.user)
+        board.members.add(self.user, self.other)
+        for i in range(tasks):
+            Task.objects.create(
+                board=board, title=f'Task {i}', assignee=self.user, reviewer=self.other,
+                due_date=date(2030, 1, 1),
+                status=Task.Status.to_do if i % 2 == 0 else Task.Status.done,
+                priority=Task.Priority.high if i == 0 else Task.Priority.low,
+            )
+        BoardStats.recompute(board_ids=[board.id])
+        return board
+
+    def test_counts(self):
+        board = self.create_board(tasks=3)
+        Board.objects.create(title='Foreign', owner=self.other)
+
+        response = self.client.get(reverse('boards-list-create'))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), [{
+            'id': board.id, 'title': 'Board', 'member_count': 2, 'ticket_count': 3,
+            'tasks_to_do_count': 2, 'tasks_high_prio_count': 1, 'owner_id': self.user.id,
+        }])
+
+    def test_query_count_does_not_grow_with_boards(self):
+        self.create_board()
+        with self.assertNumQueries(1):
+            self.client.get(reverse('boards-list-create'))
+
+        for _ in range(10):
+            self.create_board()
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('boards-list-create'))
+        self.assertEqual(len(response.json()), 11)
+
+    def test_boards_without_stats_rows_are_counted_in_one_query(self):
+        for _ in range(5):
+            self.create_board()
+        expected = self.client.get(reverse('boards-list-create')).json()
+        BoardStats.objects.all().delete()
+        response_cache.get_cache().clear()
+
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('boards-list-create'))
+        self.assertEqual(response.json(), expected)
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('boards-list-create'), {'page_size': 2})
+        self.assertEqual(response.data['results'], expected[:2])
+
+    def test_keyset_pagination(self):
+        boards = [self.create_board(tasks=0) for _ in range(5)]
+
+        response = self.client.get(reverse('boards-list-create'), {'page_size': 2})
+        seen = [board['id'] for board in response.data['results']]
+        while response.data['next']:
+            response = self.client.get(response.data['next'])
+            seen += [board['id'] for board in response.data['results']]
+
+        self.assertEqual(seen, [board.id for board in boards])
+        previous = self.client.get(response.data['previous'])
+        self.assertEqual([board['id'] for board in previous.data['results']], seen[2:4])
+
+
+class BoardDetailViewTests(KanmindTestCase):
+    """
+    Tests for the board detail (GET /api/boards/<pk>/).
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user('owner@example.com', 'owner@example.com', 'pw')
+        self.other = User.objects.create_user('member@example.com', 'member@example.com', 'pw')
+        self.board = Board.objects.create(title='Board', owner=self.user)
+        self.board.members.add(self.other)
+        self.client.force_authenticate(self.other)
+
+    def add_task(self):
+        task = Task.objects.create(
+            board=self.board, title='Task', assignee=self.user, reviewer=self.other,
+            due_date=date(2030, 1, 1),
+        )
+        Comment.objects.create(task=task, author=self.user, content='Hi')
+        return task
+
+    def test_query_count_does_not_grow_with_tasks(self):
+        url = reverse('board-detail', args=[self.board.id])
+        self.add_task()
+        with self.assertNumQueries(4):
+            self.client.get(url)
+
+        for _ in range(10):
+            self.add_task()
+        with self.assertNumQueries(4):
+            response = self.client.get(url)
+        self.assertEqual(len(response.json()['tasks']), 11)
+        self.assertEqual(response.json()['tasks'][0]['comments_count'], 1)
+        self.assertEqual(response.json()['members'][0]['id'], self.other.id)
+
+    def test_cached_until_write(self):
+        url = reverse('board-detail', args=[self.board.id])
+        task = self.add_task()
+        self.client.get(url)
+        with self.assertNumQueries(0):
+            self.assertEqual(len(self.client.get(url).json()['tasks']), 1)
+
+        task.delete()
+        self.assertEqual(self.client.get(url).json()['tasks'], [])
+
+        outsider = User.objects.create_user('out@example.com', 'out@example.com', 'pw')
+        self.client.force_authenticate(outsider)
+        self.assertEqual(self.client.get(url).status_code, 403)
+
+    def test_conditional_get(self):
+        url = reverse('board-detail', args=[self.board.id])
+        task = self.add_task()
+        etag = self.client.get(url)['ETag']
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        response_cache.get_cache().clear()
+        with self.assertNumQueries(1):
+            self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        task.title = 'Renamed'
+        task.save()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_forbidden_for_outsider(self):
+        outsider = User.objects.create_user('out@example.com', 'out@example.com', 'pw')
+        self.client.force_authenticate(outsider)
+        response = self.client.get(reverse('board-detail', args=[self.board.id]))
+        self.assertEqual(response.status_code, 403)
+
+    def test_renamed_member_changes_detail_and_etag(self):
+        url = reverse('board-detail', args=[self.board.id])
+        self.add_task()
+        etag = self.client.get(url)['ETag']
+
+        self.other.first_name = 'Renamed'
+        self.other.save()
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['members'][0]['fullname'], 'Renamed')
+
+        self.other.save(update_fields=['last_login'])
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+
+    def test_delete_query_count_does_not_grow_with_tasks(self):
+        def delete_board(tasks):
+            board = Board.objects.create(title='Doomed', owner=self.user)
+            self.board = board
+            for _ in range(tasks):
+                self.add_task()
+            with CaptureQueriesContext(connection) as queries:
+                board.delete()
+            return len(queries)
+
+        self.assertEqual(delete_board(tasks=1), delete_board(tasks=10))
+        self.assertFalse(Task.objects.filter(title='Task').exists())
+
+
+class BoardStatsTests(KanmindTestCase):
+    """
+    Tests for the counters maintained by the write endpoints.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user('owner@example.com', 'owner@example.com', 'pw')
+        self.other = User.objects.create_user('member@example.com', 'member@example.com', 'pw')
+        self.client.force_authenticate(self.user)
+
+    def test_counters_follow_writes(self):
+        response = self.client.post(reverse('boards-list-create'), {'title': 'B', 'members': [self.user.id]}, format='json')
+        board_id = response.data['id']
+        task_data = {
+            'board': board_id, 'title': 'T', 'assignee_id': self.user.id, 'reviewer_id': self.user.id,
+            'due_date': '2030-01-01', 'priority': 'high',
+        }
+        task_id = self.client.post(reverse('task-create'), task_data, format='json').data['id']
+        self.client.post(reverse('task-create'), task_data, format='json')
+        self.client.patch(reverse('task-detail', args=[task_id]), {'status': 'done', 'priority': 'low'}, format='json')
+        self.client.patch(reverse('board-detail', args=[board_id]), {'members': [self.user.id, self.other.id]}, format='json')
+        self.client.delete(reverse('task-detail', args=[task_id]))
+
+        stats = BoardStats.objects.get(board_id=board_id)
+        self.assertEqual(
+            (stats.member_count, stats.ticket_count, stats.tasks_to_do_count, stats.tasks_high_prio_count),
+            (2, 1, 1, 1),
+        )
+        self.assertEqual(BoardStats.verify(), [])
+
+    def test_deleting_a_user_recomputes_their_boards(self):
+        board = Board.objects.create(title='B', owner=self.user)
+        board.members.add(self.user, self.other)
+        for assignee in (self.user, self.other, self.other):
+            Task.objects.create(board=board, title='T', assignee=assignee, reviewer=self.user,
+                                due_date=date(2030, 1, 1), priority='high')
+        BoardStats.recompute()
+
+        self.other.delete()
+        stats = BoardStats.objects.get(board=board)
+        self.assertEqual((stats.member_count, stats.ticket_count, stats.tasks_high_prio_count), (1, 1, 1))
+        self.assertEqual(BoardStats.verify(), [])
+
+    def test_command_detects_and_fixes_drift(self):
+        board = Board.objects.create(title='B', owner=self.user)
+        with self.assertRaises(CommandError):
+            call_command('recompute_board_stats', '--check', stderr=StringIO())
+        call_command('recompute_board_stats', stdout=StringIO())
+        call_command('recompute_board_stats', '--check', stdout=StringIO())
+        self.assertEqual(BoardStats.objects.get(board=board).member_count, 0)
+
+
+class TaskBulkViewTests(KanmindTestCase):
+    """
+    Tests for the bulk task endpoint (POST /api/tasks/bulk/).
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user('owner@example.com', 'owner@example.com', 'pw')
+        self.board = Board.objects.create(title='Board', owner=self.user)
+        BoardStats.recompute(board_ids=[self.board.id])
+        self.task = Task.objects.create(
+            board=self.board, title='Old', assignee=self.user, reviewer=self.user, due_date=date(2030, 1, 1),
+        )
+        self.doomed = Task.objects.create(
+            board=self.board, title='Doomed', assignee=self.user, reviewer=self.user, due_date=date(2030, 1, 1),
+        )
+        BoardStats.recompute(board_ids=[self.board.id])
+        self.client.force_authenticate(self.user)
+
+    def test_applies_all_operations(self):
+        operations = [
+            {'action': 'create', 'board': self.board.id, 'title': f'New {i}', 'assignee_id': self.user.id,
+             'reviewer_id': self.user.id, 'due_date': '2030-01-01', 'priority': 'high'}
+            for i in range(20)
+        ]
+        operations += [
+            {'action': 'update', 'id': self.task.id, 'status': 'done'},
+            {'action': 'delete', 'id': self.doomed.id},
+        ]
+        response = self.client.post(reverse('tasks-bulk'), operations, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(all(result['status'] == 'ok' and result['id'] for result in response.data))
+        self.assertEqual(self.board.tasks.count(), 21)
+        self.task.refresh_from_db()
+        self.assertEqual(self.task.status, 'done')
+        self.assertEqual(BoardStats.verify(), [])
+
+    def test_rejects_everything_on_error(self):
+        operations = [
+            {'action': 'update', 'id': self.task.id, 'status': 'done'},
+            {'action': 'update', 'id': self.task.id + 1000, 'status': 'done'},
+        ]
+        response = self.client.post(reverse('tasks-bulk'), operations, format='json')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual([result['status'] for result in response.data], ['ok', 'error'])
+        self.task.refresh_from_db()
+        self.assertEqual(self.task.status, 'to_do')
+
+    def test_updates_write_only_their_own_fields(self):
+        operations = [{'action': 'update', 'id': self.task.id, 'title': 'New title'},
+                      {'action': 'update', 'id': self.doomed.id, 'status': 'done'}]
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(reverse('tasks-bulk'), operations, format='json')
+        self.assertEqual(response.status_code, 200)
+        updates = [query['sql'] for query in queries if query['sql'].startswith('UPDATE "kanmind_board_app_task"')]
+        self.assertEqual(len(updates), 2)
+        title_update = next(sql for sql in updates if '"title"' in sql)
+        status_update = next(sql for sql in updates if '"status"' in sql)
+        self.assertNotIn('"status"', title_update)
+        self.assertNotIn('"position"', title_update)
+        self.assertNotIn('"title"', status_update)
+
+    def test_versions(self):
+        Task.objects.filter(pk=self.task.pk).update(version=3)
+        stale = [{'action': 'update', 'id': self.task.id, 'version': 2, 'title': 'Stale'},
+                 {'action': 'delete', 'id': self.doomed.id, 'version': 1}]
+        response = self.client.post(reverse('tasks-bulk'), stale, format='json')
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual([result['status'] for result in response.data], ['error', 'ok'])
+        self.assertTrue(Task.objects.filter(pk=self.doomed.pk).exists())
+
+        current = [{'action': 'update', 'id': self.task.id, 'version': 3, 'title': 'Fresh'}]
+        response = self.client.post(reverse('tasks-bulk'), current, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data[0]['version'], 4)
+        self.task.refresh_from_db()
+        self.assertEqual((self.task.title, self.task.version), ('Fresh', 4))
+
+
+class TaskAccessTests(KanmindTestCase):
+    """
+    Tests for the shared board access checks on task and comment routes.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.owner = User.objects.create_user('owner@example.com', 'owner@example.com', 'pw')
+        self.member = User.objects.create_user('member@example.com', 'member@example.com', 'pw')
+        self.outsider = User.objects.create_user('out@example.com', 'out@example.com', 'pw')
+        self.board = Board.objects.create(title='Board', owner=self.owner)
+        self.board.members.add(self.member)
+        self.task = Task.objects.create(
+            board=self.board, title='Task', assignee=self.owner, reviewer=self.owner, due_date=date(2030, 1, 1),
+        )
+
+    def test_members_and_owner_can_access(self):
+        for user in (self.owner, self.member):
+            self.client.force_authenticate(user)
+            self.assertEqual(self.client.get(reverse('comments', args=[self.task.id])).status_code, 200)
+            response = self.client.patch(reverse('task-detail', args=[self.task.id]), {'title': 'T'}, format='json')
+            self.assertEqual(response.status_code, 200)
+
+    def test_outsider_is_forbidden(self):
+        self.client.force_authenticate(self.outsider)
+        self.assertEqual(self.client.get(reverse('comments', args=[self.task.id])).status_code, 403)
+        response = self.client.post(reverse('comments', args=[self.task.id]), {'content': 'Hi'}, format='json')
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(self.client.delete(reverse('task-detail', args=[self.task.id])).status_code, 403)
+        task_data = {
+            'board': self.board.id, 'title': 'T', 'assignee_id': self.owner.id,
+            'reviewer_id': self.owner.id, 'due_date': '2030-01-01',
+        }
+        self.assertEqual(self.client.post(reverse('task-create'), task_data, format='json').status_code, 403)
+
+
+@override_settings(KANMIND_INSTRUMENTATION={'ENABLED': True, 'SLOW_REQUEST_MS': 0})
+class QueryInstrumentationTests(KanmindTestCase):
+    """
+    Tests for the per-request instrumentation middleware.
+    """
+
+    def test_server_timing_and_logs(self):
+        user = User.objects.create_user('owner@example.com', 'owner@example.com', 'pw')
+        board = Board.objects.create(title='Board', owner=user)
+        for _ in range(3):
+            Task.objects.create(board=board, title='T', assignee=user, reviewer=user, due_date=date(2030, 1, 1))
+        self.client.force_authenticate(user)
+
+        with self.assertLogs('kanmind.instrumentation', level='INFO') as logs:
+            response = self.client.get(reverse('tasks-assigned-to-me'))
+
+        self.assertIn('sql;dur=', response['Server-Timing'])
+        self.assertIn('serializer;dur=', response['Server-Timing'])
+        self.assertIn('render;dur=', response['Server-Timing'])
+        self.assertIn('"slow_request"', logs.output[-1])
+        self.assertIn('"duplicated_queries": ', logs.output[0])
+        self.assertGreater(json.loads(logs.output[0].split(':', 2)[2])['serializer_ms'], 0)
+
+    def test_does_not_patch_drf(self):
+        with self.assertLogs('kanmind.instrumentation', level='INFO'):
+            self.client.get(reverse('tasks-assigned-to-me'))
+        self.assertEqual(serializers.ListSerializer.to_representation.__module__, 'rest_framework.serializers')
+        self.assertEqual(serializers.Serializer.to_representation.__module__, 'rest_framework.serializers')
+
+    async def test_async_requests_stay_async(self):
+        async def view(request):
+            return JsonResponse({})
+
+        middleware = QueryInstrumentationMiddleware(view)
+        self.assertTrue(asyncio.iscoroutinefunction(middleware))
+        with self.assertLogs('kanmind.instrumentation', level='INFO'):
+            response = await middleware(AsyncRequestFactory().get('/'))
+        self.assertIn('total;dur=', response['Server-Timing'])
+
+
+class BoardExportTests(KanmindTestCase):
+    """
+    Tests for the streaming board export.
+    """
+
+    def test_streams_ndjson(self):
+        user = User.objects.create_user('owner@example.com', 'owner@example.com', 'pw', first_name='Ann')
+        board = Board.objects.create(title='Board', owner=user)
+        board.members.add(user)
+        task = Task.objects.create(board=board, title='T', assignee=user, reviewer=user, due_date=date(2030, 1, 1))
+        Comment.objects.create(task=task, author=user, content='Hi')
+        self.client.force_authenticate(user)
+
+        response = self.client.get(reverse('board-export', args=[board.id]))
+
+        self.assertTrue(response.streaming)
+        rows = [json.loads(line) for line in b''.join(response.streaming_content).splitlines()]
+        self.assertEqual([row['type'] for row in rows], ['board', 'member', 'task', 'comment'])
+        self.assertEqual(rows[1]['fullname'], 'Ann')
+        self.assertEqual(rows[2]['due_date'], '2030-01-01')
+        self.assertEqual(rows[3]['task'], task.id)
+
+    async def test_streams_from_an_async_iterator_under_asgi(self):
+        user = await User.objects.acreate_user('owner@example.com', 'owner@example.com', 'pw')
+        board = await Board.objects.acreate(title='Board', owner=user)
+        for i in range(20):
+            await Task.objects.acreate(board=board, title=f'T{i}', assignee=user, reviewer=user,
+                                       due_date=date(2030, 1, 1))
+        token = await Token.objects.acreate(user=user)
+        expected = await sync_to_async(lambda: b''.join(iter_board_ndjson(board.id)))()
+
+        with mock.patch('kanmind_board_app.export.BUFFER_BYTES', 100):
+            response = await self.async_client.get(reverse('board-export', args=[board.id]),
+                                                   headers={'Authorization': f'Token {token.key}'})
+            self.assertTrue(response.is_async)
+            blocks = [block async for block in response.streaming_content]
+        self.assertGreater(len(blocks), 1)
+        self.assertEqual(b''.join(blocks), expected)
+
+    def test_comments_only_refer_to_exported_tasks(self):
+        user = User.objects.create_user('owner@example.com', 'owner@example.com', 'pw')
+        board = Board.objects.create(title='Board', owner=user)
+        tasks = [Task.objects.create(board=board, title=f'T{i}', assignee=user, reviewer=user,
+                                     due_date=date(2030, 1, 1)) for i in range(3)]
+        for task in tasks:
+            Comment.objects.create(task=task, author=user, content='Hi')
+
+        rows = []
+        for row in iter_board_rows(board.id, chunk_size=2):
+            rows.append(row)
+            if row['type'] == 'task' and row['id'] == tasks[-1].id:
+                late = Task.objects.create(board=board, title='Late', assignee=user, reviewer=user,
+                                           due_date=date(2030, 1, 1))
+                Comment.objects.create(task=late, author=user, content='Too late')
+
+        exported = {row['id'] for row in rows if row['type'] == 'task'}
+        comments = [row for row in rows if row['type'] == 'comment']
+        self.assertEqual(len(comments), 3)
+        self.assertTrue(all(comment['task'] in exported for comment in comments))
+
+
+class BoardImportTests(KanmindTestCase):
+    """
+    Tests for the batched board import.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user('owner@example.com', 'owner@example.com', 'pw')
+        self.board = Board.objects.create(title='Board', owner=self.user)
+        self.board.members.add(self.user)
+        for i in range(5):
+            task = Task.objects.create(board=self.board, title=f'T{i}', assignee=self.user,
+                                       reviewer=self.user, due_date=date(2030, 1, 1), priority='high')
+            Comment.objects.create(task=task, author=self.user, content=f'C{i}')
+        self.dump = b''.join(iter_board_ndjson(self.board.id))
+
+    def test_round_trip_in_batches(self):
+        job = ImportJob.objects.create(source='dump', owner=self.user)
+        report = BoardImporter(job, batch_size=3).run(iter_records(BytesIO(self.dump)))
+
+        self.assertEqual((report['board'], report['member'], report['task'], report['comment']), (1, 1, 5, 5))
+        board = Board.objects.exclude(pk=self.board.pk).get()
+        self.assertEqual(board.tasks.count(), 5)
+        self.assertEqual(Comment.objects.filter(task__board=board).count(), 5)
+        self.assertEqual(BoardStats.objects.get(board=board).tasks_high_prio_count, 5)
+
+    def test_resume_skips_committed_records(self):
+        job = ImportJob.objects.create(source='dump', owner=self.user)
+        lines = self.dump.splitlines(keepends=True)
+        with self.assertRaises(BoardImportError):
+            BoardImporter(job, batch_size=2).run(iter_records(BytesIO(b''.join(lines[:6]) + b'{"type": "bad"}\n')))
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.records_done), (ImportJob.Status.failed, 6))
+
+        BoardImporter(job, batch_size=2).run(iter_records(BytesIO(self.dump)))
+        board = Board.objects.exclude(pk=self.board.pk).get()
+        self.assertEqual(board.tasks.count(), 5)
+        self.assertEqual(Comment.objects.filter(task__board=board).count(), 5)
+
+    def test_json_array_upload(self):
+        records = [json.loads(line) for line in self.dump.splitlines()]
+        upload = SimpleUploadedFile('dump.json', json.dumps(records).encode())
+        self.client.force_authenticate(self.user)
+
+        response = self.client.post(reverse('board-import'), {'file': upload}, format='multipart')
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['task'], 5)
+
+    def test_invalid_records_are_rejected_with_their_number(self):
+        self.client.force_authenticate(self.user)
+        board = {'type': 'board', 'id': 1, 'title': 'B'}
+        task = {'type': 'task', 'id': 1, 'title': 'T', 'due_date': '2030-01-01'}
+        cases = [
+            (dict(task, status='someday'), 'invalid status'),
+            (dict(task, priority='urgent'), 'invalid priority'),
+            ({'type': 'task', 'id': 1, 'due_date': '2030-01-01'}, 'without title'),
+            ({'type': 'task', 'id': 1, 'title': 'T'}, 'without due_date'),
+            (dict(task, due_date='2030-02-30'), 'invalid due_date'),
+            ({'type': 'comment', 'task': 1, 'created_at': 'yesterday'}, 'invalid created_at'),
+        ]
+        for record, error in cases:
+            with self.subTest(error=error):
+                upload = SimpleUploadedFile('dump.ndjson', f'{json.dumps(board)}\n{json.dumps(record)}\n'.encode())
+                response = self.client.post(reverse('board-import'), {'file': upload}, format='multipart')
+                self.assertEqual(response.status_code, 400)
+                self.assertIn('Record 2: ', response.data['detail'])
+                self.assertIn(error, response.data['detail'])
+        self.assertFalse(Task.objects.exclude(board=self.board).exists())
+
+        upload = SimpleUploadedFile('dump.ndjson', self.dump)
+        response = self.client.post(reverse('board-import'), {'file': upload, 'job': 'abc'}, format='multipart')
+        self.assertEqual(response.status_code, 400)
+
+    def test_upload_cannot_act_as_other_users(self):
+        stranger = User.objects.create_user('stranger@example.com', 'stranger@example.com', 'pw')
+        uploader = User.objects.create_user('up@example.com', 'up@example.com', 'pw')
+        records = [
+            {'type': 'board', 'id': 1, 'title': 'B', 'owner': stranger.email},
+            {'type': 'member', 'email': stranger.email},
+            {'type': 'task', 'id': 1, 'title': 'T', 'due_date': '2030-01-01', 'owner': stranger.email,
+             'assignee': stranger.email, 'reviewer': stranger.email},
+            {'type': 'comment', 'id': 1, 'task': 1, 'author': stranger.email, 'content': 'Forged'},
+        ]
+        upload = SimpleUploadedFile('dump.ndjson', '\n'.join(json.dumps(r) for r in records).encode())
+        self.client.force_authenticate(uploader)
+
+        response = self.client.post(reverse('board-import'), {'file': upload}, format='multipart')
+
+        self.assertEqual(response.status_code, 201)
+        board = Board.objects.get(owner=uploader)
+        self.assertEqual(list(board.members.all()), [])
+        task = board.tasks.get()
+        self.assertEqual((task.owner, task.assignee, task.reviewer), (uploader, uploader, uploader))
+        self.assertEqual(task.comments.get().author, uploader)
+
+
+class BoardChangesTests(KanmindTestCase):
+    """
+    Tests for the incremental sync endpoint.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user('owner@example.com', 'owner@example.com', 'pw')
+        self.other = User.objects.create_user('member@example.com', 'member@example.com', 'pw')
+        self.board = Board.objects.create(title='Board', owner=self.user)
+        self.task = Task.objects.create(board=self.board, title='T', assignee=self.user,
+                                        reviewer=self.user, due_date=date(2030, 1, 1))
+        self.client.force_authenticate(self.user)
+        self.url = reverse('board-changes', args=[self.board.id])
+
+    def test_snapshot_then_changes(self):
+        snapshot = self.client.get(self.url).data
+        self.assertEqual([task['id'] for task in snapshot['tasks']], [self.task.id])
+
+        doomed = Task.objects.create(board=self.board, title='D', assignee=self.user,
+                                     reviewer=self.user, due_date=date(2030, 1, 1))
+        doomed_id = doomed.id
+        doomed.delete()
+        self.board.members.add(self.other)
+        comment = Comment.objects.create(task=self.task, author=self.user, content='Hi')
+
+        changes = self.client.get(self.url, {'since': snapshot['cursor']}).data
+        self.assertEqual([task['id'] for task in changes['tasks']], [self.task.id])
+        self.assertEqual(changes['tasks'][0]['comments_count'], 1)
+        self.assertEqual(changes['comments'][0]['task'], self.task.id)
+        self.assertEqual(changes['comments'][0]['id'], comment.id)
+        self.assertEqual([member['id'] for member in changes['members']], [self.other.id])
+        self.assertEqual(changes['deleted']['tasks'], [doomed_id])
+
+        empty = self.client.get(self.url, {'since': changes['cursor']}).data
+        self.assertEqual((empty['tasks'], empty['cursor']), ([], changes['cursor']))
+
+    def test_rejects_limits_below_one(self):
+        for limit in ('0', '-5'):
+            self.assertEqual(self.client.get(self.url, {'since': 1, 'limit': limit}).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {'since': 1, 'limit': 10 ** 6}).status_code, 200)
+
+    @override_settings(KANMIND_SYNC_LAG=60)
+    def test_recent_changes_wait_for_the_lag(self):
+        BoardChange.objects.update(created_at=timezone.now() - timedelta(minutes=5))
+        cursor = self.client.get(self.url).data['cursor']
+        self.task.save()
+
+        changes = self.client.get(self.url, {'since': cursor}).data
+        self.assertEqual(changes['tasks'], [])
+        self.assertEqual(changes['cursor'], cursor)
+        BoardChange.objects.update(created_at=timezone.now() - timedelta(minutes=5))
+        changes = self.client.get(self.url, {'since': cursor}).data
+        self.assertEqual([task['id'] for task in changes['tasks']], [self.task.id])
+
+    def test_pruned_cursor_gets_a_snapshot(self):
+        cursor = self.client.get(self.url).data['cursor']
+        for title in ('A', 'B', 'C'):
+            self.task.title = title
+            self.task.save()
+        BoardChange.objects.update(created_at=timezone.now() - timedelta(days=60))
+        call_command('prune_board_changes', '--days', '30', stdout=StringIO())
+        self.assertEqual(BoardChange.objects.count(), 1)
+
+        changes = self.client.get(self.url, {'since': cursor}).data
+        self.assertTrue(changes['reset'])
+        self.assertEqual([task['title'] for task in changes['tasks']], ['C'])
+        self.assertFalse(self.client.get(self.url, {'since': changes['cursor']}).data['reset'])
+
+
+class BoardEventsTests(KanmindTestCase):
+    """
+    Tests for the live board event stream.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user('owner@example.com', 'owner@example.com', 'pw')
+        self.outsider = User.objects.create_user('outsider@example.com', 'outsider@example.com', 'pw')
+        self.board = Board.objects.create(title='Board', owner=self.user)
+        self.token = Token.objects.create(user=self.user)
+        self.url = reverse('board-events', args=[self.board.id])
+
+    def create_task(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Task.objects.create(board=self.board, title='T', assignee=self.user,
+                                       reviewer=self.user, due_date=date(2030, 1, 1))
+
+    async def open_stream(self, ticket):
+        response = await self.async_client.get(self.url, {'ticket': ticket})
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        content = aiter(response.streaming_content)
+        self.assertTrue((await anext(content)).startswith(b'retry:'))
+        return content
+
+    async def test_task_created_is_pushed_to_subscribers(self):
+        response = await self.async_client.get(self.url, headers={'Authorization': f'Token {self.token.key}'})
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        content = aiter(response.streaming_content)
+        self.assertTrue((await anext(content)).startswith(b'retry:'))
+
+        receive = asyncio.ensure_future(anext(content))
+        while events.get_broker().subscriber_count(self.board.id) == 0:
+            await asyncio.sleep(0)
+        task = await sync_to_async(self.create_task)()
+
+        event = (await asyncio.wait_for(receive, 5)).decode()
+        self.assertIn('event: task.upsert', event)
+        self.assertIn(f'"object_id": {task.id}', event)
+
+        disconnect = asyncio.ensure_future(anext(content))
+        await asyncio.sleep(0)
+        disconnect.cancel()
+        await asyncio.gather(disconnect, return_exceptions=True)
+        self.assertEqual(events.get_broker().subscriber_count(self.board.id), 0)
+
+    async def test_requires_board_access(self):
+        token = await Token.objects.acreate(user=self.outsider)
+        response = await self.async_client.get(self.url, headers={'Authorization': f'Token {token.key}'})
+        self.assertEqual(response.status_code, 403)
+        response = await self.async_client.get(self.url)
+        self.assertEqual(response.status_code, 401)
+        response = await self.async_client.get(self.url, {'token': self.token.key})
+        self.assertEqual(response.status_code, 401)
+
+    def test_not_served_through_wsgi(self):
+        response = self.client.get(self.url, HTTP_AUTHORIZATION=f'Token {self.token.key}')
+        self.assertEqual(response.status_code, 501)
+        self.assertFalse(response.streaming)
+
+    def test_ticket_is_bound_to_board_and_expires(self):
+        self.client.force_authenticate(self.outsider)
+        response = self.client.post(reverse('board-events-ticket', args=[self.board.id]))
+        self.assertEqual(response.status_code, 403)
+
+        self.client.force_authenticate(self.user)
+        ticket = self.client.post(reverse('board-events-ticket', args=[self.board.id])).data['ticket']
+        other = Board.objects.create(title='Other', owner=self.user)
+        self.assertIsNone(stream.read_ticket(ticket, other.id, 60))
+        self.assertEqual(stream.read_ticket(ticket, self.board.id, 60), self.user.id)
+        with mock.patch('time.time', return_value=time_module.time() + 61):
+            self.assertIsNone(stream.read_ticket(ticket, self.board.id, 60))
+        self.assertIsNone(stream.read_ticket(ticket + 'x', self.board.id, 60))
+
+    async def test_removed_member_is_disconnected(self):
+        member = await User.objects.acreate_user('member@example.com', 'member@example.com', 'pw')
+        await self.board.members.aadd(member)
+        content = await self.open_stream(stream.issue_ticket(member.id, self.board.id))
+
+        receive = asyncio.ensure_future(anext(content))
+        while events.get_broker().subscriber_count(self.board.id) == 0:
+            await asyncio.sleep(0)
+
+        def remove():
+            with self.captureOnCommitCallbacks(execute=True):
+                self.board.members.remove(member)
+        await sync_to_async(remove)()
+
+        self.assertIn('event: access.revoked', (await asyncio.wait_for(receive, 5)).decode())
+        with self.assertRaises(StopAsyncIteration):
+            await anext(content)
+        self.assertEqual(events.get_broker().subscriber_count(self.board.id), 0)
+
+
+class AsyncViewsTests(KanmindTestCase):
+    """
+    The async read views return the same bodies as the DRF views.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user('owner@example.com', 'owner@example.com', 'pw')
+        self.board = Board.objects.create(title='Board', owner=self.user)
+        BoardStats.recompute([self.board.id])
+        self.task = Task.objects.create(board=self.board, title='T', assignee=self.user,
+                                        reviewer=self.user, due_date=date(2030, 1, 1))
+        Comment.objects.create(task=self.task, author=self.user, content='Hi')
+        self.token = Token.objects.create(user=self.user)
+        self.factory = AsyncRequestFactory()
+
+    def sync_get(self, url):
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+        response_cache.get_cache().clear()
+        return self.client.get(url)
+
+    async def test_async_views_match_sync_views(self):
+        cases = [
+            (reverse('boards-list-create'), async_views.boards, {}),
+            (reverse('board-detail', args=[self.board.id]), async_views.board_detail, {'pk': self.board.id}),
+            (reverse('tasks-assigned-to-me'), async_views.assigned_tasks, {}),
+            (reverse('tasks-reviewing'), async_views.reviewing_tasks, {}),
+            (reverse('comments', args=[self.task.id]), async_views.task_comments, {'pk': self.task.id}),
+            (reverse('comments', args=[self.task.id + 100]), async_views.task_comments, {'pk': self.task.id + 100}),
+        ]
+        for url, view, kwargs in cases:
+            with self.subTest(url=url):
+                expected = await sync_to_async(self.sync_get)(url)
+                await response_cache.get_cache().aclear()
+                response = await view(self.factory.get(url, headers={'Authorization': f'Token {self.token.key}'}), **kwargs)
+                self.assertEqual(response.status_code, expected.status_code)
+                self.assertEqual(response.content, expected.content)
+                self.assertEqual(response.get('ETag'), expected.get('ETag'))
+
+    async def test_board_without_stats_row(self):
+        await BoardStats.objects.filter(board=self.board).adelete()
+        url = reverse('boards-list-create')
+        expected = await sync_to_async(self.sync_get)(url)
+        await response_cache.get_cache().aclear()
+        response = await async_views.boards(self.factory.get(url, headers={'Authorization': f'Token {self.token.key}'}))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, expected.content)
+        self.assertEqual(json.loads(response.content)[0]['ticket_count'], 1)
+
+    async def test_invalid_token_falls_back_to_drf(self):
+        request = AsyncRequestFactory().get(reverse('boards-list-create'), headers={'Authorization': 'Token nope'})
+        response = (await async_views.boards(request)).render()
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(json.loads(response.content), {'detail': 'Invalid token.'})
+
+
+class DatabaseConfigTests(APITestCase):
+    """
+    Tests for the environment driven database settings and replica routing.
+    """
+
+    def test_sqlite_defaults_to_wal_and_immediate_transactions(self):
+        config = database_config({}, Path('/srv'))['default']
+        self.assertEqual(config['NAME'], Path('/srv/db.sqlite3'))
+        self.assertEqual(config['OPTIONS']['transaction_mode'], 'IMMEDIATE')
+        self.assertIn('PRAGMA journal_mode=WAL', config['OPTIONS']['init_command'])
+
+    def test_postgres_pool_and_replica(self):
+        databases = database_config({
+            'KANMIND_DB_ENGINE': 'postgres', 'KANMIND_DB_HOST': 'primary',
+            'KANMIND_DB_REPLICA_HOST': 'replica', 'KANMIND_DB_POOL': '1',
+        }, Path('/srv'))
+        self.assertEqual(databases['default']['CONN_MAX_AGE'], 0)
+        self.assertIn('pool', databases['default']['OPTIONS'])
+        self.assertEqual(databases['replica']['HOST'], 'replica')
+        self.assertEqual(database_routers(databases), ['kanmind.database.ReadReplicaRouter'])
+
+    def test_router_reads_from_replica_only_in_read_requests(self):
+        router = ReadReplicaRouter()
+        self.assertIsNone(router.db_for_read(Task))
+        token = use_replica.set(True)
+        try:
+            self.assertEqual(router.db_for_read(Task), 'replica')
+            self.assertEqual(router.db_for_write(Task), 'default')
+        finally:
+            use_replica.reset(token)
+
+    async def test_replica_middleware_stays_async(self):
+        routed = []
+
+        async def view(request):
+            routed.append(use_replica.get())
+            return JsonResponse({})
+
+        with mock.patch.dict(settings.DATABASES, replica=settings.DATABASES['default']):
+            middleware = ReadReplicaMiddleware(view)
+        self.assertTrue(asyncio.iscoroutinefunction(middleware))
+        await middleware(AsyncRequestFactory().get('/'))
+        await middleware(AsyncRequestFactory().post('/'))
+        self.assertEqual(routed, [True, False])
+        self.assertFalse(use_replica.get())
+
+    def test_cached_responses_are_read_from_the_primary(self):
+        response_cache.get_cache().clear()
+        user = User.objects.create_user('owner@example.com', 'owner@example.com', 'pw')
+        board = Board.objects.create(title='Board', owner=user)
+        self.client.force_authenticate(user)
+        routed = []
+        board_detail = fast_serializers.board_detail
+
+        def spy(pk):
+            routed.append(use_replica.get())
+            return board_detail(pk)
+
+        token = use_replica.set(True)
+        try:
+            with mock.patch.object(fast_serializers, 'board_detail', spy):
+                self.client.get(reverse('board-detail', args=[board.id]))
+                self.client.get(reverse('board-detail', args=[board.id]) + '?format=json')
+        finally:
+            use_replica.reset(token)
+        self.assertEqual(routed, [False, True])
+
+
+class ExplainHotQueriesTests(KanmindTestCase):
+    """
+    Smoke test for the explain_hot_queries command.
+    """
+
+    def test_every_hot_query_uses_an_index(self):
+        user = User.objects.create_user('owner@example.com', 'owner@example.com', 'pw')
+        board = Board.objects.create(title='Board', owner=user)
+        board.members.add(user)
+        task = Task.objects.create(board=board, title='T', assignee=user, reviewer=user, due_date=date(2030, 1, 1))
+        Comment.objects.create(task=task, author=user, content='Hi')
+        out = StringIO()
+
+        call_command('explain_hot_queries', '--user', user.id, '--board', board.id, '--task', task.id,
+                     '--fail-on-scan', stdout=out)
+
+        verdicts = [line for line in out.getvalue().splitlines() if line.startswith('[')]
+        self.assertEqual(verdicts, [f'[OK] {name}' for name, queryset in hot_queries(user.id, board.id, task.id)])
+
+
+class TaskSearchTests(KanmindTestCase):
+    """
+    Tests for the full-text task search.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user('owner@example.com', 'owner@example.com', 'pw')
+        self.other = User.objects.create_user('other@example.com', 'other@example.com', 'pw')
+        self.board = Board.objects.create(title='Board', owner=self.user)
+        foreign = Board.objects.create(title='Foreign', owner=self.other)
+        self.task = self.create_task(self.board, 'Fix login', 'Users cannot sign in')
+        self.commented = self.create_task(self.board, 'Refactor', 'Cleanup')
+        self.comment = Comment.objects.create(task=self.commented, author=self.user, content='Breaks the login flow')
+        self.create_task(foreign, 'Login page', '')
+        self.client.force_authenticate(self.user)
+        self.url = reverse('tasks-search')
+
+    def create_task(self, board, title, description):
+        return Task.objects.create(board=board, title=title, description=description, assignee=self.user,
+                                   reviewer=self.user, due_date=date(2030, 1, 1))
+
+    def search(self, q, **params):
+        return self.client.get(self.url, {'q': q, **params}).data
+
+    def test_uses_fts5_index_on_sqlite(self):
+        self.assertEqual(search.backend(), 'fts5')
+
+    def test_matches_titles_descriptions_and_comments_of_own_boards(self):
+        result = self.search('login')
+        self.assertEqual(result['count'], 2)
+        self.assertEqual({task['id'] for task in result['results']}, {self.task.id, self.commented.id})
+        self.assertEqual([task['id'] for task in self.search('sig')['results']], [self.task.id])
+
+    def test_index_follows_updates_and_deletes(self):
+        self.task.title = 'Fix logout'
+        self.task.description = ''
+        self.task.save()
+        self.comment.delete()
+        self.assertEqual(self.search('login')['count'], 0)
+        self.assertEqual([task['id'] for task in self.search('logout')['results']], [self.task.id])
+
+    def test_scan_fallback_matches_the_same_tasks(self):
+        with mock.patch('kanmind_board_app.search.backend', return_value='scan'):
+            result = self.search('login')
+        self.assertEqual({task['id'] for task in result['results']}, {self.task.id, self.commented.id})
+
+    def test_paginates_and_requires_query(self):
+        result = self.search('login', page_size=1)
+        self.assertEqual((result['count'], len(result['results'])), (2, 1))
+        self.assertIsNotNone(result['next'])
+        self.assertEqual(self.client.get(self.url).status_code, 400)
+
+
+class TaskListFilterTests(KanmindTestCase):
+    """
+    Tests for filters, ordering and sparse fields on the task lists.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user('owner@example.com', 'owner@example.com', 'pw')
+        self.board = Board.objects.create(title='Board', owner=self.user)
+        self.other_board = Board.objects.create(title='Other', owner=self.user)
+        self.low = self.create_task(self.board, 'Low', Task.Priority.low, Task.Status.to_do, date(2000, 1, 1))
+        self.high = self.create_task(self.board, 'High', Task.Priority.high, Task.Status.done, date(2000, 1, 2))
+        self.medium = self.create_task(self.other_board, 'Medium', Task.Priority.medium, Task.Status.review,
+                                       date(2999, 1, 1))
+        self.client.force_authenticate(self.user)
+        self.url = reverse('tasks-assigned-to-me')
+
+    def create_task(self, board, title, priority, status, due_date):
+        return Task.objects.create(board=board, title=title, description='Long text', priority=priority,
+                                   status=status, assignee=self.user, reviewer=self.user, due_date=due_date)
+
+    def ids(self, **params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, 200)
+        return [task['id'] for task in response.data]
+
+    def test_filters(self):
+        self.assertEqual(self.ids(status='to_do,review', ordering='id'), [self.low.id, self.medium.id])
+        self.assertEqual(self.ids(board=self.other_board.id), [self.medium.id])
+        self.assertEqual(self.ids(due_after='2000-01-02', due_before='2100-01-01'), [self.high.id])
+        self.assertEqual(self.ids(overdue='true'), [self.low.id])
+
+    @override_settings(TIME_ZONE='Pacific/Kiritimati')
+    def test_overdue_uses_the_local_date(self):
+        due = self.create_task(self.board, 'Due', Task.Priority.low, Task.Status.to_do, date(2030, 1, 1))
+        late_evening_utc = datetime(2030, 1, 1, 23, 30, tzinfo=dt_timezone.utc)
+        with mock.patch('django.utils.timezone.now', return_value=late_evening_utc):
+            self.assertIn(due.id, self.ids(overdue='true'))
+            etag = self.client.get(self.url, {'overdue': 'true'})['ETag']
+        with mock.patch('django.utils.timezone.now', return_value=late_evening_utc - timedelta(hours=14)):
+            self.assertNotIn(due.id, self.ids(overdue='true'))
+            self.assertNotEqual(self.client.get(self.url, {'overdue': 'true'})['ETag'], etag)
+
+    def test_ordering_by_priority_rank(self):
+        self.assertEqual(self.ids(ordering='priority'), [self.high.id, self.medium.id, self.low.id])
+        self.assertEqual(self.ids(ordering='-due_date'), [self.medium.id, self.high.id, self.low.id])
+
+    def test_sparse_fields_narrow_output_and_columns(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url, {'fields': 'title,status'})
+        self.assertEqual(set(response.data[0]), {'id', 'title', 'status'})
+        task_select = queries[-1]['sql']
+        self.assertIn('"title"', task_select)
+        self.assertNotIn('"description"', task_select)
+        self.assertNotIn('JOIN', task_select)
+
+    def test_ordered_keyset_pagination(self):
+        response = self.client.get(self.url, {'ordering': 'priority', 'page_size': 2})
+        self.assertEqual([task['id'] for task in response.data['results']], [self.high.id, self.medium.id])
+        response = self.client.get(response.data['next'])
+        self.assertEqual([task['id'] for task in response.data['results']], [self.low.id])
+
+    def test_keyset_pages_through_ties_without_offsets(self):
+        for i in range(5):
+            self.create_task(self.board, f'Tie {i}', Task.Priority.low, Task.Status.to_do, date(2001, 1, 1))
+        expected = self.ids(ordering='priority')
+
+        pages = [self.client.get(self.url, {'ordering': 'priority', 'page_size': 2}).data]
+        with CaptureQueriesContext(connection) as queries:
+            while pages[-1]['next']:
+                pages.append(self.client.get(pages[-1]['next']).data)
+        self.assertEqual([task['id'] for page in pages for task in page['results']], expected)
+        self.assertFalse([query['sql'] for query in queries if 'OFFSET' in query['sql']])
+
+        previous = self.client.get(pages[-1]['previous']).data
+        self.assertEqual(previous['results'], pages[-2]['results'])
+
+    def test_renamed_reviewer_changes_task_lists_and_etags(self):
+        for url in (self.url, reverse('tasks-reviewing')):
+            etag = self.client.get(url)['ETag']
+
+            self.user.first_name = f'Renamed {url}'
+            self.user.save()
+
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual({task['reviewer']['fullname'] for task in response.data}, {f'Renamed {url}'})
+
+            self.user.save(update_fields=['last_login'])
+            self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+
+    def test_rejects_unknown_values(self):
+        response = self.client.get(self.url, {'status': 'nope', 'ordering': 'owner'})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(set(response.data), {'status', 'ordering'})
+
+
+class FastSerializerTests(KanmindTestCase):
+    """
+    The fast serialization path renders the same bytes as the DRF serializers.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.owner = User.objects.create_user('owner@example.com', 'owner@example.com', 'pw',
+                                              first_name='Zoë', last_name='\u2028Owner')
+        self.member = User.objects.create_user('member@example.com', 'member@example.com', 'pw')
+        self.outsider = User.objects.create_user('outsider@example.com', 'outsider@example.com', 'pw',
+                                                 first_name=' Out ', last_name='')
+        self.board = Board.objects.create(title='Board', owner=self.owner)
+        self.board.members.add(self.member, self.owner)
+        self.tasks = [
+            Task.objects.create(board=self.board, title=f'Task {i}', description='"quoted" <b>',
+                                assignee=self.member if i % 2 else self.outsider, reviewer=self.member,
+                                due_date=date(2030, 1, i + 1))
+            for i in range(3)
+        ]
+        Comment.objects.create(task=self.tasks[0], author=self.outsider, content='Hi')
+        Comment.objects.create(task=self.tasks[0], author=self.owner, content='Hello')
+
+    def assertSameBytes(self, drf_data, fast_data):
+        renderer = JSONRenderer()
+        self.assertEqual(renderer.render(fast_data), renderer.render(drf_data))
+
+    def test_board_detail(self):
+        board = Board.objects.with_details().get(pk=self.board.id)
+        with self.assertNumQueries(3):
+            data = fast_serializers.board_detail(self.board.id)
+        self.assertSameBytes(BoardDetailSerializer(board).data, data)
+        self.assertIs(data['tasks'][0]['reviewer'], data['tasks'][1]['reviewer'])
+        self.assertIsNone(fast_serializers.board_detail(self.board.id + 100))
+
+    def test_board_detail_users_match_the_loaded_tasks(self):
+        newcomer = User.objects.create_user('new@example.com', 'new@example.com', 'pw')
+        board_people = fast_serializers.board_people
+
+        def reassign_in_between(board_id, tasks):
+            Task.objects.filter(board=self.board).update(assignee=newcomer)
+            return board_people(board_id, tasks)
+
+        with mock.patch.object(fast_serializers, 'board_people', reassign_in_between):
+            data = fast_serializers.board_detail(self.board.id)
+        self.assertTrue(all(task['assignee'] is not None for task in data['tasks']))
+
+    def test_task_lists(self):
+        tasks = Task.objects.filter(board=self.board).order_by('id')
+        rows = fast_serializers.task_rows(tasks)
+        self.assertSameBytes(TaskSerializer(tasks.with_profiles(), many=True).data,
+                             fast_serializers.FastTaskSerializer(rows, many=True).data)
+        self.assertSameBytes(TaskAssignOrReviewerSerializer(tasks.with_profiles(), many=True).data,
+                             fast_serializers.FastTaskSerializer(rows, many=True).data)
+        self.assertSameBytes(TaskSerializer(tasks.with_profiles().first()).data,
+                             fast_serializers.FastTaskSerializer(rows.first()).data)
+
+    def test_comments(self):
+        comments = Comment.objects.filter(task=self.tasks[0]).order_by('id')
+        self.assertSameBytes(CommentResponseSerializer(comments, many=True).data,
+                             fast_serializers.FastCommentSerializer(
+                                 fast_serializers.FastCommentSerializer.rows(comments), many=True).data)
+
+    async def test_async_matches_sync(self):
+        data = await sync_to_async(fast_serializers.board_detail)(self.board.id)
+        self.assertEqual(await fast_serializers.aboard_detail(self.board.id), data)
+        comments = Comment.objects.filter(task=self.tasks[0])
+        self.assertEqual(await fast_serializers.FastCommentSerializer.adata(comments),
+                         await sync_to_async(lambda: fast_serializers.FastCommentSerializer(
+                             fast_serializers.FastCommentSerializer.rows(comments), many=True).data)())
+
+
+class FastJSONRendererTests(APITestCase):
+    """
+    FastJSONRenderer renders the same bytes as DRF's JSONRenderer,
+    with orjson and with the stdlib fallback.
+    """
+    payload = ReturnDict({
+        'id': 1,
+        'title': 'Zoë \u2028 \u2029 "quoted" \\ <b>',
+        'created_at': datetime(2030, 1, 2, 3, 4, 5, 123456, tzinfo=dt_timezone.utc),
+        'naive': datetime(2030, 1, 2, 3, 4, 5),
+        'offset': datetime(2030, 1, 2, 3, 4, 5, tzinfo=dt_timezone(timedelta(hours=2))),
+        'due_date': date(2030, 1, 2),
+        'time': time(12, 30),
+        'duration': timedelta(minutes=90),
+        'amount': Decimal('12.50'),
+        'ratio': 0.1,
+        'flags': (True, False, None),
+        7: 'int key',
+        'tasks': [{'id': i, 'assignee': {'id': 1, 'fullname': 'A B'}} for i in range(3)],
+    }, serializer=None)
+
+    def renderers(self):
+        stdlib = type('StdlibJSONRenderer', (renderers.FastJSONRenderer,), {'use_orjson': False})
+        return [renderers.FastJSONRenderer(), stdlib()]
+
+    def test_same_bytes_as_drf(self):
+        expected = JSONRenderer().render(self.payload)
+        for renderer in self.renderers():
+            with self.subTest(orjson=renderer.use_orjson):
+                self.assertEqual(renderer.render(self.payload), expected)
+                self.assertEqual(renderer.render([]), b'[]')
+                self.assertEqual(renderer.render(None), b'')
+
+    def test_falls_back_for_indent_and_big_integers(self):
+        renderer = renderers.FastJSONRenderer()
+        self.assertEqual(renderer.render({'a': 1}, 'application/json; indent=2'), b'{\n  "a": 1\n}')
+        self.assertEqual(renderer.render({'a': 2 ** 70}), JSONRenderer().render({'a': 2 ** 70}))
+
+    def test_floats_as_drf_for_views_that_render_them(self):
+        floats = {'small': 1e-7, 'power': 6.103515625e-05, 'big': 1e16, 'position': 1536.5}
+        context = {'view': views.TaskMoveView()}
+        expected = JSONRenderer().render(floats)
+        for renderer in self.renderers():
+            with self.subTest(orjson=renderer.use_orjson):
+                self.assertEqual(renderer.render(floats, renderer_context=context), expected)
+                with self.assertRaises(ValueError):
+                    renderer.render({'nan': float('nan')}, renderer_context=context)
+        stdlib = self.renderers()[1]
+        self.assertEqual(stdlib.render(floats), expected)
+        with self.assertRaises(ValueError):
+            stdlib.render({'inf': float('inf')})
+
+    def test_is_the_configured_json_renderer(self):
+        self.assertIsInstance(renderers.json_renderer(), renderers.FastJSONRenderer)
+
+
+class TaskSummaryTests(KanmindTestCase):
+    """
+    Tests for the per-user task summary (GET /api/tasks/summary/).
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user('owner@example.com', 'owner@example.com', 'pw')
+        self.other = User.objects.create_user('other@example.com', 'other@example.com', 'pw')
+        board = Board.objects.create(title='Board', owner=self.user)
+        today = timezone.localdate()
+        for status, priority, due_date, assignee, reviewer in [
+            (Task.Status.to_do, Task.Priority.high, today - timedelta(days=1), self.user, self.other),
+            (Task.Status.done, Task.Priority.low, today - timedelta(days=1), self.user, self.other),
+            (Task.Status.review, Task.Priority.high, today, self.user, self.user),
+            (Task.Status.progress, Task.Priority.medium, today + timedelta(days=30), self.other, self.user),
+            (Task.Status.to_do, Task.Priority.low, today, self.other, self.other),
+        ]:
+            Task.objects.create(board=board, title='T', status=status, priority=priority, due_date=due_date,
+                                assignee=assignee, reviewer=reviewer)
+        self.today = today
+        self.client.force_authenticate(self.user)
+        self.url = reverse('tasks-summary')
+
+    def test_counts_in_one_query(self):
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url)
+        assigned, reviewing = response.data['assigned'], response.data['reviewing']
+        self.assertEqual(assigned['total'], 3)
+        self.assertEqual(assigned['by_status'], {'to_do': 1, 'progress': 0, 'review': 1, 'done': 1})
+        self.assertEqual(assigned['by_priority'], {'high': 2, 'medium': 0, 'low': 1})
+        self.assertEqual((assigned['overdue'], assigned['due_this_week']), (1, 1))
+        self.assertEqual(assigned['next_due_date'], self.today)
+        self.assertEqual(reviewing['total'], 2)
+        self.assertEqual((reviewing['overdue'], reviewing['due_this_week']), (0, 1))
+        self.assertEqual(reviewing['next_due_date'], self.today)
+        self.assertEqual(response.json()['reviewing']['next_due_date'], self.today.isoformat())
+
+    def test_cached_for_a_short_time(self):
+        self.client.get(self.url)
+        with self.assertNumQueries(0):
+            self.client.get(self.url)
+        with self.settings(KANMIND_SUMMARY_CACHE_TIMEOUT=0), self.assertNumQueries(1):
+            self.client.get(self.url)
+
+
+class TaskMoveTests(KanmindTestCase):
+    """
+    Tests for moving tasks between and within status columns.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user('owner@example.com', 'owner@example.com', 'pw')
+        self.board = Board.objects.create(title='Board', owner=self.user)
+        self.a, self.b, self.c = [self.create_task(title) for title in 'abc']
+        BoardStats.recompute([self.board.id])
+        self.client.force_authenticate(self.user)
+
+    def create_task(self, title, status=Task.Status.to_do):
+        return Task.objects.create(board=self.board, title=title, status=status, assignee=self.user,
+                                   reviewer=self.user, due_date=date(2030, 1, 1),
+                                   position=Task.objects.end_position(self.board.id, status))
+
+    def move(self, task, **data):
+        return self.client.post(reverse('task-move', args=[task.id]), data, format='json')
+
+    def column(self, status=Task.Status.to_do):
+        return list(Task.objects.column(self.board.id, status).values_list('title', flat=True))
+
+    def test_move_within_column_writes_one_row(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.move(self.c, after_id=self.a.id)
+        self.assertEqual(response.status_code, 200)
+        task_updates = [q['sql'] for q in queries if q['sql'].startswith('UPDATE "kanmind_board_app_task"')]
+        self.assertEqual(len(task_updates), 1)
+        self.assertEqual(self.column(), ['a', 'c', 'b'])
+        self.move(self.a, before_id=self.b.id)
+        self.assertEqual(self.column(), ['c', 'a', 'b'])
+
+    def test_move_to_other_column(self):
+        self.move(self.a, status=Task.Status.done)
+        self.move(self.b, status=Task.Status.done, before_id=self.a.id)
+        self.assertEqual(self.column(Task.Status.done), ['b', 'a'])
+        self.assertEqual(BoardStats.objects.get(board=self.board).tasks_to_do_count, 1)
+        detail = self.client.get(reverse('board-detail', args=[self.board.id])).json()
+        self.assertEqual([task['title'] for task in detail['tasks']], ['b', 'a', 'c'])
+
+    def test_exhausted_gap_rebalances_the_column(self):
+        Task.objects.filter(pk=self.b.pk).update(position=self.a.position + Task.POSITION_MIN_GAP / 2)
+        self.move(self.c, after_id=self.a.id)
+        self.assertEqual(self.column(), ['a', 'c', 'b'])
+        positions = list(Task.objects.column(self.board.id, Task.Status.to_do).values_list('position', flat=True))
+        self.assertTrue(all(high - low >= Task.POSITION_MIN_GAP for low, high in zip(positions, positions[1:])))
+
+    def test_rejects_invalid_moves(self):
+        self.assertEqual(self.move(self.a, after_id=self.b.id, before_id=self.c.id).status_code, 400)
+        self.assertEqual(self.move(self.a, status=Task.Status.done, after_id=self.b.id).status_code, 400)
+        self.client.force_authenticate(User.objects.create_user('x@example.com', 'x@example.com', 'pw'))
+        self.assertEqual(self.move(self.a).status_code, 403)
+
+    def test_rebalance_command(self):
+        Task.objects.filter(pk=self.b.pk).update(position=self.a.position + 0.0001)
+        out = StringIO()
+        call_command('rebalance_task_positions', stdout=out)
+        self.assertIn('Rebalanced 1 column(s), 3 task(s)', out.getvalue())
+        self.assertEqual(Task.objects.crowded_columns(min_gap=1), [])
+        self.assertEqual(self.column(), ['a', 'b', 'c'])
+
+
+class TaskPatchTests(KanmindTestCase):
+    """
+    Tests for minimal-write task updates with version checks (PATCH /api/tasks/<id>/).
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user('owner@example.com', 'owner@example.com', 'pw')
+        self.other = User.objects.create_user('other@example.com', 'other@example.com', 'pw')
+        self.board = Board.objects.create(title='Board', owner=self.user)
+        self.task = Task.objects.create(board=self.board, title='T', description='D', assignee=self.user,
+                                        reviewer=self.user, due_date=date(2030, 1, 1))
+        BoardStats.recompute([self.board.id])
+        self.client.force_authenticate(self.user)
+        self.url = reverse('task-detail', args=[self.task.id])
+
+    def task_updates(self, queries):
+        return [q['sql'] for q in queries if q['sql'].startswith('UPDATE "kanmind_board_app_task"')]
+
+    def test_writes_only_changed_fields(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.patch(self.url, {'title': 'New', 'description': 'D', 'version': 1}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['version'], 2)
+        [update] = self.task_updates(queries)
+        self.assertIn('"title"', update)
+        self.assertNotIn('"description"', update)
+        self.assertNotIn('"due_date"', update)
+
+    def test_unchanged_patch_writes_nothing(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.patch(self.url, {'title': 'T', 'assignee_id': self.user.id}, format='json')
+        self.assertEqual(response.data['version'], 1)
+        self.assertEqual(self.task_updates(queries), [])
+        self.assertFalse(any('"auth_user"."id" IN' in q['sql'] for q in queries))
+
+    def test_new_users_are_checked_with_one_query(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.patch(self.url, {'assignee_id': self.other.id, 'reviewer_id': self.other.id},
+                                         format='json')
+        self.assertEqual(response.data['assignee']['id'], self.other.id)
+        self.assertEqual(len([q for q in queries if q['sql'].startswith('SELECT') and '"auth_user"."id" IN' in q['sql']]), 1)
+        response = self.client.patch(self.url, {'reviewer_id': 9999}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('reviewer_id', response.data)
+
+    def test_stale_version_conflicts(self):
+        self.client.patch(self.url, {'title': 'First', 'version': 1}, format='json')
+        response = self.client.patch(self.url, {'title': 'Second', 'version': 1}, format='json')
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.data['version'], 2)
+        self.assertEqual(Task.objects.get(pk=self.task.pk).title, 'First')
+
+    def test_status_change_updates_column_and_stats(self):
+        self.client.patch(self.url, {'status': Task.Status.done}, format='json')
+        task = Task.objects.get(pk=self.task.pk)
+        self.assertEqual((task.status, task.position, task.version), (Task.Status.done, Task.POSITION_STEP, 2))
+        self.assertEqual(BoardStats.objects.get(board=self.board).tasks_to_do_count, 0)
@@ -0,0 +1,216 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS
+from django.utils.translation import gettext_lazy as _
+from rest_framework.authentication import TokenAuthentication, get_authorization_header
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.authtoken.models import Token
+
+
+def user_fields():
+    """
+    User fields kept in the token cache: everything but the password
+    hash and last_login, which are loaded on access if ever needed.
+    """
+    return [field.attname for field in User._meta.concrete_fields if field.attname not in ('password', 'last_login')]
+
+
+def invalidates_tokens(update_fields):
+    """
+    Whether a User save with these update_fields (None: all fields)
+    can change what the token cache holds or whether the user may log in.
+    """
+    return update_fields is None or bool(set(update_fields) & {'password', *user_fields()})
+
+
+class TokenCache:
+    """
+    Two-tier cache of token key -> user with a TTL.
+    - max_size: Number of tokens kept in the in-process LRU
+    - ttl: Seconds an entry stays valid in the shared cache
+    - shared_cache: Name of a Django cache alias, or None
+    - local_ttl: Seconds an entry stays valid in the LRU (default: ttl)
+    Lookups check the LRU first and fall back to the shared cache, which
+    refills the LRU. invalidate() drops both tiers here, but only the
+    shared tier of other processes, so their LRU may serve a removed
+    token or deactivated user for up to local_ttl seconds; keep it short
+    when a shared cache is used.
+    Entries hold the user's field values, and every lookup builds a new
+    User from them, so requests and threads never share an instance.
+    """
+
+    def __init__(self, max_size=10000, ttl=60, shared_cache=None, local_ttl=None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.shared_cache = shared_cache
+        self.local_ttl = ttl if local_ttl is None else local_ttl
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.local_hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_settings(cls):
+        options = getattr(settings, 'KANMIND_TOKEN_CACHE', {})
+        return cls(
+            max_size=options.get('MAX_SIZE', 10000),
+            ttl=options.get('TTL', 60),
+            shared_cache=options.get('SHARED_CACHE', 'default'),
+            local_ttl=options.get('LOCAL_TTL'),
+        )
+
+    def shared_key(self, key):
+        return 'kanmind:token:' + hashlib.sha256(key.encode()).hexdigest()
+
+    def get(self, key):
+        """
+        Return a new User for a cached token key, or None.
+        """
+        values = self.get_local(key)
+        if values is not None:
+            return self.found(values, 'local')
+        if self.shared_cache:
+            values = caches[self.shared_cache].get(self.shared_key(key))
+        return self.found_shared(key, values)
+
+    async def aget(self, key):
+        """
+        Async get(); only the shared cache lookup is awaited.
+        """
+        values = self.get_local(key)
+        if values is not None:
+            return self.found(values, 'local')
+        if self.shared_cache:
+            values = await caches[self.shared_cache].aget(self.shared_key(key))
+        return self.found_shared(key, values)
+
+    def get_local(self, key):
+        now = time.monotonic()
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and entry[0] > now:
+                self.entries.move_to_end(key)
+                return entry[1]
+            if entry is not None:
+                del self.entries[key]
+        return None
+
+    def found_shared(self, key, values):
+        if values is not None:
+            self.store_local(key, values)
+        return self.found(values, 'shared')
+
+    def found(self, values, tier):
+        with self.lock:
+            if values is None:
+                self.misses += 1
+                return None
+            if tier == 'local':
+                self.local_hits += 1
+            else:
+                self.shared_hits += 1
+        return User.from_db(DEFAULT_DB_ALIAS, user_fields(), values)
+
+    def snapshot(self, user):
+        return tuple(getattr(user, field) for field in user_fields())
+
+    def set(self, key, user):
+        values = self.snapshot(user)
+        self.store_local(key, values)
+        if self.shared_cache:
+            caches[self.shared_cache].set(self.shared_key(key), values, self.ttl)
+
+    async def aset(self, key, user):
+        values = self.snapshot(user)
+        self.store_local(key, values)
+        if self.shared_cache:
+            await caches[self.shared_cache].aset(self.shared_key(key), values, self.ttl)
+
+    def store_local(self, key, values):
+        with self.lock:
+            self.entries[key] = (time.monotonic() + self.local_ttl, values)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    def invalidate(self, key):
+        with self.lock:
+            self.entries.pop(key, None)
+        if self.shared_cache:
+            caches[self.shared_cache].delete(self.shared_key(key))
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.local_hits = self.shared_hits = self.misses = 0
+
+    def stats(self):
+        """
+        Return hit/miss counters per tier and the current in-process size.
+        """
+        with self.lock:
+            return {
+                'hits': self.local_hits + self.shared_hits,
+                'local_hits': self.local_hits,
+                'shared_hits': self.shared_hits,
+                'misses': self.misses,
+                'size': len(self.entries),
+            }
+
+
+token_cache = TokenCache.from_settings()
+
+
+class CachingTokenAuthentication(TokenAuthentication):
+    """
+    Drop-in replacement for TokenAuthentication that keeps
+    token -> user lookups in token_cache, so most requests
+    skip the Token + User query. A cached user that is not
+    active is looked up again, which rejects it.
+    Entries are invalidated by the signals in users.signals.
+    """
+
+    def authenticate_credentials(self, key):
+        user = token_cache.get(key)
+        if user is not None and user.is_active:
+            return (user, Token(key=key, user=user))
+
+        user, token = super().authenticate_credentials(key)
+        token_cache.set(key, user)
+        return (user, token)
+
+    async def aauthenticate(self, request):
+        """
+        Async counterpart of authenticate() for the async views
+        (plain Django requests). Returns None when the request
+        carries no token.
+        """
+        auth = get_authorization_header(request).split()
+        if not auth or auth[0].lower() != self.keyword.lower().encode() or len(auth) != 2:
+            return None
+        try:
+            key = auth[1].decode()
+        except UnicodeError:
+            raise AuthenticationFailed(_('Invalid token header. Token string should not contain invalid characters.'))
+        return await self.aauthenticate_credentials(key)
+
+    async def aauthenticate_credentials(self, key):
+        user = await token_cache.aget(key)
+        if user is not None and user.is_active:
+            return (user, Token(key=key, user=user))
+
+        try:
+            token = await Token.objects.select_related('user').aget(key=key)
+        except Token.DoesNotExist:
+            raise AuthenticationFailed(_('Invalid token.'))
+        if not token.user.is_active:
+            raise AuthenticationFailed(_('User inactive or deleted.'))
+        await token_cache.aset(key, token.user)
+        return (token.user, token)
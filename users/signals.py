@@ -0,0 +1,28 @@
+from django.contrib.auth.models import User
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from users.api.authentication import invalidates_tokens, token_cache
+
+
+@receiver([post_save, post_delete], sender=Token)
+def token_changed(sender, instance, **kwargs):
+    """
+    Drop a token from the cache when it is deleted or rotated.
+    """
+    token_cache.invalidate(instance.key)
+
+
+@receiver(post_save, sender=User)
+def user_changed(sender, instance, update_fields=None, **kwargs):
+    """
+    Drop all tokens of a user when the user changes,
+    e.g. gets deactivated, so no stale user is served.
+    Saves that only touch fields the cache does not hold
+    (e.g. last_login on every login) are skipped.
+    """
+    if not invalidates_tokens(update_fields):
+        return
+    for key in Token.objects.filter(user=instance).values_list('key', flat=True):
+        token_cache.invalidate(key)
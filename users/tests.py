@@ -1,3 +1,82 @@
-from django.test import TestCase
+import time
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITestCase
+
+from users.api.authentication import TokenCache, token_cache
+
+
+class CachingTokenAuthenticationTests(APITestCase):
+    """
+    Tests for the cached token lookup.
+    """
+
+    def setUp(self):
+        cache.clear()
+        token_cache.clear()
+        self.user = User.objects.create_user('user@example.com', 'user@example.com', 'pw')
+        self.token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+        self.url = reverse('email-check') + '?email=user@example.com'
+
+    def test_second_request_skips_token_query(self):
+        self.assertEqual(self.client.get(self.url).status_code, 200)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(self.url).status_code, 200)
+        self.assertEqual(token_cache.stats()['local_hits'], 1)
+        self.assertEqual(token_cache.stats()['misses'], 1)
+
+    def test_local_tier_is_checked_before_the_shared_cache(self):
+        self.client.get(self.url)
+        cache.delete(token_cache.shared_key(self.token.key))
+        self.assertIsNotNone(token_cache.get(self.token.key))
+        self.assertEqual(token_cache.stats()['local_hits'], 1)
+        self.assertEqual(token_cache.stats()['shared_hits'], 0)
+
+    def test_shared_hit_fills_the_local_tier(self):
+        other_process = TokenCache(shared_cache='default', local_ttl=5)
+        self.client.get(self.url)
+        self.assertIsNotNone(other_process.get(self.token.key))
+        self.assertIsNotNone(other_process.get(self.token.key))
+        self.assertEqual(other_process.stats(),
+                         {'hits': 2, 'local_hits': 1, 'shared_hits': 1, 'misses': 0, 'size': 1})
+
+    def test_deleted_token_is_rejected(self):
+        self.client.get(self.url)
+        self.token.delete()
+        self.assertEqual(self.client.get(self.url).status_code, 401)
+
+    def test_deactivated_user_is_rejected(self):
+        self.client.get(self.url)
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.client.get(self.url).status_code, 401)
+
+    def test_requests_get_their_own_user_instance(self):
+        self.client.get(self.url)
+        first, second = token_cache.get(self.token.key), token_cache.get(self.token.key)
+        self.assertIsNot(first, second)
+        self.assertEqual((first.pk, first.email), (self.user.pk, self.user.email))
+
+    def test_invalidation_reaches_other_processes_within_local_ttl(self):
+        other_process = TokenCache(shared_cache='default', local_ttl=5)
+        self.client.get(self.url)
+        self.assertIsNotNone(other_process.get(self.token.key))
+        self.user.is_active = False
+        self.user.save()
+        self.assertIsNone(token_cache.get(self.token.key))
+        with mock.patch('time.monotonic', return_value=time.monotonic() + 6):
+            self.assertIsNone(other_process.get(self.token.key))
+
+    def test_last_login_update_keeps_the_cache(self):
+        self.client.get(self.url)
+        with CaptureQueriesContext(connection) as queries:
+            self.user.save(update_fields=['last_login'])
+        self.assertEqual(len(queries), 1)
+        self.assertIsNotNone(token_cache.get(self.token.key))